@@ -0,0 +1,129 @@
+"""Synthetic data generators for the benchmark suite."""
+
+import typing as t
+
+import numpy as np
+
+UUID = "07f316b1-5403-40eb-b4dc-6be4a529ce67"
+
+SUB_PROCESS_CLASS = "common_workflows.relax.quantum_espresso"
+
+# The ports of `SUB_PROCESS_CLASS` used by the composite inputs
+SUB_PROCESS_PORTS = frozenset(
+    {"base", "base.pw", "base.pw.parameters", "base.pw.parameters.*"}
+)
+
+
+def make_structure(nsites: int, seed: int = 0) -> dict:
+    """Return an OPTIMADE structure resource of `nsites` silicon atoms."""
+    rng = np.random.default_rng(seed)
+    length = max(5.0, 2.5 * nsites ** (1 / 3))
+    return {
+        "id": f"bench-{nsites}",
+        "type": "structures",
+        "attributes": {
+            "last_modified": "2024-01-01T00:00:00Z",
+            "elements": ["Si"],
+            "nelements": 1,
+            "elements_ratios": [1.0],
+            "chemical_formula_descriptive": f"Si{nsites}",
+            "chemical_formula_reduced": "Si",
+            "chemical_formula_anonymous": "A",
+            "dimension_types": [1, 1, 1],
+            "nperiodic_dimensions": 3,
+            "lattice_vectors": (np.eye(3) * length).tolist(),
+            "cartesian_site_positions": (rng.random((nsites, 3)) * length).tolist(),
+            "nsites": nsites,
+            "species_at_sites": ["Si"] * nsites,
+            "species": [
+                {
+                    "name": "Si",
+                    "chemical_symbols": ["Si"],
+                    "concentration": [1.0],
+                },
+            ],
+            "structure_features": [],
+        },
+    }
+
+
+def make_grid(extent: int, seed: int = 0) -> np.ndarray:
+    """Return a cubic volumetric grid of `extent**3` values."""
+    return np.random.default_rng(seed).random((extent, extent, extent))
+
+
+def make_engine() -> dict:
+    return {
+        "code": {
+            "identifier": UUID,
+            "name": "Quantum ESPRESSO",
+            "package": {
+                "name": "qe",
+                "package_manager": {"name": "conda", "metadata": {}},
+                "metadata": {"version": "7.2"},
+            },
+            "executionEnvironment": {"name": "localhost", "metadata": {}},
+        },
+        "options": {"resources": {"num_machines": 1}},
+    }
+
+
+def make_relax_inputs(nsites: int) -> dict:
+    return {
+        "engines": {"relax": make_engine()},
+        "protocol": "fast",
+        "relax_type": "positions",
+        "structure": make_structure(nsites),
+    }
+
+
+def make_relax_outputs(nsites: int, grid: t.Optional[int] = None) -> dict:
+    rng = np.random.default_rng(0)
+    outputs = {
+        "forces": rng.random((nsites, 3)),
+        "relaxed_structure": make_structure(nsites),
+        "total_energy": -1.0 * nsites,
+        "stress": rng.random((3, 3)),
+    }
+    if grid:
+        outputs["hartree_potential"] = make_grid(grid, seed=1)
+        outputs["charge_density"] = make_grid(grid, seed=2)
+    return outputs
+
+
+def index_ports() -> None:
+    """Index the ports of `SUB_PROCESS_CLASS`, which need AiiDA otherwise."""
+    from common_workflow_schemas.common import ports
+
+    ports.PORT_INDEX[SUB_PROCESS_CLASS] = SUB_PROCESS_PORTS
+    ports.get_port_names.cache_clear()
+
+
+def _composite_inputs(relax_type: str) -> dict:
+    return {
+        "sub_process_class": SUB_PROCESS_CLASS,
+        "generator_inputs": {
+            "engines": {"relax": make_engine()},
+            "protocol": "fast",
+            "relax_type": relax_type,
+        },
+        "sub_process": {"base": {"pw": {"parameters": {"SYSTEM": {}}}}},
+    }
+
+
+def make_eos_inputs(count: int, nsites: int = 8) -> dict:
+    return {
+        **_composite_inputs("positions"),
+        "structure": make_structure(nsites),
+        "scale_factors": np.linspace(0.94, 1.06, count).tolist(),
+        "scale_count": None,
+        "scale_increment": None,
+    }
+
+
+def make_dc_inputs(count: int) -> dict:
+    return {
+        **_composite_inputs("none"),
+        "molecule": make_structure(2),
+        "distances": np.linspace(0.5, 3.0, count).tolist(),
+    }
@@ -0,0 +1,359 @@
+"""Benchmark suite for the hot paths of the schemas.
+
+Times model validation, JSON schema generation, context building and
+serialization on synthetic data of increasing size, and writes the results to a
+JSON file that can be compared across commits.
+
+Usage::
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --output new.json --compare results.json
+
+With `--compare`, cases slower than the baseline by more than `--threshold`
+are reported as regressions and the exit status is non-zero, as it is when a
+case fails or is not faster than the approach it replaces (see `FASTER_THAN`).
+"""
+
+import argparse
+import datetime
+import enum
+import hashlib
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import traceback
+import typing as t
+from dataclasses import dataclass
+
+from generators import (
+    index_ports,
+    make_dc_inputs,
+    make_eos_inputs,
+    make_relax_inputs,
+    make_relax_outputs,
+)
+
+from common_workflow_schemas.common.context import build_context
+from common_workflow_schemas.common.serializers import serialize_model
+
+
+@dataclass
+class Case:
+    """A benchmarked call, with the arguments of each call built untimed."""
+
+    name: str
+    func: t.Callable[..., t.Any]
+    make_args: t.Callable[[], tuple] = tuple
+
+
+SIZES = {
+    "quick": {"sites": (10, 1_000), "grid": (16, 32), "count": (10, 100)},
+    "full": {
+        "sites": (10, 1_000, 100_000),
+        "grid": (16, 64, 128),
+        "count": (10, 1_000, 10_000),
+    },
+}
+
+
+def dump_walk(model: t.Any) -> t.Any:
+    """The `serialize_model` baseline: a Python-mode dump walked recursively."""
+
+    def walk(value: t.Any) -> t.Any:
+        if isinstance(value, dict):
+            return {k: walk(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [walk(v) for v in value]
+        if isinstance(value, enum.Enum):
+            return value.value
+        if isinstance(value, datetime.datetime):
+            return value.isoformat()
+        if hasattr(value, "tolist"):
+            return value.tolist()
+        return value
+
+    return walk(model.model_dump())
+
+
+def relax_cases(sizes: dict) -> t.Iterator[Case]:
+    from common_workflow_schemas.schemas.relax import RelaxInputs, RelaxOutputs
+
+    for nsites in sizes["sites"]:
+        data = make_relax_inputs(nsites)
+        yield Case(
+            f"validate/RelaxInputs/sites={nsites}",
+            RelaxInputs.model_validate,
+            lambda d=data: (d,),
+        )
+        model = RelaxInputs.model_validate(data)
+        yield Case(
+            f"serialize_model/RelaxInputs/sites={nsites}",
+            serialize_model,
+            lambda m=model: (m,),
+        )
+        # Both walk the model tree at a similar cost for the smallest structures
+        if nsites >= 1_000:
+            yield Case(
+                f"dump_walk/RelaxInputs/sites={nsites}",
+                dump_walk,
+                lambda m=model: (m,),
+            )
+        yield Case(f"model_oo_ld/RelaxInputs/sites={nsites}", model.model_oo_ld)
+
+        data = make_relax_outputs(nsites)
+        yield Case(
+            f"validate/RelaxOutputs/sites={nsites}",
+            RelaxOutputs.model_validate,
+            lambda d=data: (d,),
+        )
+
+    for extent in sizes["grid"]:
+        data = make_relax_outputs(8, grid=extent)
+        yield Case(
+            f"validate/RelaxOutputs/grid={extent}",
+            RelaxOutputs.model_validate,
+            lambda d=data: (d,),
+        )
+        model = RelaxOutputs.model_validate(data)
+        for codec in ("list", "base64"):
+            yield Case(
+                f"serialize_model/RelaxOutputs/grid={extent}/{codec}",
+                serialize_model,
+                lambda m=model, c=codec: (m, c),
+            )
+        yield Case(
+            f"dump_walk/RelaxOutputs/grid={extent}/list",
+            dump_walk,
+            lambda m=model: (m,),
+        )
+        yield Case(f"model_oo_ld/RelaxOutputs/grid={extent}", model.model_oo_ld)
+
+
+def json_digest(model: t.Any) -> str:
+    """The fingerprint baseline: a hash of the key-sorted JSON serialization."""
+    document = json.dumps(serialize_model(model), sort_keys=True)
+    return hashlib.sha256(document.encode()).hexdigest()
+
+
+def fingerprint_cases(sizes: dict) -> t.Iterator[Case]:
+    from common_workflow_schemas.schemas.relax import RelaxInputs, RelaxOutputs
+
+    for nsites in sizes["sites"]:
+        model = RelaxInputs.model_validate(make_relax_inputs(nsites))
+        yield Case(
+            f"model_fingerprint/RelaxInputs/sites={nsites}",
+            model.model_fingerprint,
+        )
+        # Both walk the model tree at a similar cost for the smallest structures
+        if nsites < 1_000:
+            continue
+        yield Case(
+            f"json_digest/RelaxInputs/sites={nsites}",
+            json_digest,
+            lambda m=model: (m,),
+        )
+
+    for extent in sizes["grid"]:
+        model = RelaxOutputs.model_validate(make_relax_outputs(8, grid=extent))
+        yield Case(
+            f"model_fingerprint/RelaxOutputs/grid={extent}",
+            model.model_fingerprint,
+        )
+        yield Case(
+            f"json_digest/RelaxOutputs/grid={extent}",
+            json_digest,
+            lambda m=model: (m,),
+        )
+
+
+def composite_cases(sizes: dict) -> t.Iterator[Case]:
+    from common_workflow_schemas.schemas.dissociation import DcInput
+    from common_workflow_schemas.schemas.eos import EosInputs
+
+    index_ports()
+    for count in sizes["count"]:
+        data = make_eos_inputs(count)
+        yield Case(
+            f"validate/EosInputs/scale_factors={count}",
+            EosInputs.model_validate,
+            lambda d=data: (d,),
+        )
+        data = make_dc_inputs(count)
+        yield Case(
+            f"validate/DcInput/distances={count}",
+            DcInput.model_validate,
+            lambda d=data: (d,),
+        )
+
+
+def schema_cases(sizes: dict) -> t.Iterator[Case]:
+    from common_workflow_schemas.schemas.dissociation import DcInput
+    from common_workflow_schemas.schemas.eos import EosInputs
+    from common_workflow_schemas.schemas.relax import RelaxInputs, RelaxOutputs
+
+    for model_class in (RelaxInputs, RelaxOutputs, EosInputs, DcInput):
+        name = model_class.__name__
+        yield Case(f"model_json_schema/{name}", model_class.model_json_schema)
+        schema = model_class.model_json_schema()
+        yield Case(
+            f"build_context/{name}",
+            build_context,
+            lambda n=name, s=schema: (n, s),
+        )
+
+
+# The errors of a broken case, recorded in its result rather than stopping the run
+CASE_ERRORS = (
+    ArithmeticError,
+    AttributeError,
+    ImportError,
+    LookupError,
+    OSError,
+    RuntimeError,
+    TypeError,
+    ValueError,
+)
+
+
+def time_case(case: Case, repeat: int, min_time: float) -> dict:
+    """Return the per-call timings of a case, calibrating the number of calls."""
+    start = time.perf_counter()
+    case.func(*case.make_args())
+    number = max(1, int(min_time / max(time.perf_counter() - start, 1e-9)))
+    timings = []
+    for _ in range(repeat):
+        calls = [case.make_args() for _ in range(number)]
+        start = time.perf_counter()
+        for args in calls:
+            case.func(*args)
+        timings.append((time.perf_counter() - start) / number)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+GROUPS: list[t.Callable[[dict], t.Iterator[Case]]] = [
+    relax_cases,
+    fingerprint_cases,
+    composite_cases,
+    schema_cases,
+]
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Return the names of the cases slower than `threshold` times the baseline."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference or "min" not in reference:
+            continue
+        if "min" not in result:
+            regressions.append(name)
+            print(f"REGRESSION {name}: {result['error']}", file=sys.stderr)
+            continue
+        ratio = result["min"] / reference["min"]
+        if ratio > threshold:
+            regressions.append(name)
+            print(f"REGRESSION {name}: {ratio:.2f}x baseline", file=sys.stderr)
+    return regressions
+
+
+# Cases that must beat the approach they replace, on the same data
+FASTER_THAN = {
+    "model_fingerprint/": "json_digest/",
+    "serialize_model/": "dump_walk/",
+}
+
+
+def check_faster(results: dict) -> list[str]:
+    """Return the names of the cases not faster than their `FASTER_THAN` pair."""
+    slower = []
+    for name, result in results.items():
+        for prefix, other_prefix in FASTER_THAN.items():
+            if not name.startswith(prefix):
+                continue
+            other = results.get(other_prefix + name[len(prefix) :], {})
+            if "min" in result and "min" in other and result["min"] >= other["min"]:
+                slower.append(name)
+                print(f"SLOWER {name} than {other_prefix}", file=sys.stderr)
+    return slower
+
+
+def git_revision() -> t.Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: t.Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--compare", help="JSON results of a baseline run")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    parser.add_argument("--size", choices=SIZES, default="quick")
+    parser.add_argument("--filter", default="", help="Run only matching cases")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    import numpy as np
+    import pydantic as pdt
+
+    results = {}
+    failed = []
+    for group in GROUPS:
+        try:
+            for case in group(SIZES[args.size]):
+                if args.filter not in case.name:
+                    continue
+                try:
+                    result = time_case(case, args.repeat, args.min_time)
+                except CASE_ERRORS as exception:
+                    result = {"error": f"{type(exception).__name__}: {exception}"}
+                    failed.append(case.name)
+                results[case.name] = result
+                print(f"{case.name}: {result}")
+        except CASE_ERRORS:
+            # Failing to build the data of a group skips its remaining cases
+            traceback.print_exc()
+            failed.append(group.__name__)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pydantic": pdt.VERSION,
+        "size": args.size,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(report, fp, indent=2)
+
+    if failed:
+        print(f"FAILED {', '.join(failed)}", file=sys.stderr)
+        return 1
+    if check_faster(results):
+        return 1
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)["results"]
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""Batch validation of many records, optionally in a process pool."""
+
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import itertools
+import os
+import typing as t
+
+import pydantic as pdt
+
+from common_workflow_schemas.common.instrumentation import get_recorder, instrument
+from common_workflow_schemas.common.interning import get_intern_table
+
+M = t.TypeVar("M", bound=pdt.BaseModel)
+
+Outcome = tuple[int, t.Optional[pdt.BaseModel], t.Optional[list[dict]]]
+
+_worker_model_class: t.Optional[type[pdt.BaseModel]] = None
+_worker_kwargs: dict = {}
+_worker_instrumented = False
+
+
+def _validate_record(
+    model_class: type[pdt.BaseModel],
+    index: int,
+    record: t.Any,
+    kwargs: dict,
+) -> Outcome:
+    try:
+        return index, model_class.model_validate(record, **kwargs), None
+    except pdt.ValidationError as error:
+        return index, None, error.errors(include_url=False)
+
+
+def _validate_chunk(
+    model_class: type[pdt.BaseModel],
+    start: int,
+    records: list[t.Any],
+    kwargs: dict,
+) -> list[Outcome]:
+    if (recorder := get_recorder()) is None:
+        return [
+            _validate_record(model_class, index, record, kwargs)
+            for index, record in enumerate(records, start=start)
+        ]
+    outcomes = []
+    for index, record in enumerate(records, start=start):
+        with recorder.measure("validate_many", model_class):
+            outcomes.append(_validate_record(model_class, index, record, kwargs))
+    return outcomes
+
+
+def _init_worker(
+    model_class: type[pdt.BaseModel],
+    kwargs: dict,
+    instrumented: bool,
+) -> None:
+    # Unpickling the class imports its module, and so builds its validator,
+    # once per worker rather than once per chunk
+    global _worker_model_class, _worker_kwargs, _worker_instrumented
+    _worker_model_class, _worker_kwargs = model_class, kwargs
+    _worker_instrumented = instrumented
+
+
+def _validate_worker_chunk(
+    start: int,
+    records: list[t.Any],
+) -> tuple[list[Outcome], t.Optional[dict]]:
+    """Validate a chunk, returning the statistics recorded if instrumented."""
+    args = (_worker_model_class, start, records, _worker_kwargs)
+    if not _worker_instrumented:
+        return _validate_chunk(*args), None
+    with instrument() as recorder:
+        outcomes = _validate_chunk(*args)
+    return outcomes, recorder.stats
+
+
+def _without_intern(kwargs: dict) -> dict:
+    """Return the keyword arguments without the intern table of the context.
+
+    Valid instances are interned by the parent process, which owns the table.
+    """
+    context = kwargs.get("context")
+    if not isinstance(context, dict) or "intern" not in context:
+        return kwargs
+    context = {key: value for key, value in context.items() if key != "intern"}
+    return {**kwargs, "context": context}
+
+
+def _chunk_outcomes(
+    result: tuple[list[Outcome], t.Optional[dict]],
+) -> list[Outcome]:
+    """Return the outcomes of a worker chunk, merging its statistics."""
+    outcomes, stats = result
+    if stats and (recorder := get_recorder()) is not None:
+        recorder.merge(stats)
+    return outcomes
+
+
+def _iter_chunks(
+    records: t.Iterable[t.Any],
+    chunk_size: int,
+) -> t.Iterator[tuple[int, list[t.Any]]]:
+    iterator = iter(records)
+    start = 0
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        yield start, chunk
+        start += len(chunk)
+
+
+class BatchValidation(t.Generic[M]):
+    """Lazily validated batch of records.
+
+    Iterating yields the valid instances in the order of the records, while
+    the errors of invalid records are collected in `errors`, keyed by the
+    index of the record, as the list of error details of the corresponding
+    `pydantic.ValidationError`.
+
+    Parameters
+    ----------
+    `model_class` : `type[BaseModel]`
+        The model to validate the records as.
+    `records` : `Iterable`
+        The records, consumed lazily in chunks.
+    `workers` : `int`
+        The number of worker processes. With `1`, records are validated in the
+        current process. `None` uses one worker per CPU.
+    `chunk_size` : `int`
+        The number of records sent to a worker at a time.
+    `kwargs`
+        Keyword arguments of `model_validate`. The valid instances are
+        interned if the `context` selects an intern table (see
+        `common.interning`).
+    """
+
+    def __init__(
+        self,
+        model_class: type[M],
+        records: t.Iterable[t.Any],
+        workers: t.Optional[int] = 1,
+        chunk_size: int = 256,
+        **kwargs,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("`chunk_size` must be positive")
+        self.model_class = model_class
+        self.records = records
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.kwargs = kwargs
+        self.errors: dict[int, list[dict]] = {}
+
+    def __iter__(self) -> t.Iterator[M]:
+        table = get_intern_table(self.kwargs.get("context"))
+        for index, model, errors in self._iter_outcomes():
+            if errors is not None:
+                self.errors[index] = errors
+            elif table is None:
+                yield model
+            else:
+                yield table.intern_tree(model)
+
+    def _iter_outcomes(self) -> t.Iterator[Outcome]:
+        chunks = _iter_chunks(self.records, self.chunk_size)
+        if self.workers == 1:
+            for start, chunk in chunks:
+                yield from _validate_chunk(self.model_class, start, chunk, self.kwargs)
+            return
+
+        workers = self.workers or os.cpu_count() or 1
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(
+                self.model_class,
+                _without_intern(self.kwargs),
+                get_recorder() is not None,
+            ),
+        ) as executor:
+            # Bound the chunks in flight to keep memory independent of the batch
+            pending: collections.deque = collections.deque()
+            for start, chunk in chunks:
+                pending.append(executor.submit(_validate_worker_chunk, start, chunk))
+                if len(pending) >= 2 * workers:
+                    yield from _chunk_outcomes(pending.popleft().result())
+            while pending:
+                yield from _chunk_outcomes(pending.popleft().result())
@@ -0,0 +1,339 @@
+"""Persistent local cache of the outputs of previously run calculations.
+
+Outputs are stored in an SQLite database keyed by the content fingerprint of
+the inputs (see `common.fingerprint`), such that resubmitting identical inputs
+can be answered without rerunning the calculation. Large arrays are written to
+content-addressed `.npy` sidecar files next to the database (see
+`common.codecs.SidecarCodec`) and memory-mapped back on lookup.
+
+The database runs in write-ahead-log mode, such that any number of threads or
+processes can read while one of them writes. Outputs are serialized, and their
+sidecar files written, before taking the write lock, and lookups do not
+write: the access times of hits, which order evictions, are recorded in
+memory and written with the next store, eviction or `close`.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+import typing as t
+
+import numpy as np
+import pydantic as pdt
+
+from common_workflow_schemas.common.codecs import SidecarCodec
+from common_workflow_schemas.common.fingerprint import fingerprint
+from common_workflow_schemas.common.registry import class_key
+from common_workflow_schemas.common.serializers import serialize_model_json
+
+M = t.TypeVar("M", bound=pdt.BaseModel)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    output_class TEXT NOT NULL,
+    document BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS sidecars (
+    key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (key, name)
+);
+CREATE INDEX IF NOT EXISTS sidecars_name ON sidecars (name);
+"""
+
+
+@dataclasses.dataclass
+class CacheStats:
+    """Lookup and eviction counts of a `ResultCache` instance."""
+
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _RecordingSidecarCodec(SidecarCodec):
+    """Sidecar codec recording the files referenced by the encoded payloads."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.files: dict[str, int] = {}
+        self.arrays: dict[str, np.ndarray] = {}
+
+    def encode(self, array):
+        payload = super().encode(array)
+        if isinstance(payload, dict) and payload.get("encoding") == self.name:
+            size = (self.directory / payload["path"]).stat().st_size
+            self.files[payload["path"]] = size
+            self.arrays[payload["path"]] = array
+        return payload
+
+    def restore(self) -> None:
+        """Rewrite the files removed since encoding, e.g. by another evicting."""
+        for name, array in self.arrays.items():
+            if not (target := self.directory / name).exists():
+                self.write(target, np.ascontiguousarray(array))
+
+
+class ResultCache(t.Generic[M]):
+    """SQLite-backed cache mapping inputs to the outputs of their calculation.
+
+    Parameters
+    ----------
+    `directory` : `str | os.PathLike`
+        The directory holding the database and the array sidecar files.
+    `output_class` : `type[BaseModel]`
+        The model of the cached outputs, e.g. `RelaxOutputs`.
+    `max_bytes` : `int`, optional
+        The maximum total size of the entries, including their sidecar files.
+        The least recently used entries are evicted beyond it.
+    `max_age` : `float`, optional
+        The maximum age, in seconds, of an entry before it is evicted.
+    `min_sidecar_size` : `int`
+        Arrays with fewer elements are stored inline in the database.
+    `timeout` : `float`
+        The seconds to wait for a concurrent writer to release the database.
+    """
+
+    def __init__(
+        self,
+        directory: t.Union[str, os.PathLike],
+        output_class: type[M],
+        max_bytes: t.Optional[int] = None,
+        max_age: t.Optional[float] = None,
+        min_sidecar_size: int = 1024,
+        timeout: float = 30.0,
+    ) -> None:
+        self.directory = pathlib.Path(directory)
+        self.arrays = self.directory / "arrays"
+        self.output_class = output_class
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.min_sidecar_size = min_sidecar_size
+        self.timeout = timeout
+        self.stats = CacheStats()
+        self._accessed: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the connection of the current thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.directory / "cache.sqlite",
+                timeout=self.timeout,
+                isolation_level=None,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextlib.contextmanager
+    def _transaction(self) -> t.Iterator[sqlite3.Connection]:
+        # Writers take the lock up front, such that sidecar files restored or
+        # deleted within the transaction are never seen half-referenced
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_accessed(connection)
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _write_accessed(self, connection: sqlite3.Connection) -> None:
+        """Write the access times recorded by the lookups since the last write."""
+        with self._lock:
+            accessed, self._accessed = self._accessed, {}
+        connection.executemany(
+            "UPDATE entries SET accessed = MAX(accessed, ?) WHERE key = ?",
+            [(seconds, key) for key, seconds in accessed.items()],
+        )
+
+    def _count(self, **counts: int) -> None:
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self.stats, name, getattr(self.stats, name) + count)
+
+    @staticmethod
+    def key(inputs: pdt.BaseModel) -> str:
+        """Return the cache key of the inputs."""
+        return fingerprint(inputs)
+
+    def get(self, inputs: pdt.BaseModel) -> t.Optional[M]:
+        """Return the cached outputs of the inputs, if any."""
+        key = self.key(inputs)
+        row = (
+            self._connection()
+            .execute(
+                "SELECT output_class, document, created FROM entries WHERE key = ?",
+                (key,),
+            )
+            .fetchone()
+        )
+        now = time.time()
+        if (
+            row is None
+            or row[0] != class_key(self.output_class)
+            or (self.max_age is not None and now - row[2] > self.max_age)
+        ):
+            self._count(misses=1)
+            return None
+        context = {"array_codecs": {"npy": SidecarCodec(self.arrays)}}
+        try:
+            outputs = self.output_class.model_validate_json(row[1], context=context)
+        except FileNotFoundError:
+            # Evicted by another process since the entry was read
+            self._count(misses=1)
+            return None
+        with self._lock:
+            self._accessed[key] = now
+        self._count(hits=1)
+        return outputs
+
+    def put(self, inputs: pdt.BaseModel, outputs: M) -> None:
+        """Store the outputs of the inputs, replacing any existing entry."""
+        if not isinstance(outputs, self.output_class):
+            raise TypeError(
+                f"Expected outputs of type `{self.output_class.__name__}`, got "
+                f"`{type(outputs).__name__}`"
+            )
+        key = self.key(inputs)
+        codec = _RecordingSidecarCodec(
+            self.arrays,
+            min_size=self.min_sidecar_size,
+            fallback="base64",
+        )
+        document = serialize_model_json(outputs, codec)
+        size = len(document) + sum(codec.files.values())
+        now = time.time()
+        with self._transaction() as connection:
+            codec.restore()
+            orphans = self._delete(connection, [key])
+            connection.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (key, class_key(type(outputs)), document, size, now, now),
+            )
+            connection.executemany(
+                "INSERT INTO sidecars VALUES (?, ?)",
+                [(key, name) for name in codec.files],
+            )
+            self._unlink(orphans - codec.files.keys())
+        self._count(stores=1)
+        if self.max_bytes is not None or self.max_age is not None:
+            self.evict()
+
+    def __contains__(self, inputs: pdt.BaseModel) -> bool:
+        row = (
+            self._connection()
+            .execute("SELECT 1 FROM entries WHERE key = ?", (self.key(inputs),))
+            .fetchone()
+        )
+        return row is not None
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """The total size of the entries, in bytes."""
+        query = "SELECT COALESCE(SUM(size), 0) FROM entries"
+        return self._connection().execute(query).fetchone()[0]
+
+    def evict(self) -> int:
+        """Evict expired entries, then least recently used ones beyond `max_bytes`.
+
+        Returns the number of evicted entries.
+        """
+        with self._transaction() as connection:
+            keys = []
+            if self.max_age is not None:
+                keys.extend(
+                    key
+                    for (key,) in connection.execute(
+                        "SELECT key FROM entries WHERE created < ?",
+                        (time.time() - self.max_age,),
+                    )
+                )
+            if self.max_bytes is not None:
+                total = 0
+                expired = set(keys)
+                for key, size in connection.execute(
+                    "SELECT key, size FROM entries ORDER BY accessed DESC"
+                ):
+                    if key in expired:
+                        continue
+                    total += size
+                    if total > self.max_bytes:
+                        keys.append(key)
+            self._unlink(self._delete(connection, keys))
+        self._count(evictions=len(keys))
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove all entries and sidecar files."""
+        with self._transaction() as connection:
+            keys = [key for (key,) in connection.execute("SELECT key FROM entries")]
+            self._unlink(self._delete(connection, keys))
+
+    def _delete(self, connection: sqlite3.Connection, keys: list[str]) -> set[str]:
+        """Delete entries, returning the sidecar files no longer referenced."""
+        names = set()
+        for key in keys:
+            names.update(
+                name
+                for (name,) in connection.execute(
+                    "SELECT name FROM sidecars WHERE key = ?",
+                    (key,),
+                )
+            )
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            connection.execute("DELETE FROM sidecars WHERE key = ?", (key,))
+        return {
+            name
+            for name in names
+            if connection.execute(
+                "SELECT 1 FROM sidecars WHERE name = ? LIMIT 1",
+                (name,),
+            ).fetchone()
+            is None
+        }
+
+    def _unlink(self, names: t.Iterable[str]) -> None:
+        for name in names:
+            (self.arrays / name).unlink(missing_ok=True)
+
+    def flush(self) -> None:
+        """Write the pending access times of the lookups to the database."""
+        with self._transaction():
+            pass
+
+    def close(self) -> None:
+        """Write the pending access times and close the connection of the thread."""
+        if self._accessed:
+            with contextlib.suppress(sqlite3.OperationalError):
+                self.flush()
+        if (connection := getattr(self._local, "connection", None)) is not None:
+            connection.close()
+            self._local.connection = None
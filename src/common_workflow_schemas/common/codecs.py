@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import base64
+import bz2
+import hashlib
+import lzma
+import os
+import pathlib
+import tempfile
+import threading
+import typing as t
+import zlib
+
+import numpy as np
+import numpy.typing as npt
+
+BytesTransform = t.Callable[[bytes], bytes]
+
+COMPRESSORS: dict[str, tuple[BytesTransform, BytesTransform]] = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+    "bz2": (bz2.compress, bz2.decompress),
+}
+
+# `np.load` parses the `.npy` header with `ast.literal_eval`, which is not
+# thread-safe before Python 3.12 (python/cpython#106905)
+_LOAD_LOCK = threading.Lock()
+
+
+class ArrayCodec:
+    """Base class for the encoding of `np.ndarray` fields on export."""
+
+    name = ""
+
+    def encode(self, array: np.ndarray) -> t.Any:
+        raise NotImplementedError
+
+    def decode(self, data: t.Any) -> np.ndarray:
+        raise NotImplementedError
+
+
+class ListCodec(ArrayCodec):
+    """Encodes arrays as nested lists of numbers."""
+
+    name = "list"
+
+    def encode(self, array: np.ndarray) -> list:
+        return array.tolist()
+
+    def decode(self, data: list) -> np.ndarray:
+        return np.asarray(data, dtype=np.float64)
+
+
+class BufferCodec(ArrayCodec):
+    """Encodes arrays as base64 of their raw little-endian buffer.
+
+    Parameters
+    ----------
+    `name` : `str`
+        The name under which the codec is registered and recorded in the payload.
+    `compression` : `str`, optional
+        The key of a `COMPRESSORS` entry applied to the buffer before encoding.
+    `dtype` : `np.dtype`, optional
+        If provided, arrays are cast to this dtype before encoding, e.g.
+        `np.float32` for a lossy but twice as compact representation.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        compression: t.Optional[str] = None,
+        dtype: t.Optional[npt.DTypeLike] = None,
+    ) -> None:
+        if compression is not None and compression not in COMPRESSORS:
+            raise ValueError(f"Unknown compression '{compression}'")
+        self.name = name
+        self.compression = compression
+        self.dtype = None if dtype is None else np.dtype(dtype)
+
+    def encode(self, array: np.ndarray) -> dict:
+        dtype = (self.dtype or array.dtype).newbyteorder("<")
+        buffer = np.ascontiguousarray(array, dtype=dtype).tobytes()
+        if self.compression:
+            compress, _ = COMPRESSORS[self.compression]
+            buffer = compress(buffer)
+        return {
+            "encoding": self.name,
+            "compression": self.compression,
+            "dtype": dtype.str,
+            "shape": list(array.shape),
+            "data": base64.b64encode(buffer).decode("ascii"),
+        }
+
+    def decode(self, data: dict) -> np.ndarray:
+        """Rebuild the array as a read-only view of the decoded buffer."""
+        buffer = base64.b64decode(data["data"])
+        if compression := data.get("compression"):
+            _, decompress = COMPRESSORS[compression]
+            buffer = decompress(buffer)
+        return np.frombuffer(buffer, dtype=data["dtype"]).reshape(data["shape"])
+
+
+class SidecarCodec(ArrayCodec):
+    """Stores arrays in `.npy` sidecar files referenced from the payload.
+
+    Files are named after the SHA-256 checksum of their data, such that equal
+    arrays are written once. Decoded arrays are read-only `np.memmap`s, paged
+    in from disk only when accessed.
+
+    The codec is not registered, as it needs a directory: pass an instance
+    as `array_codec` on export, and under `"npy"` in the `"array_codecs"`
+    validation context to load the files back.
+
+    Parameters
+    ----------
+    `directory` : `str | os.PathLike`
+        The directory in which sidecar files are written, typically that of
+        the document, and against which the paths recorded in payloads are
+        resolved. Paths resolving outside of it are rejected.
+    `min_size` : `int`
+        Arrays with fewer elements are encoded inline with `fallback` instead.
+    `fallback` : `str | ArrayCodec`
+        The codec used for arrays below `min_size`.
+    `verify` : `bool`
+        If `True`, the checksum of each sidecar file is verified on decoding,
+        which reads the whole array.
+    """
+
+    name = "npy"
+
+    def __init__(
+        self,
+        directory: t.Union[str, os.PathLike],
+        min_size: int = 0,
+        fallback: t.Union[str, ArrayCodec] = "list",
+        verify: bool = False,
+    ) -> None:
+        self.directory = pathlib.Path(directory)
+        self.min_size = min_size
+        self.fallback = fallback
+        self.verify = verify
+
+    def encode(self, array: np.ndarray) -> t.Any:
+        if array.size < self.min_size:
+            return get_array_codec(self.fallback).encode(array)
+        array = np.ascontiguousarray(array)
+        checksum = hashlib.sha256(array.data).hexdigest()
+        path = pathlib.Path(f"{checksum}.npy")
+        target = self.directory / path
+        if not target.exists():
+            self.write(target, array)
+        return {
+            "encoding": self.name,
+            "path": path.as_posix(),
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "sha256": checksum,
+        }
+
+    def write(self, target: pathlib.Path, array: np.ndarray) -> None:
+        """Write a sidecar file atomically, through a file of its own."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory,
+            prefix=f"{target.name}.",
+            suffix=".partial",
+            delete=False,
+        ) as fp:
+            try:
+                np.save(fp, array)
+            except BaseException:
+                fp.close()
+                os.unlink(fp.name)
+                raise
+        os.replace(fp.name, target)
+
+    def resolve(self, path: str) -> pathlib.Path:
+        """Return the file of a payload path, which must be within `directory`."""
+        directory = self.directory.resolve()
+        target = (directory / path).resolve()
+        if target == directory or directory not in target.parents:
+            raise ValueError(f"Sidecar path '{path}' is outside of '{directory}'")
+        return target
+
+    def decode(self, data: dict) -> np.ndarray:
+        path = self.resolve(data["path"])
+        with _LOAD_LOCK:
+            array = np.load(path, mmap_mode="r")
+        if array.dtype.str != data["dtype"] or list(array.shape) != data["shape"]:
+            raise ValueError(
+                f"Sidecar file '{data['path']}' holds an array of dtype "
+                f"'{array.dtype.str}' and shape {list(array.shape)}, expected "
+                f"'{data['dtype']}' and {data['shape']}"
+            )
+        if self.verify:
+            checksum = hashlib.sha256(np.ascontiguousarray(array).data).hexdigest()
+            if checksum != data["sha256"]:
+                raise ValueError(f"Checksum mismatch for sidecar '{data['path']}'")
+        return array
+
+
+ARRAY_CODECS: dict[str, ArrayCodec] = {}
+
+
+def register_array_codec(codec: ArrayCodec) -> ArrayCodec:
+    """Register an array codec under its name, replacing any existing entry."""
+    if not codec.name:
+        raise ValueError("Array codecs must define a name")
+    ARRAY_CODECS[codec.name] = codec
+    return codec
+
+
+def get_array_codec(codec: t.Union[str, ArrayCodec]) -> ArrayCodec:
+    """Return the array codec registered under the given name."""
+    if isinstance(codec, ArrayCodec):
+        return codec
+    try:
+        return ARRAY_CODECS[codec]
+    except KeyError:
+        raise ValueError(
+            f"Unknown array codec '{codec}', expected one of {list(ARRAY_CODECS)}"
+        ) from None
+
+
+def decode_array(
+    data: t.Any,
+    codecs: t.Optional[t.Mapping[str, ArrayCodec]] = None,
+) -> np.ndarray:
+    """Rebuild an array from any registered encoding.
+
+    Entries of `codecs` take precedence over the registry, e.g. to resolve
+    sidecar files against a given directory.
+    """
+    if isinstance(data, dict):
+        encoding = data["encoding"]
+        if codecs and encoding in codecs:
+            return codecs[encoding].decode(data)
+        return get_array_codec(encoding).decode(data)
+    return ARRAY_CODECS["list"].decode(data)
+
+
+register_array_codec(ListCodec())
+for _compression in (None, *COMPRESSORS):
+    for _dtype, _suffix in ((None, ""), (np.float32, "-float32")):
+        register_array_codec(
+            BufferCodec(
+                name=f"{_compression or 'base64'}{_suffix}",
+                compression=_compression,
+                dtype=_dtype,
+            )
+        )
@@ -1,108 +1,175 @@
 from __future__ import annotations
 
-BASE_PREFIX = "https://example.com/commonWorkflows"
-
-
-def reduce_iri(iri: str) -> str:
-    if iri.startswith(BASE_PREFIX):
-        return iri.replace(f"{BASE_PREFIX}/", "cw:")
-    elif iri.startswith("https://example.com/"):
-        return iri.replace("https://example.com/", "ex:")
-    return iri
-
-
-def reduce_to_prefixes(context: dict) -> None:
-    for key, value in context.items():
-        if isinstance(value, dict):
-            if "@id" in value:
-                value["@id"] = reduce_iri(value["@id"])
-            if "@context" in value:
-                reduce_to_prefixes(value["@context"])
-        elif isinstance(value, str):
-            context[key] = reduce_iri(value)
-
-
-def extract_context_from_class_definition(
-    class_key: str,
-    classes: dict,
-    visited: set,
-    flat_context: dict,
-) -> dict | None:
-    if class_key in visited:
-        return None
-    visited.add(class_key)
-
-    def_schema = classes.get(class_key)
-    if not def_schema or "@id" not in def_schema:
-        return None
-
-    this_context = {}
-    for prop, prop_def in def_schema.get("properties", {}).items():
-        if isinstance(prop_def, dict):
-            if "@id" in prop_def:
-                this_context[prop] = prop_def.pop("@id")
-            if "$ref" in prop_def:
-                inner_ref: str = prop_def["$ref"]
-                inner_def_key = inner_ref.split("/")[-1]
-                if inner_def_key not in this_context:
-                    extract_context_from_class_definition(
-                        inner_def_key,
-                        classes,
-                        visited,
-                        flat_context,
-                    )
-
-    flat_context[class_key] = {
-        "@id": def_schema.pop("@id"),
-        "@context": this_context,
-    }
+import typing as t
 
-    return flat_context[class_key]
-
-
-def build_context(object_name: str, schema: dict) -> dict:
-    context = {
-        object_name: schema.pop("@id"),
-    }
+BASE_PREFIX = "https://example.com/commonWorkflows"
 
-    classes = schema.get("$defs", {})
-    visited_classes = set()
-    flat_context = {}
+VOCAB = "https://example.com/"
+
+DEFAULT_PREFIXES = {
+    "ex": "https://example.com/",
+    "cw": f"{BASE_PREFIX}/",
+}
+
+CONTEXT_KEYS = ("@id", "@container")
+
+
+class PrefixTrie:
+    """Character trie compacting IRIs against the longest matching prefix.
+
+    Parameters
+    ----------
+    `prefixes` : `Mapping[str, str]`
+        The IRI of each prefix name, e.g. `{"ex": "https://example.com/"}`.
+    """
+
+    _END = ""
+
+    def __init__(self, prefixes: t.Mapping[str, str]) -> None:
+        self.prefixes = dict(prefixes)
+        self.root: dict = {}
+        for name, iri in self.prefixes.items():
+            node = self.root
+            for char in iri:
+                node = node.setdefault(char, {})
+            node[self._END] = name
+
+    def match(self, iri: str) -> t.Optional[tuple[str, int]]:
+        """Return the name and length of the longest prefix of the IRI."""
+        node, longest = self.root, None
+        for length, char in enumerate(iri):
+            if self._END in node:
+                longest = (node[self._END], length)
+            if (node := node.get(char)) is None:
+                return longest
+        if self._END in node:
+            longest = (node[self._END], len(iri))
+        return longest
+
+    def compact(self, iri: str) -> str:
+        if match := self.match(iri):
+            name, length = match
+            return f"{name}:{iri[length:]}"
+        return iri
+
+    def prefix_definitions(self) -> dict[str, str]:
+        """Return the prefix definitions, each compacted by the shorter ones."""
+        definitions = {}
+        for name, iri in self.prefixes.items():
+            # Dropping the last character excludes the prefix itself
+            if match := self.match(iri[:-1]):
+                definitions[name] = f"{match[0]}:{iri[match[1] :]}"
+            else:
+                definitions[name] = iri
+        return definitions
+
+
+DEFAULT_TRIE = PrefixTrie(DEFAULT_PREFIXES)
 
-    for class_key in classes:
-        extract_context_from_class_definition(
-            class_key,
-            classes,
-            visited_classes,
-            flat_context,
-        )
 
-    def walk(entry, parent_key=None):
+def reduce_iri(iri: str) -> str:
+    return DEFAULT_TRIE.compact(iri)
+
+
+def build_context(
+    object_name: str,
+    schema: dict,
+    prefixes: t.Optional[t.Mapping[str, str]] = None,
+    vocab: str = VOCAB,
+) -> dict:
+    """Build the JSON-LD `@context` from the `@id`s annotating a JSON schema.
+
+    The schema is left untouched, and each node is visited once. IRIs are
+    compacted against `prefixes`, the defaults of which define `ex` and `cw`.
+
+    Parameters
+    ----------
+    `object_name` : `str`
+        The term of the object described by the schema.
+    `schema` : `dict`
+        The JSON schema with `@id` and `@container` annotations.
+    `prefixes` : `Mapping[str, str]`, optional
+        The IRI of each prefix name used to compact IRIs.
+    `vocab` : `str`
+        The `@vocab` of the context.
+
+    Returns
+    -------
+    `dict`
+        The JSON-LD context.
+    """
+    trie = DEFAULT_TRIE if prefixes is None else PrefixTrie(prefixes)
+    context = {}
+
+    if "@id" in schema:
+        context[object_name] = trie.compact(schema["@id"])
+
+    def walk(entry: t.Any, parent_key: t.Optional[str] = None) -> None:
         if isinstance(entry, dict):
-            if "@id" in entry:
-                iri = entry.pop("@id")
-                if parent_key:
-                    context[parent_key] = iri
-
-            if "@container" in entry:
-                container_value = entry.pop("@container")
-                if parent_key:
-                    context[parent_key] = {"@container": container_value}
-
-            for k, v in entry.items():
-                walk(v, parent_key=k)
-
+            if parent_key:
+                if "@id" in entry:
+                    context[parent_key] = trie.compact(entry["@id"])
+                if "@container" in entry:
+                    context[parent_key] = {"@container": entry["@container"]}
+            for key, value in entry.items():
+                if key not in CONTEXT_KEYS:
+                    walk(value, parent_key=key)
         elif isinstance(entry, list):
             for item in entry:
                 walk(item)
 
     walk(schema.get("properties", {}))
-    context.update(flat_context)
-    reduce_to_prefixes(context)
+
+    for class_key, class_schema in schema.get("$defs", {}).items():
+        if "@id" not in class_schema:
+            continue
+        context[class_key] = {
+            "@id": trie.compact(class_schema["@id"]),
+            "@context": {
+                prop: trie.compact(prop_schema["@id"])
+                for prop, prop_schema in class_schema.get("properties", {}).items()
+                if isinstance(prop_schema, dict) and "@id" in prop_schema
+            },
+        }
 
     return {
-        "@vocab": "https://example.com/",
-        "ex": "https://example.com/",
-        "cw": "ex:commonWorkflows/",
+        "@vocab": vocab,
+        **trie.prefix_definitions(),
         **context,
     }
+
+
+def strip_context_annotations(schema: dict) -> dict:
+    """Return a copy of the schema without the annotations used by `build_context`.
+
+    Definitions without an `@id` are shared with the input schema.
+    """
+
+    def strip(entry: t.Any) -> t.Any:
+        if isinstance(entry, dict):
+            return {k: strip(v) for k, v in entry.items() if k not in CONTEXT_KEYS}
+        if isinstance(entry, list):
+            return [strip(item) for item in entry]
+        return entry
+
+    def strip_class(class_schema: dict) -> dict:
+        if "@id" not in class_schema:
+            return class_schema
+        stripped = {k: v for k, v in class_schema.items() if k != "@id"}
+        if "properties" in class_schema:
+            stripped["properties"] = {
+                prop: (
+                    {k: v for k, v in prop_schema.items() if k != "@id"}
+                    if isinstance(prop_schema, dict)
+                    else prop_schema
+                )
+                for prop, prop_schema in class_schema["properties"].items()
+            }
+        return stripped
+
+    stripped = {k: v for k, v in schema.items() if k != "@id"}
+    if "properties" in schema:
+        stripped["properties"] = strip(schema["properties"])
+    if "$defs" in schema:
+        stripped["$defs"] = {k: strip_class(v) for k, v in schema["$defs"].items()}
+    return stripped
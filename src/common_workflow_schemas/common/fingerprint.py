@@ -0,0 +1,231 @@
+"""Canonical content fingerprints of models.
+
+Values are fed to the hash in a canonical, type-tagged and length-prefixed
+encoding, such that equal content gives equal digests across processes and
+platforms, and different content cannot collide by concatenation. Array data
+is hashed straight from its memory buffer, together with its dtype and shape,
+as are lists of floats, packed into one buffer. Negative zeros are hashed as
+positive ones, which they compare equal to.
+"""
+
+from __future__ import annotations
+
+import datetime
+import enum
+import hashlib
+import itertools
+import struct
+import typing as t
+import weakref
+
+import numpy as np
+import pydantic as pdt
+
+from common_workflow_schemas.common.registry import class_key
+
+Hasher = t.Any  # a `hashlib` hash object
+
+_LENGTH = struct.Struct("<Q")
+_FLOAT = struct.Struct("<d")
+
+_ROWS = (list, tuple)
+_ROW_TYPES = set(_ROWS)
+_FLOATS = {float}
+_STRINGS = {str}
+_PACKED_ITEMS = (float, *_ROWS)
+
+_NO_EXTRA = b"d" + _LENGTH.pack(0)
+
+# Arrays larger than this are fed to the hash from their own buffer
+_INLINE_BYTES = 1 << 12
+
+_MODEL_HEADERS: weakref.WeakKeyDictionary[type, tuple[bytes, list]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _pack_floats(value: t.Union[list, tuple]) -> t.Optional[np.ndarray]:
+    """Return a list of floats, or of equal-length lists of floats, as an array."""
+    if type(value[0]) is float:
+        items = value
+    else:
+        if not value[0] or not set(map(type, value)) <= _ROW_TYPES:
+            return None
+        if len(set(map(len, value))) != 1:
+            return None
+        items = itertools.chain.from_iterable(value)
+    if set(map(type, items)) != _FLOATS:
+        return None
+    return np.array(value, dtype=np.float64)
+
+
+def _model_header(model_class: type[pdt.BaseModel]) -> tuple[bytes, list]:
+    """Return the encoded class and field count, and the encoded field names."""
+    if (header := _MODEL_HEADERS.get(model_class)) is None:
+        key = class_key(model_class).encode()
+        fields = model_class.model_fields
+        prefix = b"m" + _LENGTH.pack(len(key)) + key + _LENGTH.pack(len(fields))
+        names = [
+            (name, _LENGTH.pack(len(name.encode())) + name.encode()) for name in fields
+        ]
+        header = _MODEL_HEADERS[model_class] = (prefix, names)
+    return header
+
+
+class _Encoder:
+    """Writes the canonical encoding of values, buffered, to a hash object."""
+
+    __slots__ = ("hasher", "out")
+
+    def __init__(self, hasher: Hasher) -> None:
+        self.hasher = hasher
+        self.out = bytearray()
+
+    def flush(self) -> None:
+        self.hasher.update(self.out)
+        self.out.clear()
+
+    def length(self, tag: bytes, length: int) -> None:
+        self.out += tag
+        self.out += _LENGTH.pack(length)
+
+    def bytes(self, tag: bytes, data: bytes) -> None:
+        self.length(tag, len(data))
+        self.out += data
+
+    def array(self, array: np.ndarray) -> None:
+        if array.dtype.hasobject:
+            self.length(b"l", array.size)
+            for item in array.flat:
+                self.encode(item)
+            return
+        # Fix the byte order, such that the digest does not depend on the platform
+        dtype = array.dtype.newbyteorder("<") if array.dtype.byteorder == ">" else None
+        array = np.ascontiguousarray(array, dtype=dtype)
+        if array.dtype.kind in "fc" and not array.all():
+            # Adding zero turns negative zeros into positive ones, in a copy
+            array = array + array.dtype.type(0)
+        self.bytes(b"a", array.dtype.str.encode())
+        self.length(b"", array.ndim)
+        for extent in array.shape:
+            self.out += _LENGTH.pack(extent)
+        if array.nbytes > _INLINE_BYTES:
+            self.flush()
+            self.hasher.update(memoryview(array).cast("B"))
+        else:
+            self.out += memoryview(array).cast("B")
+
+    def model(self, model: pdt.BaseModel) -> None:
+        prefix, names = _model_header(type(model))
+        out, values = self.out, model.__dict__
+        out += prefix
+        for name, encoded in names:
+            out += encoded
+            # Fields missing from constructed models are encoded as `None`
+            if (value := values.get(name)) is None:
+                out += b"N"
+            else:
+                self.encode(value)
+        if model.model_extra:
+            self.encode(model.model_extra)
+        else:
+            out += _NO_EXTRA
+
+    def encode(self, value: t.Any) -> None:
+        out = self.out
+        kind = type(value)
+        # Exact types first, the most frequent ones inline
+        if kind is str:
+            data = value.encode()
+            out += b"s"
+            out += _LENGTH.pack(len(data))
+            out += data
+        elif kind is float:
+            out += b"f"
+            out += _FLOAT.pack(value + 0.0)
+        elif value is None:
+            out += b"N"
+        elif value is True or value is False:
+            out += b"T" if value else b"F"
+        elif kind is int:
+            self.bytes(b"i", str(value).encode())
+        elif kind is list or kind is tuple:
+            self.sequence(value)
+        elif kind is dict:
+            self.mapping(value)
+        elif isinstance(value, enum.Enum):
+            self.encode(value.value)
+        elif isinstance(value, int):
+            self.bytes(b"i", str(value).encode())
+        elif isinstance(value, float):
+            self.out += b"f"
+            self.out += _FLOAT.pack(value + 0.0)
+        elif isinstance(value, str):
+            self.bytes(b"s", value.encode())
+        elif isinstance(value, (bytes, bytearray)):
+            self.bytes(b"b", bytes(value))
+        elif isinstance(value, np.ndarray):
+            self.array(value)
+        elif isinstance(value, np.generic):
+            self.encode(value.item())
+        elif isinstance(value, pdt.BaseModel):
+            self.model(value)
+        elif isinstance(value, t.Mapping):
+            self.mapping(value)
+        elif isinstance(value, (list, tuple)):
+            self.sequence(value)
+        elif isinstance(value, (set, frozenset)):
+            self.length(b"S", len(value))
+            for digest in sorted(fingerprint(item) for item in value):
+                self.out += bytes.fromhex(digest)
+        elif isinstance(value, (datetime.date, datetime.time)):
+            self.bytes(b"t", value.isoformat().encode())
+        else:
+            # URLs, paths, UUIDs, decimals and the like
+            self.bytes(b"o", f"{type(value).__name__}:{value}".encode())
+
+    def mapping(self, value: t.Mapping) -> None:
+        self.length(b"d", len(value))
+        for key in sorted(value, key=str):
+            self.encode(key)
+            self.encode(value[key])
+
+    def sequence(self, value: t.Union[list, tuple]) -> None:
+        first = type(value[0]) if value else None
+        if first in _PACKED_ITEMS and (packed := _pack_floats(value)) is not None:
+            # Tagged apart from arrays, which do not equal lists
+            self.out += b"L"
+            self.array(packed)
+        elif first is str and set(map(type, value)) == _STRINGS:
+            self.strings(value)
+        else:
+            self.length(b"l", len(value))
+            for item in value:
+                self.encode(item)
+
+    def strings(self, value: t.Union[list, tuple]) -> None:
+        """Encode a list of strings, e.g. the species at each site, at once."""
+        data = list(map(str.encode, value))
+        self.length(b"W", len(data))
+        self.out += struct.pack(f"<{len(data)}Q", *map(len, data))
+        self.out += b"".join(data)
+
+
+def update_fingerprint(hasher: Hasher, value: t.Any) -> None:
+    """Feed the canonical encoding of a value to a `hashlib` hash object.
+
+    Models are encoded by class and field values, in the order of their
+    definition, including defaults. Mappings are encoded with sorted keys, and
+    sets in the order of the digests of their items. Lists of floats, flat or
+    of equal-length rows, and lists of strings are packed into single buffers.
+    """
+    encoder = _Encoder(hasher)
+    encoder.encode(value)
+    encoder.flush()
+
+
+def fingerprint(value: t.Any) -> str:
+    """Return the hexadecimal 256-bit BLAKE2b digest of a value's content."""
+    hasher = hashlib.blake2b(digest_size=32)
+    update_fingerprint(hasher, value)
+    return hasher.hexdigest()
@@ -0,0 +1,386 @@
+"""Ingestion of compacted or expanded JSON-LD documents into models.
+
+Keys are resolved to fields through a per-class index of field names and
+absolute field IRIs (the `@id`s set with `MetadataField`), after expanding
+them against the `@context` of the document. A context is compiled once into
+a `ContextExpander`, such that documents sharing a context, e.g. those of an
+OO-LD stream, are not re-expanded.
+"""
+
+from __future__ import annotations
+
+import copy
+import types
+import typing as t
+import weakref
+from dataclasses import dataclass
+
+import pydantic as pdt
+
+from common_workflow_schemas.common.context import DEFAULT_PREFIXES, VOCAB
+from common_workflow_schemas.common.instrumentation import get_recorder
+from common_workflow_schemas.common.interning import intern_loaded
+from common_workflow_schemas.common.types.numeric import (
+    ArrayValidator,
+    is_array_field,
+)
+
+M = t.TypeVar("M", bound=pdt.BaseModel)
+
+Kind = t.Literal["value", "sequence", "model", "model_list", "model_map"]
+
+# `X | None` annotations have their own origin from Python 3.10
+_UNIONS = (t.Union, getattr(types, "UnionType", t.Union))
+
+
+class ContextExpander:
+    """Expands terms and compact IRIs against a JSON-LD `@context`.
+
+    The scoped contexts of class terms, e.g. `{"Code": {"@id": ..., "@context":
+    {...}}}`, only apply to the nodes of that class (see `scoped`). Without a
+    context, the default prefixes and vocabulary are used.
+    """
+
+    def __init__(self, context: t.Any = None) -> None:
+        self.vocab = VOCAB
+        self.terms: dict[str, str] = {}
+        self.scopes: dict[str, t.Any] = {}
+        self._inverse: dict[str, str] = {}
+        self._scoped: dict[tuple[str, ...], ContextExpander] = {}
+        if context is None:
+            self.terms.update(DEFAULT_PREFIXES)
+        else:
+            self._collect(context)
+        self._resolve_terms()
+
+    def _collect(self, context: t.Any) -> None:
+        if isinstance(context, list):
+            for entry in context:
+                self._collect(entry)
+        elif isinstance(context, dict):
+            for key, value in context.items():
+                if key == "@vocab" and isinstance(value, str):
+                    self.vocab = value
+                elif key.startswith("@"):
+                    continue
+                elif isinstance(value, str):
+                    self.terms[key] = value
+                elif isinstance(value, dict):
+                    if isinstance(value.get("@id"), str):
+                        self.terms[key] = value["@id"]
+                    if "@context" in value:
+                        self.scopes[key] = value["@context"]
+
+    def _resolve_terms(self) -> None:
+        for term in self.terms:
+            self.terms[term] = self._resolve(self.terms[term])
+        self._inverse = {}
+        for term, iri in self.terms.items():
+            self._inverse.setdefault(iri, term)
+
+    def scoped(self, node_types: t.Iterable[str]) -> ContextExpander:
+        """Return the expander of the properties of a node of the given types.
+
+        As for JSON-LD type-scoped contexts, the scoped contexts of the types
+        are applied, in lexicographical order, over this context. They do not
+        propagate to nested nodes, which are to be expanded with this expander.
+        """
+        key = tuple(sorted({term for term in node_types if term in self.scopes}))
+        if not key:
+            return self
+        if (expander := self._scoped.get(key)) is None:
+            expander = copy.copy(self)
+            expander.terms = dict(self.terms)
+            expander.scopes = dict(self.scopes)
+            expander._scoped = {}
+            for term in key:
+                expander._collect(self.scopes[term])
+            expander._resolve_terms()
+            self._scoped[key] = expander
+        return expander
+
+    def _resolve(self, iri: str, depth: int = 8) -> str:
+        """Expand a compact IRI, following prefixes defined by other prefixes."""
+        prefix, _, suffix = iri.partition(":")
+        if (
+            depth
+            and suffix
+            and not suffix.startswith("//")
+            and (expanded := self.terms.get(prefix)) is not None
+        ):
+            return self._resolve(expanded, depth - 1) + suffix
+        return iri
+
+    def expand(self, key: str) -> str:
+        if (iri := self.terms.get(key)) is not None:
+            return iri
+        if ":" in key:
+            return self._resolve(key)
+        return key
+
+    def compact_key(self, key: str) -> str:
+        """Compact a key of an expanded free-form mapping.
+
+        IRIs are compacted to the term defined for them, if any, or relative
+        to the vocabulary.
+        """
+        if (term := self._inverse.get(key)) is not None:
+            return term
+        return key.removeprefix(self.vocab)
+
+
+@dataclass(frozen=True)
+class FieldEntry:
+    name: str
+    kind: Kind
+    model: t.Optional[type[pdt.BaseModel]] = None
+
+
+@dataclass(frozen=True)
+class ClassIndex:
+    fields: dict[str, FieldEntry]
+    types: dict[str, type[pdt.BaseModel]]
+
+
+_INDICES: weakref.WeakKeyDictionary[type, ClassIndex] = weakref.WeakKeyDictionary()
+
+
+def _strip(annotation: t.Any) -> t.Any:
+    """Strip `Annotated` and `Optional` wrappers of an annotation."""
+    while True:
+        if t.get_origin(annotation) is t.Annotated:
+            if any(isinstance(m, ArrayValidator) for m in annotation.__metadata__):
+                return annotation
+            annotation = t.get_args(annotation)[0]
+            continue
+        args = [arg for arg in t.get_args(annotation) if arg is not type(None)]
+        if t.get_origin(annotation) in _UNIONS and len(args) == 1:
+            annotation = args[0]
+            continue
+        return annotation
+
+
+def _is_model(annotation: t.Any) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, pdt.BaseModel)
+
+
+def _field_entry(name: str, annotation: t.Any) -> FieldEntry:
+    annotation = _strip(annotation)
+    origin, args = t.get_origin(annotation), t.get_args(annotation)
+    if _is_model(annotation):
+        return FieldEntry(name, "model", annotation)
+    if t.get_origin(annotation) is t.Annotated:
+        return FieldEntry(name, "sequence")
+    if origin in (list, set, tuple):
+        item = _strip(args[0]) if args else None
+        if _is_model(item):
+            return FieldEntry(name, "model_list", item)
+        return FieldEntry(name, "sequence")
+    if origin is dict and len(args) == 2 and _is_model(_strip(args[1])):
+        return FieldEntry(name, "model_map", _strip(args[1]))
+    return FieldEntry(name, "value")
+
+
+def get_class_iri(model_class: type[pdt.BaseModel]) -> t.Optional[str]:
+    """Return the IRI of a model class, set with `_IRI` on `SemanticModel`s."""
+    extra = model_class.model_config.get("json_schema_extra")
+    iri = extra.get("@id") if isinstance(extra, dict) else None
+    return iri if isinstance(iri, str) else None
+
+
+def _iter_subclasses(model_class: type) -> t.Iterator[type]:
+    yield model_class
+    for subclass in model_class.__subclasses__():
+        yield from _iter_subclasses(subclass)
+
+
+def get_class_index(model_class: type[pdt.BaseModel]) -> ClassIndex:
+    """Return the index of field names/IRIs and class names/IRIs of a model.
+
+    Field IRIs shared by several fields resolve to the first of them.
+    """
+    if (index := _INDICES.get(model_class)) is None:
+        fields: dict[str, FieldEntry] = {}
+        for name, field in model_class.model_fields.items():
+            if is_array_field(field):
+                entry = FieldEntry(name, "sequence")
+            else:
+                entry = _field_entry(name, field.annotation)
+            fields[name] = entry
+            extra = field.json_schema_extra
+            if isinstance(extra, dict) and isinstance(iri := extra.get("@id"), str):
+                fields.setdefault(iri, entry)
+        types: dict[str, type[pdt.BaseModel]] = {}
+        for subclass in _iter_subclasses(model_class):
+            types.setdefault(subclass.__name__, subclass)
+            if class_iri := get_class_iri(subclass):
+                types.setdefault(class_iri, subclass)
+        index = ClassIndex(fields, types)
+        _INDICES[model_class] = index
+    return index
+
+
+def _value(value: t.Any) -> t.Any:
+    """Unwrap JSON-LD value objects and lists."""
+    if isinstance(value, dict):
+        if "@value" in value:
+            return value["@value"]
+        if "@list" in value:
+            return [_value(item) for item in value["@list"]]
+        if value.keys() == {"@id"}:
+            return value["@id"]
+    return value
+
+
+def _compact_value(
+    value: t.Any,
+    expander: ContextExpander,
+    expanded: bool = True,
+) -> t.Any:
+    """Convert the value of a free-form field, e.g. `metadata`, to plain data.
+
+    Value objects are unwrapped, and the keys of nested mappings compacted.
+    The single-element arrays of expanded JSON-LD are unwrapped in the field
+    and in the mappings whose keys are all IRIs, such that the lists of
+    compacted documents are kept.
+    """
+    value = _value(_single(value) if expanded else value)
+    if isinstance(value, list):
+        return [_compact_value(item, expander, False) for item in value]
+    if isinstance(value, dict):
+        keys = [key for key in value if not key.startswith("@")]
+        expanded = all(":" in key for key in keys)
+        return {
+            expander.compact_key(key): _compact_value(value[key], expander, expanded)
+            for key in keys
+        }
+    return value
+
+
+def _single(value: t.Any) -> t.Any:
+    """Unwrap the single-element arrays of expanded JSON-LD."""
+    if isinstance(value, list) and len(value) == 1:
+        return value[0]
+    return value
+
+
+def _resolve_class(
+    model_class: type[M],
+    node: dict,
+    expander: ContextExpander,
+) -> type[M]:
+    types = get_class_index(model_class).types
+    node_type = node.get("@type")
+    for candidate in node_type if isinstance(node_type, list) else [node_type]:
+        if not isinstance(candidate, str):
+            continue
+        resolved = types.get(candidate) or types.get(expander.expand(candidate))
+        if resolved is not None:
+            return resolved
+    return model_class
+
+
+def _node_types(model_class: type[pdt.BaseModel], node: dict) -> list[str]:
+    """Return the terms selecting the scoped contexts of a node.
+
+    Nodes without `@type`, e.g. the nested nodes of exported documents, are
+    scoped by the term named after their class.
+    """
+    node_type = node.get("@type")
+    if node_type is None:
+        return [model_class.__name__]
+    types = node_type if isinstance(node_type, list) else [node_type]
+    return [item for item in types if isinstance(item, str)]
+
+
+def ingest_node(
+    model_class: type[pdt.BaseModel],
+    node: t.Any,
+    expander: ContextExpander,
+) -> dict:
+    """Convert a JSON-LD node object into validation input of the model."""
+    node = _single(node)
+    if not isinstance(node, dict):
+        return node
+    model_class = _resolve_class(model_class, node, expander)
+    fields = get_class_index(model_class).fields
+    scoped = expander.scoped(_node_types(model_class, node))
+    data = {}
+    for key, value in node.items():
+        if key.startswith("@"):
+            continue
+        entry = fields.get(scoped.expand(key)) or fields.get(key)
+        if entry is None:
+            continue
+        if value is None:
+            pass
+        elif entry.kind == "model":
+            value = ingest_node(entry.model, value, expander)
+        elif entry.kind == "model_list":
+            value = [ingest_node(entry.model, item, expander) for item in _value(value)]
+        elif entry.kind == "model_map":
+            value = {
+                expander.compact_key(k): ingest_node(entry.model, v, expander)
+                for k, v in _single(value).items()
+                if not k.startswith("@")
+            }
+        elif entry.kind == "sequence":
+            if isinstance(item := _single(value), dict) and "@list" in item:
+                value = item
+            value = _value(value)
+            if isinstance(value, list):
+                value = [_value(item) for item in value]
+        else:
+            value = _compact_value(value, scoped)
+        data[entry.name] = value
+    return data
+
+
+def validate_oo_ld(
+    model_class: type[M],
+    document: t.Any,
+    expander: t.Optional[ContextExpander] = None,
+    **kwargs,
+) -> M:
+    """Validate a compacted or expanded JSON-LD document as the model.
+
+    Parameters
+    ----------
+    `model_class` : `type[BaseModel]`
+        The model, or a base class of the model, described by the document.
+        A subclass named by the `@type` of the document takes precedence.
+    `document` : `dict | list`
+        The JSON-LD document, e.g. as exported by `model_oo_ld`.
+    `expander` : `ContextExpander`, optional
+        The compiled context of the document. If not provided, it is compiled
+        from the `@context` of the document, if any.
+    `kwargs`
+        Keyword arguments of `model_validate`. The model is interned if the
+        `context` selects an intern table (see `common.interning`).
+
+    Returns
+    -------
+    `BaseModel`
+        The validated model.
+    """
+    if (recorder := get_recorder()) is None:
+        return _validate_oo_ld(model_class, document, expander, kwargs)
+    with recorder.measure("validate_oo_ld", model_class):
+        return _validate_oo_ld(model_class, document, expander, kwargs)
+
+
+def _validate_oo_ld(
+    model_class: type[M],
+    document: t.Any,
+    expander: t.Optional[ContextExpander],
+    kwargs: dict,
+) -> M:
+    document = _single(document)
+    if expander is None:
+        expander = ContextExpander(document.get("@context"))
+    model_class = _resolve_class(model_class, document, expander)
+    model = model_class.model_validate(
+        ingest_node(model_class, document, expander),
+        **kwargs,
+    )
+    return intern_loaded(model, kwargs.get("context"))
@@ -0,0 +1,226 @@
+"""Opt-in timing of the hot paths of the schemas.
+
+While instrumentation is enabled, with `instrument()` or `enable()`, the
+validation, JSON schema generation, context building and serialization of
+models record, per stage and model class, their call count, timings and the
+number of bytes they produce. When disabled, the instrumented paths only
+check that no recorder is active, and the recording `model_validate`,
+`model_validate_json` and `model_json_schema` of `SemanticModel` are not
+installed at all (see `on_toggle`).
+
+The stages are:
+
+- `validate`: `model_validate`. Durations include the validation of the
+  sub-models, which are not recorded on their own.
+- `validate_json`: `model_validate_json`, with the size of the input in bytes.
+- `validate_many`: each record of `model_validate_many`, including those
+  validated in worker processes.
+- `validate_stream`: `model_validate_stream`, with the number of bytes read.
+- `validate_oo_ld`: each document of `model_validate_oo_ld` and
+  `model_validate_oo_ld_documents`.
+- `model_json_schema`, and `build_context` of OO-LD headers.
+- `serialize_model` and `serialize_model_json`, with the output size.
+- `print_json`, keyed by the `@type` of the object.
+
+Example::
+
+    with instrument() as recorder:
+        RelaxInputs.model_validate(data).model_oo_ld()
+    print(recorder.to_json())
+"""
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import json
+import random
+import threading
+import time
+import typing as t
+
+_ACTIVE: t.Optional[Recorder] = None
+_TOGGLE_HOOKS: list[t.Callable[[bool], None]] = []
+
+
+@dataclasses.dataclass
+class StageStats:
+    """Call count, timings and output size of a stage for a model class.
+
+    Percentiles are computed from a uniform sample of at most `max_samples`
+    call durations.
+    """
+
+    count: int = 0
+    seconds: float = 0.0
+    bytes: int = 0
+    max_samples: int = 4096
+    samples: list[float] = dataclasses.field(default_factory=list)
+
+    def add(self, seconds: float, size: int) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.bytes += size
+        if len(self.samples) < self.max_samples:
+            self.samples.append(seconds)
+        elif (index := random.randrange(self.count)) < self.max_samples:
+            self.samples[index] = seconds
+
+    def merge(self, other: StageStats) -> None:
+        """Add the calls of `other`, e.g. recorded in another process.
+
+        The samples of both are kept in proportion to their call counts.
+        """
+        count = self.count + other.count
+        samples = self.samples + other.samples
+        if len(samples) > self.max_samples:
+            mine = round(self.max_samples * self.count / count)
+            mine = min(mine, len(self.samples))
+            theirs = min(self.max_samples - mine, len(other.samples))
+            samples = random.sample(self.samples, mine) + random.sample(
+                other.samples, theirs
+            )
+        self.count = count
+        self.seconds += other.seconds
+        self.bytes += other.bytes
+        self.samples = samples
+
+    def percentile(self, q: float) -> float:
+        """Return the `q`-th percentile, `0 <= q <= 100`, of the durations."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "seconds": self.seconds,
+            "mean": self.seconds / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": max(self.samples, default=0.0),
+            "bytes": self.bytes,
+        }
+
+
+class Measurement:
+    """Handle of an ongoing measurement, on which the produced size is set."""
+
+    __slots__ = ("bytes",)
+
+    def __init__(self) -> None:
+        self.bytes = 0
+
+
+class Recorder:
+    """Collects the `StageStats` of each stage and model class."""
+
+    def __init__(self, max_samples: int = 4096) -> None:
+        self.max_samples = max_samples
+        self.stats: dict[str, dict[str, StageStats]] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        stage: str,
+        model_class: t.Union[type, str],
+        seconds: float,
+        size: int = 0,
+    ) -> None:
+        name = model_class if isinstance(model_class, str) else model_class.__name__
+        with self._lock:
+            classes = self.stats.setdefault(stage, {})
+            if (stats := classes.get(name)) is None:
+                stats = classes[name] = StageStats(max_samples=self.max_samples)
+            stats.add(seconds, size)
+
+    @contextlib.contextmanager
+    def measure(
+        self,
+        stage: str,
+        model_class: t.Union[type, str],
+    ) -> t.Iterator[Measurement]:
+        measurement = Measurement()
+        start = time.perf_counter()
+        try:
+            yield measurement
+        finally:
+            seconds = time.perf_counter() - start
+            self.record(stage, model_class, seconds, measurement.bytes)
+
+    def merge(self, stats: dict[str, dict[str, StageStats]]) -> None:
+        """Add statistics keyed by stage and model class name, e.g. `stats`."""
+        with self._lock:
+            for stage, classes in stats.items():
+                mine = self.stats.setdefault(stage, {})
+                for name, other in classes.items():
+                    if (current := mine.get(name)) is None:
+                        current = mine[name] = StageStats(max_samples=self.max_samples)
+                    current.merge(other)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats.clear()
+
+    def to_dict(self) -> dict:
+        """Return the statistics, keyed by stage and model class name."""
+        with self._lock:
+            return {
+                stage: {name: stats.to_dict() for name, stats in classes.items()}
+                for stage, classes in self.stats.items()
+            }
+
+    def to_json(self, **kwargs) -> str:
+        """Return `to_dict` as JSON, `kwargs` being passed to `json.dumps`."""
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+def get_recorder() -> t.Optional[Recorder]:
+    """Return the active recorder, `None` if instrumentation is disabled."""
+    return _ACTIVE
+
+
+def on_toggle(hook: t.Callable[[bool], None]) -> None:
+    """Register a hook called with the new state when instrumentation is toggled.
+
+    The hook is called with `True` when a recorder becomes active and `False`
+    when none remains, and right away if instrumentation is already enabled.
+    """
+    _TOGGLE_HOOKS.append(hook)
+    if _ACTIVE is not None:
+        hook(True)
+
+
+def _activate(recorder: t.Optional[Recorder]) -> None:
+    global _ACTIVE
+    toggled = (recorder is None) != (_ACTIVE is None)
+    _ACTIVE = recorder
+    if toggled:
+        for hook in _TOGGLE_HOOKS:
+            hook(recorder is not None)
+
+
+def enable(recorder: t.Optional[Recorder] = None) -> Recorder:
+    """Enable instrumentation globally, recording into `recorder` if given."""
+    recorder = recorder or Recorder()
+    _activate(recorder)
+    return recorder
+
+
+def disable() -> None:
+    """Disable instrumentation globally."""
+    _activate(None)
+
+
+@contextlib.contextmanager
+def instrument(recorder: t.Optional[Recorder] = None) -> t.Iterator[Recorder]:
+    """Enable instrumentation within a block, restoring the previous state."""
+    previous = _ACTIVE
+    recorder = recorder or Recorder()
+    _activate(recorder)
+    try:
+        yield recorder
+    finally:
+        _activate(previous)
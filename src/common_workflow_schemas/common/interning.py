@@ -0,0 +1,193 @@
+"""Interning of structurally equal sub-models.
+
+Models loaded in interning mode have their `InternableModel` sub-models
+resolved, by content fingerprint, to a single shared instance per distinct
+content, e.g. one `Engine` for a batch of inputs built from the same job
+template. Interning is done by the loaders once a model is validated, when
+their validation context selects a table with its `"intern"` entry (see
+`get_intern_table`): `model_validate_many`, `model_validate_stream`,
+`model_validate_oo_ld` and `TrustedLoader`. Other models are built as usual.
+
+Shared instances are frozen, as a change through one of their holders would
+otherwise show in all of them. The containers held by their fields, e.g.
+`metadata` dictionaries, must not be mutated in place either.
+
+The tables hold their instances weakly, such that content no longer used by
+any model is released.
+"""
+
+from __future__ import annotations
+
+import threading
+import typing as t
+import weakref
+
+import pydantic as pdt
+
+M = t.TypeVar("M", bound=pdt.BaseModel)
+
+# Weak references to the shared instances, by id, dropped once they are released
+_FROZEN: dict[int, weakref.ref] = {}
+
+_INTERNED_FIELDS: weakref.WeakKeyDictionary[type, frozenset[str]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def is_interned(model: pdt.BaseModel) -> bool:
+    """Return whether the model is a shared, and thus frozen, instance."""
+    return id(model) in _FROZEN
+
+
+def any_interned() -> bool:
+    """Return whether any model is currently shared."""
+    return bool(_FROZEN)
+
+
+def _is_internable(annotation: t.Any) -> bool:
+    from common_workflow_schemas.common.mixins import InternableModel
+
+    return isinstance(annotation, type) and issubclass(annotation, InternableModel)
+
+
+def _holds_internable(annotation: t.Any, seen: set[type]) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, pdt.BaseModel):
+        if _is_internable(annotation):
+            return True
+        if annotation in seen:
+            return False
+        seen.add(annotation)
+        return any(
+            _holds_internable(field.annotation, seen)
+            for field in annotation.model_fields.values()
+        )
+    return any(_holds_internable(arg, seen) for arg in t.get_args(annotation))
+
+
+def interned_fields(model_class: type[pdt.BaseModel]) -> frozenset[str]:
+    """Return the fields of a model that may hold internable sub-models.
+
+    These are the fields annotated with an `InternableModel`, or with a
+    container or model that may hold one.
+    """
+    if (names := _INTERNED_FIELDS.get(model_class)) is None:
+        names = frozenset(
+            name
+            for name, field in model_class.model_fields.items()
+            if _holds_internable(field.annotation, {model_class})
+        )
+        _INTERNED_FIELDS[model_class] = names
+    return names
+
+
+def _freeze(model: pdt.BaseModel) -> None:
+    """Mark the model as shared, guarding internable models against assignment.
+
+    The guard is only installed by the first model shared, such that
+    assignments are not checked unless interning is used.
+    """
+    from common_workflow_schemas.common.mixins import InternableModel
+
+    key = id(model)
+    _FROZEN[key] = weakref.ref(model, lambda _: _FROZEN.pop(key, None))
+    if "__setattr__" in vars(InternableModel):
+        return
+    setattr_ = InternableModel.__setattr__
+
+    def __setattr__(self: pdt.BaseModel, name: str, value: t.Any) -> None:
+        if is_interned(self):
+            raise pdt.ValidationError.from_exception_data(
+                type(self).__name__,
+                [{"type": "frozen_instance", "loc": (name,), "input": value}],
+            )
+        setattr_(self, name, value)
+
+    InternableModel.__setattr__ = __setattr__
+
+
+class InternTable:
+    """Weak-value table of shared model instances, keyed by fingerprint."""
+
+    def __init__(self) -> None:
+        self._instances: weakref.WeakValueDictionary[str, pdt.BaseModel] = (
+            weakref.WeakValueDictionary()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+    def intern(self, model: M) -> M:
+        """Return the shared instance equal to the model, sharing it if new."""
+        from common_workflow_schemas.common.fingerprint import fingerprint
+
+        return self._share(fingerprint(model), model)
+
+    def intern_tree(self, model: M) -> M:
+        """Intern the internable sub-models of a model, and the model if internable.
+
+        The fields of the model, which must not be shared yet, are updated in
+        place. The sub-models of a model already shared are left as is.
+        """
+        if not _is_internable(type(model)):
+            self._intern_fields(model)
+            return model
+        from common_workflow_schemas.common.fingerprint import fingerprint
+
+        key = fingerprint(model)
+        if key not in self._instances:
+            self._intern_fields(model)
+        return self._share(key, model)
+
+    def _share(self, key: str, model: M) -> M:
+        with self._lock:
+            if (shared := self._instances.get(key)) is not None:
+                self.hits += 1
+                return shared
+            self.misses += 1
+            self._instances[key] = model
+            _freeze(model)
+        return model
+
+    def _intern_fields(self, model: pdt.BaseModel) -> None:
+        for name in interned_fields(type(model)):
+            value = model.__dict__.get(name)
+            if (interned := self._intern_value(value)) is not value:
+                model.__dict__[name] = interned
+
+    def _intern_value(self, value: t.Any) -> t.Any:
+        if isinstance(value, pdt.BaseModel):
+            return value if is_interned(value) else self.intern_tree(value)
+        if isinstance(value, dict):
+            items = {key: self._intern_value(item) for key, item in value.items()}
+            changed = any(items[key] is not item for key, item in value.items())
+            return items if changed else value
+        if isinstance(value, (list, tuple)):
+            items = [self._intern_value(item) for item in value]
+            if all(new is old for new, old in zip(items, value)):
+                return value
+            return items if isinstance(value, list) else tuple(items)
+        return value
+
+
+INTERN_TABLE = InternTable()
+
+
+def get_intern_table(context: t.Any) -> t.Optional[InternTable]:
+    """Return the table selected by the `"intern"` entry of a validation context.
+
+    The entry is either an `InternTable` or `True` for the default table.
+    """
+    table = context.get("intern") if isinstance(context, dict) else None
+    if table is True:
+        return INTERN_TABLE
+    return table if isinstance(table, InternTable) else None
+
+
+def intern_loaded(model: M, context: t.Any) -> M:
+    """Intern a model loaded with a context selecting an intern table, if any."""
+    if (table := get_intern_table(context)) is None:
+        return model
+    return table.intern_tree(model)
@@ -1,10 +1,26 @@
+from __future__ import annotations
+
+import json
 import typing as t
+import weakref
 
 import pydantic as pdt
 from pydantic._internal._model_construction import ModelMetaclass
 
-from common_workflow_schemas.common.context import build_context
-from common_workflow_schemas.common.serializers import serialize_model
+from common_workflow_schemas.common.context import (
+    build_context,
+    strip_context_annotations,
+)
+from common_workflow_schemas.common.instrumentation import get_recorder, on_toggle
+from common_workflow_schemas.common.registry import get_registered_header
+
+# The implementations of the methods below are imported on first use, such that
+# importing a schema does not import `numpy`, `asyncio` or `concurrent.futures`
+if t.TYPE_CHECKING:
+    from common_workflow_schemas.common.batch import BatchValidation
+    from common_workflow_schemas.common.codecs import ArrayCodec
+    from common_workflow_schemas.common.serializers import SharedEncodings
+    from common_workflow_schemas.utils.writers import ExportStats, Target
 
 
 class ModelConfigMetaclass(ModelMetaclass):
@@ -59,15 +75,437 @@ class SemanticMetaclass(ModelConfigMetaclass):
         return super().__new__(cls, name, bases, _dict)
 
 
+_OO_LD_HEADERS: weakref.WeakKeyDictionary[type, dict] = weakref.WeakKeyDictionary()
+
+
+def build_oo_ld_header(model_class: t.Type[pdt.BaseModel]) -> dict:
+    """Generate the JSON schema and `@context` part of the OO-LD document."""
+    schema = model_class.model_json_schema()
+    object_type = model_class.__name__
+    if (recorder := get_recorder()) is None:
+        context = build_context(object_type, schema)
+    else:
+        with recorder.measure("build_context", model_class):
+            context = build_context(object_type, schema)
+    return {
+        "@context": context,
+        **strip_context_annotations(schema),
+        "@type": object_type,
+    }
+
+
 class SemanticModel(BaseModel, metaclass=SemanticMetaclass):
     _IRI = ""
 
-    def model_oo_ld(self):
-        schema = self.model_json_schema()
-        object_type = self.__class__.__name__
-        return {
-            "@context": build_context(object_type, schema),
-            **schema,
-            "@type": object_type,
-            **serialize_model(self),
-        }
+    @classmethod
+    def model_oo_ld_header(cls) -> dict:
+        """Return the instance-independent part of the OO-LD document.
+
+        The JSON schema and `@context` of the class are built once and memoized
+        per class object, such that a redefined class gets a fresh entry. They
+        are taken from the pre-generated registry (see `common.registry`) when
+        it holds a current entry for the class. The returned dictionary is
+        shared between calls and should not be mutated.
+        """
+        if (header := _OO_LD_HEADERS.get(cls)) is None:
+            header = get_registered_header(cls) or build_oo_ld_header(cls)
+            _OO_LD_HEADERS[cls] = header
+        return header
+
+    @classmethod
+    def model_rebuild(cls, *args, **kwargs) -> t.Optional[bool]:
+        _OO_LD_HEADERS.pop(cls, None)
+        return super().model_rebuild(*args, **kwargs)
+
+    @classmethod
+    def model_validate_many(
+        cls,
+        records: t.Iterable[t.Any],
+        workers: t.Optional[int] = 1,
+        chunk_size: int = 256,
+        **kwargs,
+    ) -> BatchValidation:
+        """Validate many records, in chunks over `workers` processes.
+
+        Returns a `BatchValidation` yielding the valid instances in order and
+        collecting the errors of the invalid records by index. The class must
+        be importable by the worker processes.
+        """
+        from common_workflow_schemas.common.batch import BatchValidation
+
+        return BatchValidation(
+            cls,
+            records,
+            workers=workers,
+            chunk_size=chunk_size,
+            **kwargs,
+        )
+
+    @classmethod
+    def model_construct_trusted(cls, data: t.Any) -> "SemanticModel":
+        """Build the model from trusted data, without validating it.
+
+        Nested sub-models are constructed recursively with `model_construct`
+        semantics, and the validators of the models are not run. See
+        `common.trusted`.
+        """
+        from common_workflow_schemas.common.trusted import construct_trusted
+
+        return construct_trusted(cls, data)
+
+    @classmethod
+    def model_construct_many(
+        cls,
+        records: t.Iterable[t.Any],
+        validate_every: int = 0,
+        checksums: t.Optional[t.Iterable[t.Optional[str]]] = None,
+        **kwargs,
+    ) -> t.Iterator["SemanticModel"]:
+        """Lazily build models from trusted records.
+
+        Every `validate_every`-th record is fully validated instead, with
+        `kwargs` passed to `model_validate`. Records are checked against their
+        `checksums`, as computed with `common.trusted.record_checksum`, if
+        given.
+        """
+        from common_workflow_schemas.common.trusted import TrustedLoader
+
+        loader = TrustedLoader(cls, validate_every=validate_every, **kwargs)
+        return loader.load_many(records, checksums)
+
+    @classmethod
+    def model_validate_stream(
+        cls,
+        fp: t.TextIO,
+        chunk_size: int = 1 << 16,
+        context: t.Optional[dict] = None,
+    ) -> "SemanticModel":
+        """Incrementally parse a serialized model or OO-LD document.
+
+        Array fields are filled straight into `np.ndarray`s as the file is
+        read (see `common.parsers.load_model`).
+        """
+        from common_workflow_schemas.common.parsers import load_model
+
+        return load_model(cls, fp, chunk_size=chunk_size, context=context)
+
+    @classmethod
+    def model_validate_oo_ld(cls, document: t.Any, **kwargs) -> "SemanticModel":
+        """Validate a compacted or expanded JSON-LD document.
+
+        Keys may be field names or any term or IRI expanding, against the
+        `@context` of the document, to the IRI of a field. The `@type` of the
+        document may select a subclass. See `common.ingest`.
+        """
+        from common_workflow_schemas.common.ingest import validate_oo_ld
+
+        return validate_oo_ld(cls, document, **kwargs)
+
+    @classmethod
+    def model_validate_oo_ld_documents(
+        cls,
+        documents: t.Iterable[t.Any],
+        context: t.Any = None,
+        **kwargs,
+    ) -> t.Iterator["SemanticModel"]:
+        """Lazily validate many JSON-LD documents.
+
+        Parameters
+        ----------
+        `documents` : `Iterable[dict]`
+            The documents, e.g. those yielded by `model_oo_ld_documents`.
+        `context` : `dict`, optional
+            The `@context` shared by the documents, e.g. that of
+            `model_oo_ld_header`. It is compiled once. Documents carrying their
+            own `@context` are expanded against it instead, compiled once per
+            distinct context object.
+        `kwargs`
+            Keyword arguments of `model_validate`.
+        """
+        from common_workflow_schemas.common.ingest import (
+            ContextExpander,
+            validate_oo_ld,
+        )
+
+        shared = ContextExpander(context)
+        last_context, last_expander = None, shared
+        for document in documents:
+            document_context = (
+                document.get("@context") if isinstance(document, dict) else None
+            )
+            if document_context is None:
+                expander = shared
+            elif document_context is last_context:
+                expander = last_expander
+            else:
+                expander = ContextExpander(document_context)
+                last_context, last_expander = document_context, expander
+            yield validate_oo_ld(cls, document, expander=expander, **kwargs)
+
+    def model_fingerprint(self) -> str:
+        """Return a digest of the content of the model.
+
+        Equal models, i.e. of the same class with equal field values, have
+        equal fingerprints, in any process. Arrays are hashed from their
+        buffers rather than serialized (see `common.fingerprint`).
+        """
+        from common_workflow_schemas.common.fingerprint import fingerprint
+
+        return fingerprint(self)
+
+    def model_diff(
+        self,
+        other: "SemanticModel",
+        array_codec: t.Union[str, ArrayCodec] = "list",
+    ) -> list[dict]:
+        """Return the RFC 6902 JSON Patch from this model to `other`.
+
+        The patch applies to the serialization of the model, e.g. as published
+        with `model_oo_ld_documents`. Only the changed values are serialized,
+        and changed arrays are replaced as a whole (see `common.patch`).
+        """
+        from common_workflow_schemas.common.patch import diff_models
+
+        return diff_models(self, other, array_codec)
+
+    def model_apply_patch(
+        self,
+        patch: t.Iterable[dict],
+        **kwargs,
+    ) -> "SemanticModel":
+        """Return a new model from this one with a JSON Patch applied.
+
+        `kwargs` are passed to `model_validate`.
+        """
+        from common_workflow_schemas.common.patch import apply_patch
+        from common_workflow_schemas.common.serializers import serialize_model
+
+        document = apply_patch(serialize_model(self), patch, in_place=True)
+        return type(self).model_validate(document, **kwargs)
+
+    def model_oo_ld(self, array_codec: t.Union[str, ArrayCodec] = "list"):
+        """Return the OO-LD document of the model.
+
+        The `@context` and schema entries of the document are those of the
+        memoized header (see `model_oo_ld_header`), shared by all documents of
+        the class, and must not be mutated. Entries of the document itself can
+        be added or replaced freely.
+        """
+        from common_workflow_schemas.common.serializers import serialize_model
+
+        return {**self.model_oo_ld_header(), **serialize_model(self, array_codec)}
+
+    @classmethod
+    def model_oo_ld_documents(
+        cls,
+        models: t.Iterable["SemanticModel"],
+        array_codec: t.Union[str, ArrayCodec] = "list",
+    ) -> t.Iterator[dict]:
+        """Lazily yield one compact OO-LD document per model.
+
+        The documents carry only `@type` and the serialized data. The `@context`
+        and schema they refer to are given once by `model_oo_ld_header`. The
+        encodings of interned sub-models are shared between the documents, and
+        must not be mutated.
+        """
+        from common_workflow_schemas.common.serializers import (
+            SharedEncodings,
+            serialize_model,
+        )
+
+        shared = SharedEncodings()
+        for model in cls._iter_instances(models):
+            yield {
+                "@type": type(model).__name__,
+                **serialize_model(model, array_codec, shared),
+            }
+
+    @classmethod
+    def model_oo_ld_documents_json(
+        cls,
+        models: t.Iterable["SemanticModel"],
+        array_codec: t.Union[str, ArrayCodec] = "list",
+    ) -> t.Iterator[str]:
+        """Lazily yield the documents of `model_oo_ld_documents` as compact JSON.
+
+        Each model is serialized directly to JSON by pydantic-core, without
+        building the intermediate dictionary, unless it holds interned
+        sub-models, whose encodings are reused between the documents.
+        """
+        from common_workflow_schemas.common.serializers import SharedEncodings
+
+        shared = SharedEncodings()
+        for model in cls._iter_instances(models):
+            yield model.model_oo_ld_document_json(array_codec, shared).decode()
+
+    def model_oo_ld_document_json(
+        self,
+        array_codec: t.Union[str, ArrayCodec] = "list",
+        shared: t.Optional[SharedEncodings] = None,
+    ) -> bytes:
+        """Serialize the compact OO-LD document of the model to JSON bytes."""
+        from common_workflow_schemas.common.serializers import serialize_model_json
+
+        data = serialize_model_json(self, array_codec, shared)
+        head = json.dumps({"@type": type(self).__name__}, separators=(",", ":"))
+        if data == b"{}":
+            return head.encode()
+        return b"%s,%s" % (head[:-1].encode(), data[1:])
+
+    @classmethod
+    def _iter_instances(
+        cls,
+        models: t.Iterable["SemanticModel"],
+    ) -> t.Iterator["SemanticModel"]:
+        for model in models:
+            if not isinstance(model, cls):
+                raise TypeError(
+                    f"Expected instances of `{cls.__name__}`, got "
+                    f"`{type(model).__name__}`"
+                )
+            yield model
+
+    @classmethod
+    def model_oo_ld_stream(
+        cls,
+        models: t.Iterable["SemanticModel"],
+        fp: t.TextIO,
+        mode: t.Literal["ndjson", "graph"] = "ndjson",
+        separators: t.Tuple[str, str] = (",", ":"),
+        array_codec: t.Union[str, ArrayCodec] = "list",
+    ) -> int:
+        """Write many models to a file object sharing a single `@context`.
+
+        Parameters
+        ----------
+        `models` : `Iterable[SemanticModel]`
+            The models to export, consumed lazily.
+        `fp` : `TextIO`
+            The file object to write to.
+        `mode` : `str`
+            `"ndjson"` writes the header on the first line followed by one
+            document per line. `"graph"` writes a single JSON-LD document with
+            the models as members of its `@graph`.
+        `separators` : `tuple[str, str]`
+            The item and key separators passed to `json.dumps`. With the
+            default compact separators, documents are serialized directly to
+            JSON (see `model_oo_ld_documents_json`).
+        `array_codec` : `str | ArrayCodec`
+            The codec used to encode array fields.
+
+        Returns
+        -------
+        `int`
+            The number of models written.
+        """
+        header = cls.model_oo_ld_header()
+        if separators == (",", ":"):
+            documents = cls.model_oo_ld_documents_json(models, array_codec)
+        else:
+            documents = (
+                json.dumps(document, separators=separators)
+                for document in cls.model_oo_ld_documents(models, array_codec)
+            )
+        count = 0
+
+        if mode == "ndjson":
+            fp.write(json.dumps(header, separators=separators))
+            fp.write("\n")
+            for count, document in enumerate(documents, start=1):
+                fp.write(document)
+                fp.write("\n")
+        elif mode == "graph":
+            graph_header = {k: v for k, v in header.items() if k != "@type"}
+            head = json.dumps({**graph_header, "@graph": []}, separators=separators)
+            fp.write(head[: -len("]}")])
+            for count, document in enumerate(documents, start=1):
+                if count > 1:
+                    fp.write(separators[0])
+                fp.write(document)
+            fp.write("]}")
+        else:
+            raise ValueError(f"Unknown stream mode '{mode}'")
+
+        return count
+
+    @classmethod
+    async def model_oo_ld_stream_async(
+        cls,
+        models: t.AsyncIterable["SemanticModel"],
+        target: Target,
+        mode: t.Literal["ndjson", "graph"] = "ndjson",
+        array_codec: t.Union[str, ArrayCodec] = "list",
+        **kwargs,
+    ) -> ExportStats:
+        """Export models like `model_oo_ld_stream`, without blocking the loop.
+
+        See `utils.writers.write_oo_ld_async` for the remaining arguments.
+        """
+        from common_workflow_schemas.utils.writers import write_oo_ld_async
+
+        return await write_oo_ld_async(
+            cls,
+            models,
+            target,
+            mode=mode,
+            array_codec=array_codec,
+            **kwargs,
+        )
+
+
+def _recorded_validate(cls, obj: t.Any, **kwargs) -> SemanticModel:
+    if (recorder := get_recorder()) is None:
+        return super(SemanticModel, cls).model_validate(obj, **kwargs)
+    with recorder.measure("validate", cls):
+        return super(SemanticModel, cls).model_validate(obj, **kwargs)
+
+
+def _recorded_validate_json(cls, json_data: t.Any, **kwargs) -> SemanticModel:
+    if (recorder := get_recorder()) is None:
+        return super(SemanticModel, cls).model_validate_json(json_data, **kwargs)
+    with recorder.measure("validate_json", cls) as measurement:
+        if isinstance(json_data, str):
+            measurement.bytes = len(json_data.encode())
+        else:
+            measurement.bytes = memoryview(json_data).nbytes
+        return super(SemanticModel, cls).model_validate_json(json_data, **kwargs)
+
+
+def _recorded_json_schema(cls, *args, **kwargs) -> dict:
+    if (recorder := get_recorder()) is None:
+        return super(SemanticModel, cls).model_json_schema(*args, **kwargs)
+    with recorder.measure("model_json_schema", cls):
+        return super(SemanticModel, cls).model_json_schema(*args, **kwargs)
+
+
+_RECORDED_METHODS = {
+    "model_validate": _recorded_validate,
+    "model_validate_json": _recorded_validate_json,
+    "model_json_schema": _recorded_json_schema,
+}
+
+
+def _install_recorded_methods(enabled: bool) -> None:
+    """Swap the recording entry points of `SemanticModel` in or out.
+
+    They are only installed while instrumentation is enabled, such that calls
+    go straight to those of pydantic otherwise.
+    """
+    for name, function in _RECORDED_METHODS.items():
+        if enabled:
+            setattr(SemanticModel, name, classmethod(function))
+        elif name in SemanticModel.__dict__:
+            delattr(SemanticModel, name)
+
+
+on_toggle(_install_recorded_methods)
+
+
+class InternableModel(SemanticModel):
+    """Semantic model that can be shared between the models holding it.
+
+    Models loaded with `context={"intern": True}`, or with an `InternTable` as
+    the `"intern"` entry, have their instances resolved to one frozen instance
+    per distinct content (see `common.interning`). Shared instances are
+    encoded once per batch by the OO-LD document exporters.
+    """
@@ -0,0 +1,363 @@
+from __future__ import annotations
+
+import array
+import json
+import re
+import typing as t
+import weakref
+
+import numpy as np
+import pydantic as pdt
+
+from common_workflow_schemas.common.instrumentation import get_recorder
+from common_workflow_schemas.common.interning import intern_loaded
+from common_workflow_schemas.common.types.numeric import is_array_field
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# `NaN` and `Infinity` are accepted, as by `json.loads`
+_NUMBER = r"(?:-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?|NaN|-?Infinity)"
+_NUMBER_RE = re.compile(_NUMBER)
+_NUMBER_LIST_RE = re.compile(rf"\s*{_NUMBER}\s*(?:,\s*{_NUMBER}\s*)*")
+_DELIMITER = re.compile(r"[ \t\n\r,:\]}]")
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*')
+_LITERALS = {"true": True, "false": False, "null": None}
+
+
+class JSONReader:
+    """Incremental reader of a JSON document from a text file object.
+
+    The file is consumed in chunks of `chunk_size` characters, and only the
+    unparsed remainder of the current chunk is kept in memory. With
+    `count_bytes`, the UTF-8 size of the text read is counted in `nbytes`.
+    """
+
+    def __init__(
+        self,
+        fp: t.TextIO,
+        chunk_size: int = 1 << 16,
+        count_bytes: bool = False,
+    ) -> None:
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.count_bytes = count_bytes
+        self.nbytes = 0
+        self.buffer = ""
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            return False
+        if self.count_bytes:
+            self.nbytes += len(chunk.encode())
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"{message} at '{self.buffer[self.pos : self.pos + 20]}'")
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self._error(f"Expected '{char}'")
+        self.pos += 1
+
+    def read_string(self) -> str:
+        self.expect('"')
+        while True:
+            try:
+                value, end = json.decoder.scanstring(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            self.pos = end
+            return value
+
+    def _read_token(self) -> str:
+        """Read a number or literal up to the next delimiter, across chunks."""
+        while True:
+            match = _DELIMITER.search(self.buffer, self.pos)
+            if match is None and self._fill():
+                continue
+            end = len(self.buffer) if match is None else match.start()
+            token = self.buffer[self.pos : end]
+            self.pos = end
+            return token
+
+    def read_number(self) -> t.Union[int, float]:
+        token = self._read_token()
+        if not _NUMBER_RE.fullmatch(token):
+            self.pos -= len(token)
+            raise self._error("Expected a number")
+        return int(token) if token.lstrip("-").isdigit() else float(token)
+
+    def read_value(self) -> t.Any:
+        """Read the next JSON value into the equivalent Python object."""
+        char = self.peek()
+        if char == "{":
+            return dict(self.iter_items(lambda key: self.read_value()))
+        if char == "[":
+            return list(self.iter_values(self.read_value))
+        if char == '"':
+            return self.read_string()
+        if char in "tfn":
+            token = self._read_token()
+            if token not in _LITERALS:
+                self.pos -= len(token)
+                raise self._error("Invalid literal")
+            return _LITERALS[token]
+        return self.read_number()
+
+    def _skip_string(self) -> None:
+        self.expect('"')
+        while True:
+            # Stops at the closing quote, or before an escape cut by the chunk
+            self.pos = _STRING_BODY.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) and self.buffer[self.pos] == '"':
+                self.pos += 1
+                return
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def skip_value(self) -> None:
+        """Skip the next JSON value without building the Python object."""
+        depth = 0
+        while True:
+            char = self.peek()
+            if char in "{[":
+                depth += 1
+                self.pos += 1
+            elif char in "}]" or char in ",:":
+                if not depth:
+                    raise self._error("Expected a value")
+                depth -= char in "}]"
+                self.pos += 1
+            elif char == '"':
+                self._skip_string()
+            elif not self._read_token():
+                raise self._error("Expected a value")
+            if not depth:
+                return
+
+    def iter_items(
+        self,
+        read_value: t.Callable[[str], t.Any],
+    ) -> t.Iterator[tuple[str, t.Any]]:
+        """Yield the key/value pairs of the next JSON object.
+
+        Each value is read by `read_value`, called with the key.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_string()
+            self.expect(":")
+            yield key, read_value(key)
+            if self.peek() == "}":
+                self.pos += 1
+                return
+            self.expect(",")
+
+    def iter_values(self, read_value: t.Callable[[], t.Any]) -> t.Iterator[t.Any]:
+        """Yield the items of the next JSON array, each read by `read_value`."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield read_value()
+            if self.peek() == "]":
+                self.pos += 1
+                return
+            self.expect(",")
+
+    def read_array(self) -> np.ndarray:
+        """Read the next (nested) JSON array of numbers into a `np.ndarray`.
+
+        Numbers are accumulated in a compact `float64` buffer, without
+        creating the intermediate nested lists, and the resulting array shares
+        its memory with that buffer.
+        """
+        values = array.array("d")
+        extents: dict[int, int] = {}
+        ndim: t.Optional[int] = None
+        counts = [0]
+        self.expect("[")
+        while counts:
+            char = self.peek()
+            if char == "]":
+                self.pos += 1
+                count, depth = counts.pop(), len(counts)
+                if ndim is None:
+                    ndim = depth + 1
+                if extents.setdefault(depth, count) != count:
+                    raise self._error("Ragged nested array")
+                if counts and self.peek() == ",":
+                    self.pos += 1
+                    if self.peek() != "[":
+                        raise self._error("Ragged nested array")
+            elif char == "[":
+                if ndim is not None and len(counts) >= ndim:
+                    raise self._error("Ragged nested array")
+                counts[-1] += 1
+                counts.append(0)
+                self.pos += 1
+            else:
+                if ndim is None:
+                    ndim = len(counts)
+                elif ndim != len(counts):
+                    raise self._error("Ragged nested array")
+                size = len(values)
+                self._read_number_run(values)
+                counts[-1] += len(values) - size
+        shape = tuple(extents[depth] for depth in range(ndim))
+        return np.frombuffer(values, dtype=np.float64).reshape(shape)
+
+    def _read_number_run(self, values: array.array) -> None:
+        """Read comma-separated numbers up to, but excluding, the closing `]`."""
+        while True:
+            end = self.buffer.find("]", self.pos)
+            if end == -1:
+                end = self.buffer.rfind(",", self.pos)
+                if end == -1:
+                    if self._fill():
+                        continue
+                    raise ValueError("Unexpected end of JSON document")
+                self._extend(values, self.buffer[self.pos : end])
+                self.pos = end + 1
+                continue
+            self._extend(values, self.buffer[self.pos : end])
+            self.pos = end
+            return
+
+    def _extend(self, values: array.array, segment: str) -> None:
+        if not _NUMBER_LIST_RE.fullmatch(segment):
+            raise self._error("Invalid numeric array")
+        values.extend(map(float, segment.split(",")))
+
+
+_FIELD_ADAPTERS: weakref.WeakKeyDictionary[type, dict] = weakref.WeakKeyDictionary()
+
+
+def _is_model(annotation: t.Any) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, pdt.BaseModel)
+
+
+def _has_model(annotation: t.Any) -> bool:
+    """Return whether an annotation refers to a model, e.g. `dict[str, Engine]`."""
+    return _is_model(annotation) or any(map(_has_model, t.get_args(annotation)))
+
+
+def _field_adapters(model_class: type[pdt.BaseModel]) -> dict[str, pdt.TypeAdapter]:
+    """Return the adapters of the fields validated as soon as they are parsed.
+
+    These are the fields holding sub-models, whose validated instances are
+    then passed through as is by the validation of the model. Scalar fields are
+    left to the latter, so that no field is validated twice.
+    """
+    if (adapters := _FIELD_ADAPTERS.get(model_class)) is None:
+        config = pdt.ConfigDict(
+            arbitrary_types_allowed=model_class.model_config.get(
+                "arbitrary_types_allowed", False
+            ),
+        )
+        adapters = {
+            name: pdt.TypeAdapter(
+                t.Annotated[field.annotation, field],
+                # Models bring their own config
+                config=None if _is_model(field.annotation) else config,
+            )
+            for name, field in model_class.model_fields.items()
+            if not is_array_field(field) and _has_model(field.annotation)
+        }
+        _FIELD_ADAPTERS[model_class] = adapters
+    return adapters
+
+
+M = t.TypeVar("M", bound=pdt.BaseModel)
+
+_SKIPPED = object()
+
+
+def load_model(
+    model_class: type[M],
+    fp: t.TextIO,
+    chunk_size: int = 1 << 16,
+    context: t.Optional[dict] = None,
+) -> M:
+    """Incrementally parse a serialized model from a text file object.
+
+    Numeric arrays of `FloatArray` fields are filled directly into `np.ndarray`
+    buffers as the document is read, and fields holding sub-models are
+    validated as soon as they are parsed, such that invalid documents fail
+    before large arrays are read. Keys that are not fields, e.g. the OO-LD
+    `@context` and schema, are skipped without being built.
+
+    Parameters
+    ----------
+    `model_class` : `type[BaseModel]`
+        The model to validate the document as.
+    `fp` : `TextIO`
+        The file object to read from.
+    `chunk_size` : `int`
+        The number of characters read from `fp` at a time.
+    `context` : `dict`, optional
+        The pydantic validation context, e.g. to resolve array codecs. The
+        model is interned if it selects an intern table (see
+        `common.interning`).
+
+    Returns
+    -------
+    `BaseModel`
+        The validated model.
+    """
+    if (recorder := get_recorder()) is None:
+        return _load_model(model_class, JSONReader(fp, chunk_size), context)
+    reader = JSONReader(fp, chunk_size, count_bytes=True)
+    with recorder.measure("validate_stream", model_class) as measurement:
+        try:
+            return _load_model(model_class, reader, context)
+        finally:
+            measurement.bytes = reader.nbytes
+
+
+def _load_model(
+    model_class: type[M],
+    reader: JSONReader,
+    context: t.Optional[dict],
+) -> M:
+    adapters = _field_adapters(model_class)
+    names = {}
+    for name, field in model_class.model_fields.items():
+        names[name] = name
+        if field.alias:
+            names[field.alias] = name
+
+    def read_field(key: str) -> t.Any:
+        if (name := names.get(key)) is None:
+            reader.skip_value()
+            return _SKIPPED
+        if name in adapters:
+            return adapters[name].validate_python(reader.read_value(), context=context)
+        if is_array_field(model_class.model_fields[name]) and reader.peek() == "[":
+            return reader.read_array()
+        return reader.read_value()
+
+    data = {
+        key: value
+        for key, value in reader.iter_items(read_field)
+        if value is not _SKIPPED
+    }
+    return intern_loaded(model_class.model_validate(data, context=context), context)
@@ -0,0 +1,265 @@
+"""Delta serialization of models as RFC 6902 JSON Patches.
+
+`diff_models` compares two instances of a model field by field and returns
+the operations turning the serialization of the first (see
+`common.serializers.serialize_model`) into that of the second. Shared
+sub-models are skipped by identity, arrays are compared with numpy, and only
+the changed values are serialized. `apply_patch` applies such patches,
+copying only the containers along the patched paths.
+"""
+
+from __future__ import annotations
+
+import copy
+import typing as t
+
+import numpy as np
+import pydantic as pdt
+
+from common_workflow_schemas.common.codecs import ArrayCodec
+from common_workflow_schemas.common.serializers import (
+    serialization_context,
+    serialization_fallback,
+)
+
+Path = tuple[t.Union[str, int], ...]
+
+_PLAIN = (str, int, bool, type(None))
+
+
+def escape_pointer(path: t.Iterable[t.Union[str, int]]) -> str:
+    """Format a path as a JSON pointer."""
+    return "".join(
+        "/" + str(token).replace("~", "~0").replace("/", "~1") for token in path
+    )
+
+
+def parse_pointer(pointer: str) -> list[str]:
+    """Split a JSON pointer into its unescaped reference tokens."""
+    if not pointer:
+        return []
+    if not pointer.startswith("/"):
+        raise ValueError(f"Invalid JSON pointer '{pointer}'")
+    return [
+        token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")
+    ]
+
+
+def _values_equal(old: t.Any, new: t.Any) -> bool:
+    if isinstance(old, np.ndarray) or isinstance(new, np.ndarray):
+        if not (isinstance(old, np.ndarray) and isinstance(new, np.ndarray)):
+            return False
+        return (
+            old.dtype == new.dtype
+            and old.shape == new.shape
+            and np.array_equal(old, new, equal_nan=old.dtype.kind == "f")
+        )
+    try:
+        return bool(old == new)
+    except ValueError:
+        # Containers of arrays
+        return False
+
+
+class _Differ:
+    def __init__(self, new: pdt.BaseModel, context: dict) -> None:
+        self.new = new
+        self.context = context
+        self.operations: list[dict] = []
+
+    def serialize(self, path: Path, value: t.Any) -> t.Any:
+        """Serialize the value at the path of the new model."""
+        if type(value) in _PLAIN:
+            return value
+        include: t.Any = True
+        for token in reversed(path):
+            include = {token: include}
+        data = self.new.__pydantic_serializer__.to_python(
+            self.new,
+            mode="json",
+            include=include,
+            by_alias=False,
+            context=self.context,
+            fallback=serialization_fallback(self.context["array_codec"]),
+        )
+        # Included lists only hold the included item
+        for token in path:
+            data = data[0] if isinstance(data, list) else data[token]
+        return data
+
+    def emit(self, op: str, path: Path, value: t.Any = None) -> None:
+        operation = {"op": op, "path": escape_pointer(path)}
+        if op != "remove":
+            operation["value"] = self.serialize(path, value)
+        self.operations.append(operation)
+
+    def diff(self, path: Path, old: t.Any, new: t.Any) -> None:
+        if old is new:
+            return
+        if (
+            isinstance(old, pdt.BaseModel)
+            and type(old) is type(new)
+            and not old.model_extra
+            and not new.model_extra
+        ):
+            for name in type(new).model_fields:
+                self.diff((*path, name), getattr(old, name), getattr(new, name))
+        elif isinstance(old, dict) and isinstance(new, dict):
+            for key in old.keys() - new.keys():
+                self.operations.append(
+                    {"op": "remove", "path": escape_pointer((*path, key))}
+                )
+            for key, value in new.items():
+                if key not in old:
+                    self.emit("add", (*path, key), value)
+                else:
+                    self.diff((*path, key), old[key], value)
+        elif (
+            isinstance(old, (list, tuple))
+            and isinstance(new, (list, tuple))
+            and len(old) == len(new)
+        ):
+            for index, (old_item, new_item) in enumerate(zip(old, new)):
+                self.diff((*path, index), old_item, new_item)
+        elif not _values_equal(old, new):
+            self.emit("replace", path, new)
+
+
+def diff_models(
+    old: pdt.BaseModel,
+    new: pdt.BaseModel,
+    array_codec: t.Union[str, ArrayCodec] = "list",
+) -> list[dict]:
+    """Return the JSON Patch turning the serialization of `old` into that of `new`.
+
+    Parameters
+    ----------
+    `old`, `new` : `BaseModel`
+        Instances of the same model.
+    `array_codec` : `str | ArrayCodec`
+        The codec used to encode changed arrays, which are replaced as a whole.
+
+    Returns
+    -------
+    `list[dict]`
+        The RFC 6902 operations, empty if the models serialize equally.
+    """
+    if type(old) is not type(new):
+        raise TypeError(
+            f"Cannot diff `{type(old).__name__}` against `{type(new).__name__}`"
+        )
+    differ = _Differ(new, serialization_context(array_codec))
+    differ.diff((), old, new)
+    return differ.operations
+
+
+def _index(container: list, token: str, op: str) -> int:
+    if token == "-" and op in ("add", "move", "copy"):
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise ValueError(f"Invalid array index '{token}'")
+    return int(token)
+
+
+class _Patcher:
+    """Applies operations, copying each container on its first modification."""
+
+    def __init__(self, document: t.Any, in_place: bool) -> None:
+        self.root = document
+        self.in_place = in_place
+        self.copied: set[int] = set()
+
+    def _own(self, container: t.Any) -> t.Any:
+        if self.in_place or id(container) in self.copied:
+            return container
+        owned = container.copy()
+        self.copied.add(id(owned))
+        return owned
+
+    def _parent(self, tokens: list[str]) -> t.Any:
+        """Return the owned parent container of the pointed location."""
+        self.root = node = self._own(self.root)
+        for token in tokens[:-1]:
+            key = _index(node, token, "") if isinstance(node, list) else token
+            node[key] = child = self._own(node[key])
+            node = child
+        return node
+
+    def get(self, pointer: str) -> t.Any:
+        node = self.root
+        for token in parse_pointer(pointer):
+            node = node[_index(node, token, "") if isinstance(node, list) else token]
+        return node
+
+    def add(self, pointer: str, value: t.Any) -> None:
+        tokens = parse_pointer(pointer)
+        if not tokens:
+            self.root = value
+            return
+        parent = self._parent(tokens)
+        if isinstance(parent, list):
+            index = _index(parent, tokens[-1], "add")
+            if index > len(parent):
+                raise IndexError(f"Index out of range at '{pointer}'")
+            parent.insert(index, value)
+        else:
+            parent[tokens[-1]] = value
+
+    def remove(self, pointer: str) -> t.Any:
+        tokens = parse_pointer(pointer)
+        if not tokens:
+            raise ValueError("Cannot remove the whole document")
+        parent = self._parent(tokens)
+        key = _index(parent, tokens[-1], "") if isinstance(parent, list) else tokens[-1]
+        return parent.pop(key)
+
+    def replace(self, pointer: str, value: t.Any) -> None:
+        tokens = parse_pointer(pointer)
+        if not tokens:
+            self.root = value
+            return
+        parent = self._parent(tokens)
+        if isinstance(parent, list):
+            key = _index(parent, tokens[-1], "")
+            if key >= len(parent):
+                raise IndexError(f"Index out of range at '{pointer}'")
+        elif (key := tokens[-1]) not in parent:
+            raise KeyError(f"No value at '{pointer}'")
+        parent[key] = value
+
+    def apply(self, operation: dict) -> None:
+        op, path = operation["op"], operation["path"]
+        if op == "add":
+            self.add(path, operation["value"])
+        elif op == "remove":
+            self.remove(path)
+        elif op == "replace":
+            self.replace(path, operation["value"])
+        elif op == "move":
+            if path.startswith(operation["from"] + "/"):
+                raise ValueError(f"Cannot move '{operation['from']}' into itself")
+            self.add(path, self.remove(operation["from"]))
+        elif op == "copy":
+            self.add(path, copy.deepcopy(self.get(operation["from"])))
+        elif op == "test":
+            if self.get(path) != operation["value"]:
+                raise ValueError(f"Test failed at '{path}'")
+        else:
+            raise ValueError(f"Unknown patch operation '{op}'")
+
+
+def apply_patch(
+    document: t.Any,
+    patch: t.Iterable[dict],
+    in_place: bool = False,
+) -> t.Any:
+    """Apply an RFC 6902 JSON Patch to a JSON document.
+
+    Unless `in_place`, the document is left untouched and only the containers
+    along the patched paths are copied, the rest being shared with the result.
+    The patch is applied atomically only if `in_place` is `False`.
+    """
+    patcher = _Patcher(document, in_place)
+    for operation in patch:
+        patcher.apply(operation)
+    return patcher.root
@@ -0,0 +1,134 @@
+"""Index of the input ports of AiiDA workflows, keyed by entry point.
+
+Port names are dotted paths, e.g. `base.pw.parameters`. A namespace accepting
+arbitrary inputs is recorded as `<namespace>.*`, or `*` for the top level.
+
+Indices can be pre-generated with `write_port_index` and loaded with
+`load_port_index`, or from the file given by the `CWS_PORT_INDEX` environment
+variable, such that validation does not require AiiDA or a profile. Entries
+loaded with `load_port_index` take precedence over those of the environment
+file, which take precedence over resolving the workflows with AiiDA.
+"""
+
+from __future__ import annotations
+
+import collections.abc
+import functools
+import json
+import os
+import typing as t
+
+PORT_INDEX_ENV = "CWS_PORT_INDEX"
+
+PORT_INDEX: dict[str, frozenset[str]] = {}
+
+# The environment file merged into `PORT_INDEX`, if any
+_env_index_path: t.Optional[str] = None
+
+
+def iter_port_names(namespace: t.Mapping, prefix: str = "") -> t.Iterator[str]:
+    """Yield the dotted names of the ports of a (nested) port namespace."""
+    if getattr(namespace, "dynamic", False):
+        yield f"{prefix}*"
+    for name, port in namespace.items():
+        yield f"{prefix}{name}"
+        if isinstance(port, collections.abc.Mapping):
+            yield from iter_port_names(port, f"{prefix}{name}.")
+
+
+def _read_port_index(path: t.Union[str, os.PathLike]) -> dict[str, frozenset[str]]:
+    with open(path) as fp:
+        return {key: frozenset(ports) for key, ports in json.load(fp).items()}
+
+
+def load_port_index(path: t.Union[str, os.PathLike]) -> None:
+    """Load a port index file written by `write_port_index`.
+
+    Loaded entries replace existing ones, including those of the environment
+    file, and take precedence over resolving the workflows with AiiDA.
+    """
+    PORT_INDEX.update(_read_port_index(path))
+    get_port_names.cache_clear()
+
+
+def _merge_env_index() -> None:
+    """Merge the file of `CWS_PORT_INDEX`, once per path, below loaded entries."""
+    global _env_index_path
+    path = os.environ.get(PORT_INDEX_ENV)
+    if not path or path == _env_index_path:
+        return
+    for key, ports in _read_port_index(path).items():
+        PORT_INDEX.setdefault(key, ports)
+    _env_index_path = path
+
+
+def write_port_index(
+    path: t.Union[str, os.PathLike],
+    entry_points: t.Iterable[str],
+) -> None:
+    """Write the port index of the given workflow entry points to a file."""
+    index = {key: sorted(get_port_names(key)) for key in entry_points}
+    with open(path, "w") as fp:
+        json.dump(index, fp, indent=2, sort_keys=True)
+
+
+@functools.cache
+def get_port_names(entry_point: str) -> frozenset[str]:
+    """Return the dotted names of the input ports of a workflow entry point.
+
+    The workflow is loaded through AiiDA once per entry point, unless the
+    entry point is found in a loaded port index or in that of `CWS_PORT_INDEX`.
+    """
+    _merge_env_index()
+    if (ports := PORT_INDEX.get(entry_point)) is not None:
+        return ports
+
+    from aiida.plugins import WorkflowFactory
+
+    workflow = WorkflowFactory(entry_point)
+    return frozenset(iter_port_names(workflow.spec().inputs))
+
+
+@functools.cache
+def get_namespaces(ports: frozenset[str]) -> frozenset[str]:
+    """Return the namespaces of the ports, with their trailing dot.
+
+    For example, `base.` and `base.pw.` for the port `base.pw.parameters`.
+    """
+    return frozenset(
+        port[: index + 1]
+        for port in ports
+        for index, char in enumerate(port)
+        if char == "."
+    )
+
+
+def find_invalid_port(
+    ports: frozenset[str],
+    inputs: t.Mapping[str, t.Any],
+    prefix: str = "",
+) -> t.Optional[str]:
+    """Return the dotted name of the first input not matching a port, if any."""
+    return _find_invalid_port(ports, get_namespaces(ports), inputs, prefix)
+
+
+def _find_invalid_port(
+    ports: frozenset[str],
+    namespaces: frozenset[str],
+    inputs: t.Mapping[str, t.Any],
+    prefix: str,
+) -> t.Optional[str]:
+    if f"{prefix}*" in ports:
+        return None
+    for key, value in inputs.items():
+        name = f"{prefix}{key}"
+        if name not in ports:
+            return name
+        if not isinstance(value, collections.abc.Mapping):
+            continue
+        namespace = f"{name}."
+        if namespace in namespaces and (
+            invalid := _find_invalid_port(ports, namespaces, value, namespace)
+        ):
+            return invalid
+    return None
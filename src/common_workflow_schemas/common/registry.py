@@ -0,0 +1,146 @@
+"""Pre-generated OO-LD headers (JSON schema and `@context`) of the schemas.
+
+`build_registry` discovers all `SemanticModel` subclasses and writes their
+headers to a versioned artifact file. Once loaded with `load_registry`, or from
+the file given by the `CWS_SCHEMA_REGISTRY` environment variable, headers are
+taken from the artifact instead of being generated, as long as it matches the
+package version and the hash of the class definition. Stale entries fall back
+to live generation.
+
+The artifact is built with::
+
+    python -m common_workflow_schemas.common.registry registry.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import re
+import typing as t
+
+import pydantic as pdt
+
+from common_workflow_schemas import __version__
+
+if t.TYPE_CHECKING:
+    from common_workflow_schemas.common.mixins import SemanticModel
+
+REGISTRY_ENV = "CWS_SCHEMA_REGISTRY"
+
+REGISTRY: dict[str, dict] = {}
+
+_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+_env_loaded = False
+
+
+def class_key(model_class: type) -> str:
+    return f"{model_class.__module__}.{model_class.__qualname__}"
+
+
+def _iter_model_types(annotation: t.Any) -> t.Iterator[type[pdt.BaseModel]]:
+    if isinstance(annotation, type) and issubclass(annotation, pdt.BaseModel):
+        yield annotation
+    for arg in t.get_args(annotation):
+        yield from _iter_model_types(arg)
+
+
+def class_hash(model_class: type[pdt.BaseModel]) -> str:
+    """Return a hash of the definition of the model and the models it uses.
+
+    The hash covers the configuration and field definitions, including their
+    metadata, of every model reachable from the fields of the class.
+    """
+    digest = hashlib.sha256()
+    seen: set[type] = set()
+    pending = [model_class]
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        definition = (class_key(current), current.model_config, current.model_fields)
+        digest.update(_ADDRESS.sub("", repr(definition)).encode())
+        for field in current.model_fields.values():
+            pending.extend(_iter_model_types(field.annotation))
+    return digest.hexdigest()
+
+
+def iter_semantic_models() -> t.Iterator[type[SemanticModel]]:
+    """Import all schema modules and yield every `SemanticModel` subclass."""
+    from common_workflow_schemas import schemas
+    from common_workflow_schemas.common.mixins import SemanticModel
+
+    for module in sorted(set(schemas._MODULES.values())):
+        importlib.import_module(f"{schemas.__name__}.{module}")
+
+    seen: set[type] = set()
+    pending = list(SemanticModel.__subclasses__())
+    while pending:
+        model_class = pending.pop(0)
+        if model_class in seen:
+            continue
+        seen.add(model_class)
+        yield model_class
+        pending.extend(model_class.__subclasses__())
+
+
+def build_registry(path: t.Union[str, os.PathLike]) -> int:
+    """Write the headers of all `SemanticModel` subclasses to an artifact file.
+
+    Returns
+    -------
+    `int`
+        The number of registered classes.
+    """
+    from common_workflow_schemas.common.mixins import build_oo_ld_header
+
+    classes = {
+        class_key(model_class): {
+            "hash": class_hash(model_class),
+            "header": build_oo_ld_header(model_class),
+        }
+        for model_class in iter_semantic_models()
+    }
+    with open(path, "w") as fp:
+        json.dump({"version": __version__, "classes": classes}, fp)
+    return len(classes)
+
+
+def load_registry(path: t.Union[str, os.PathLike]) -> bool:
+    """Load an artifact file written by `build_registry`.
+
+    Returns
+    -------
+    `bool`
+        Whether the artifact was loaded, i.e. was built for this version.
+    """
+    with open(path) as fp:
+        artifact = json.load(fp)
+    if artifact.get("version") != __version__:
+        return False
+    REGISTRY.update(artifact["classes"])
+    return True
+
+
+def get_registered_header(model_class: type[pdt.BaseModel]) -> t.Optional[dict]:
+    """Return the pre-generated header of the class, if registered and current."""
+    global _env_loaded
+    if not _env_loaded:
+        _env_loaded = True
+        if path := os.environ.get(REGISTRY_ENV):
+            load_registry(path)
+    entry = REGISTRY.get(class_key(model_class))
+    if entry is None or entry["hash"] != class_hash(model_class):
+        return None
+    return entry["header"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the schema registry.")
+    parser.add_argument("path", help="The artifact file to write")
+    args = parser.parse_args()
+    print(f"Registered {build_registry(args.path)} classes in '{args.path}'")
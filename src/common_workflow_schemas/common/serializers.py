@@ -1,26 +1,371 @@
 import datetime
 import enum
 import typing as t
+import warnings
+import weakref
 
-import numpy as np
 import pydantic as pdt
+from pydantic_core import PydanticSerializationError, to_json, to_jsonable_python
 
+from common_workflow_schemas.common.codecs import (
+    ArrayCodec,
+    ListCodec,
+    get_array_codec,
+)
+from common_workflow_schemas.common.instrumentation import get_recorder
+from common_workflow_schemas.common.interning import (
+    any_interned,
+    interned_fields,
+    is_interned,
+)
+from common_workflow_schemas.common.types.numeric import is_array_field
+
+_OWN_FIELDS: weakref.WeakKeyDictionary[type, tuple[frozenset[str], frozenset[str]]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def serialization_fallback(
+    array_codec: t.Union[str, ArrayCodec] = "list",
+) -> t.Callable[[t.Any], t.Any]:
+    """Return the serializer of values pydantic cannot serialize in JSON mode.
+
+    These are the arrays held by free-form fields, e.g. `Engine.options`, which
+    are encoded with `array_codec`, and numpy scalars.
+    """
+    codec = get_array_codec(array_codec)
+
+    def fallback(value: t.Any) -> t.Any:
+        import numpy as np
+
+        if isinstance(value, np.ndarray):
+            return codec.encode(value)
+        if isinstance(value, np.generic):
+            return value.item()
+        raise PydanticSerializationError(
+            f"Unable to serialize unknown type: {type(value)}"
+        )
+
+    return fallback
+
+
+def serialize_field(
+    obj: t.Any,
+    array_codec: t.Union[str, ArrayCodec] = "list",
+) -> t.Any:
+    """Serialize a value of a python-mode dump to JSON-compatible data.
+
+    Deprecated, as `serialize_model` serializes models in a single pass.
+    """
+    warnings.warn(
+        "`serialize_field` is deprecated, use `serialize_model` instead",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    return _serialize_field(obj, get_array_codec(array_codec))
+
+
+def _serialize_field(obj: t.Any, array_codec: ArrayCodec) -> t.Any:
+    import numpy as np
 
-def serialize_field(obj: t.Any) -> t.Any:
     if isinstance(obj, dict):
-        return {k: serialize_field(v) for k, v in obj.items()}
+        return {k: _serialize_field(v, array_codec) for k, v in obj.items()}
     elif isinstance(obj, list):
-        return [serialize_field(v) for v in obj]
+        return [_serialize_field(v, array_codec) for v in obj]
     elif isinstance(obj, enum.Enum):
         return obj.value
     elif isinstance(obj, datetime.datetime):
         return obj.isoformat()
     elif isinstance(obj, np.ndarray):
-        return obj.tolist()
+        return array_codec.encode(obj)
     else:
         return obj
 
 
-def serialize_model(model: pdt.BaseModel) -> dict:
-    """Serialize fields of a Pydantic model to a dictionary."""
-    return {k: serialize_field(v) for k, v in model.model_dump().items()}
+def serialization_context(array_codec: t.Union[str, ArrayCodec] = "list") -> dict:
+    """Return the pydantic serialization context selecting the array codec."""
+    return {"array_codec": get_array_codec(array_codec)}
+
+
+class SharedEncodings:
+    """Memo of the encodings of interned sub-models, across the models of a batch.
+
+    Interned instances (see `common.interning`) are encoded once, and their
+    encoding reused by `serialize_model` and `serialize_model_json` for every
+    model holding them, the encodings being shared rather than copied. Entries
+    are keyed weakly by instance and dropped once it is garbage collected, such
+    that a long stream does not keep alive every instance it encoded. A memo
+    must only be used with one array codec.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[tuple[int, str], tuple[weakref.ref, t.Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, model: pdt.BaseModel, mode: str = "python") -> t.Optional[t.Any]:
+        """Return the encoding of the model in `mode`, `None` if not encoded yet."""
+        entry = self._entries.get((id(model), mode))
+        if entry is None or entry[0]() is not model:
+            return None
+        return entry[1]
+
+    def add(self, model: pdt.BaseModel, encoding: t.Any, mode: str = "python") -> None:
+        """Record the encoding of the model in `mode`, until it is released."""
+        key, entries = (id(model), mode), self._entries
+
+        def discard(ref: weakref.ref) -> None:
+            if (entry := entries.get(key)) is not None and entry[0] is ref:
+                del entries[key]
+
+        entries[key] = (weakref.ref(model, discard), encoding)
+
+
+def _own_fields(
+    model_class: type[pdt.BaseModel],
+) -> tuple[frozenset[str], frozenset[str]]:
+    """Return the fields that `serialize_model` may encode itself.
+
+    These are the `FloatArray` fields, and the fields that may hold interned
+    sub-models. Models with a custom model serializer, and fields with a field
+    serializer or excluded from dumps, are left to pydantic-core.
+    """
+    if (fields := _OWN_FIELDS.get(model_class)) is None:
+        decorators = model_class.__pydantic_decorators__
+        if decorators.model_serializers:
+            fields = (frozenset(), frozenset())
+        else:
+            serialized = {
+                name
+                for serializer in decorators.field_serializers.values()
+                for name in serializer.info.fields
+            }
+            names = {
+                name: field
+                for name, field in model_class.model_fields.items()
+                if not field.exclude and name not in serialized
+            }
+            fields = (
+                frozenset(
+                    name for name, field in names.items() if is_array_field(field)
+                ),
+                interned_fields(model_class) & names.keys(),
+            )
+        _OWN_FIELDS[model_class] = fields
+    return fields
+
+
+def _to_python(
+    model: pdt.BaseModel,
+    context: dict,
+    fallback: t.Callable[[t.Any], t.Any],
+    shared: t.Optional[SharedEncodings] = None,
+) -> dict:
+    serializer = model.__pydantic_serializer__
+    kwargs = {
+        "mode": "json",
+        "by_alias": False,
+        "context": context,
+        "fallback": fallback,
+    }
+    codec = context["array_codec"]
+    arrays, interned = _own_fields(type(model))
+    if type(codec) is not ListCodec:
+        arrays = frozenset()
+    if shared is None:
+        interned = frozenset()
+    if not arrays and not interned:
+        return serializer.to_python(model, **kwargs)
+    # pydantic-core would walk the nested lists of the arrays once more to
+    # check their items, which takes longer than converting them
+    data = serializer.to_python(model, exclude=arrays | interned, **kwargs)
+    result = {}
+    for name in type(model).model_fields:
+        if name in arrays:
+            value = getattr(model, name)
+            result[name] = None if value is None else codec.encode(value)
+        elif name in interned:
+            value = getattr(model, name)
+            result[name] = _encode_shared(value, context, fallback, shared)
+        elif name in data:
+            result[name] = data[name]
+    if len(result) < len(data) + len(arrays) + len(interned):
+        # Extra fields
+        result.update(data)
+    return result
+
+
+def _uses_shared(model: pdt.BaseModel, shared: t.Optional[SharedEncodings]) -> bool:
+    return shared is not None and any_interned() and _holds_interned(model)
+
+
+def _holds_interned(value: t.Any) -> bool:
+    if isinstance(value, pdt.BaseModel):
+        if is_interned(value):
+            return True
+        items = [value.__dict__.get(name) for name in _own_fields(type(value))[1]]
+    elif isinstance(value, dict):
+        items = value.values()
+    elif isinstance(value, (list, tuple)):
+        items = value
+    else:
+        return False
+    for item in items:
+        if _holds_interned(item):
+            return True
+    return False
+
+
+def _encode_shared(
+    value: t.Any,
+    context: dict,
+    fallback: t.Callable[[t.Any], t.Any],
+    shared: SharedEncodings,
+) -> t.Any:
+    """Encode a value that may hold interned sub-models, reusing their encodings."""
+    if isinstance(value, pdt.BaseModel):
+        if not is_interned(value):
+            return _to_python(value, context, fallback, shared)
+        if (encoding := shared.get(value)) is None:
+            encoding = _to_python(value, context, fallback, shared)
+            shared.add(value, encoding)
+        return encoding
+    if isinstance(value, dict):
+        keys = value.keys()
+        if not all(isinstance(key, str) for key in keys):
+            keys = to_jsonable_python(dict.fromkeys(keys)).keys()
+        return {
+            key: _encode_shared(item, context, fallback, shared)
+            for key, item in zip(keys, value.values())
+        }
+    if isinstance(value, (list, tuple)):
+        return [_encode_shared(item, context, fallback, shared) for item in value]
+    return to_jsonable_python(value, fallback=fallback)
+
+
+def serialize_model(
+    model: pdt.BaseModel,
+    array_codec: t.Union[str, ArrayCodec] = "list",
+    shared: t.Optional[SharedEncodings] = None,
+) -> dict:
+    """Serialize fields of a Pydantic model to a JSON-compatible dictionary.
+
+    The model is dumped in a single pydantic-core pass in JSON mode, where
+    enums, datetimes and the like are handled natively and `FloatArray` fields
+    are encoded with `array_codec`, given either as an `ArrayCodec` or as the
+    name of a registered codec (see `common.codecs`), as are arrays in
+    free-form fields (see `serialization_fallback`). With the `list` codec,
+    the `FloatArray` fields of the model itself are converted with
+    `ndarray.tolist` outside of the dump. If `shared` is given, the encodings
+    of interned sub-models are taken from, or added to, it, and shared with
+    the returned dictionary (see `SharedEncodings`).
+    """
+    context = serialization_context(array_codec)
+    fallback = serialization_fallback(context["array_codec"])
+    if not _uses_shared(model, shared):
+        shared = None
+    if (recorder := get_recorder()) is None:
+        return _to_python(model, context, fallback, shared)
+    with recorder.measure("serialize_model", type(model)):
+        return _to_python(model, context, fallback, shared)
+
+
+def serialize_model_json(
+    model: pdt.BaseModel,
+    array_codec: t.Union[str, ArrayCodec] = "list",
+    shared: t.Optional[SharedEncodings] = None,
+) -> bytes:
+    """Serialize fields of a Pydantic model directly to compact JSON bytes.
+
+    Equivalent to `json.dumps(serialize_model(model), separators=(",", ":"))`,
+    up to the escaping of non-ASCII characters, without building the
+    intermediate dictionary, unless the model holds interned sub-models and
+    `shared` is given, in which case their encodings are reused from it.
+    """
+    if (recorder := get_recorder()) is None:
+        return _to_json(model, array_codec, shared)
+    with recorder.measure("serialize_model_json", type(model)) as measurement:
+        data = _to_json(model, array_codec, shared)
+        measurement.bytes = len(data)
+    return data
+
+
+def _to_json(
+    model: pdt.BaseModel,
+    array_codec: t.Union[str, ArrayCodec],
+    shared: t.Optional[SharedEncodings],
+) -> bytes:
+    context = serialization_context(array_codec)
+    fallback = serialization_fallback(context["array_codec"])
+    if _uses_shared(model, shared):
+        return _model_json(model, context, fallback, shared)
+    return model.__pydantic_serializer__.to_json(
+        model,
+        context=context,
+        fallback=fallback,
+    )
+
+
+def _model_json(
+    model: pdt.BaseModel,
+    context: dict,
+    fallback: t.Callable[[t.Any], t.Any],
+    shared: SharedEncodings,
+) -> bytes:
+    serializer = model.__pydantic_serializer__
+    interned = _own_fields(type(model))[1]
+    if not interned:
+        return serializer.to_json(model, context=context, fallback=fallback)
+    leading = list(type(model).model_fields)[: len(interned)]
+    if interned.difference(leading):
+        return to_json(_to_python(model, context, fallback, shared))
+    # The fields holding interned sub-models come first, such that their
+    # encodings can be put in front of the dump of the other fields
+    items = [
+        b"%s:%s"
+        % (
+            to_json(name),
+            _encode_shared_json(getattr(model, name), context, fallback, shared),
+        )
+        for name in leading
+    ]
+    data = serializer.to_json(
+        model,
+        exclude=interned,
+        context=context,
+        fallback=fallback,
+    )
+    if data != b"{}":
+        items.append(data[1:-1])
+    return b"{%s}" % b",".join(items)
+
+
+def _encode_shared_json(
+    value: t.Any,
+    context: dict,
+    fallback: t.Callable[[t.Any], t.Any],
+    shared: SharedEncodings,
+) -> bytes:
+    """Encode a value to JSON like `_encode_shared`, reusing the JSON encodings."""
+    if isinstance(value, pdt.BaseModel):
+        if not is_interned(value):
+            return _model_json(value, context, fallback, shared)
+        if (encoding := shared.get(value, "json")) is None:
+            encoding = _model_json(value, context, fallback, shared)
+            shared.add(value, encoding, "json")
+        return encoding
+    if isinstance(value, dict):
+        keys = value.keys()
+        if not all(isinstance(key, str) for key in keys):
+            keys = to_jsonable_python(dict.fromkeys(keys)).keys()
+        return b"{%s}" % b",".join(
+            b"%s:%s"
+            % (to_json(key), _encode_shared_json(item, context, fallback, shared))
+            for key, item in zip(keys, value.values())
+        )
+    if isinstance(value, (list, tuple)):
+        return b"[%s]" % b",".join(
+            _encode_shared_json(item, context, fallback, shared) for item in value
+        )
+    return to_json(value, fallback=fallback)
@@ -0,0 +1,255 @@
+"""Construction of models from trusted data without full validation.
+
+Records that were validated when written, e.g. reloaded from a database,
+can be rebuilt with `model_construct` semantics for the whole tree: nested
+sub-models are constructed recursively, array fields are converted to
+`np.ndarray`s, and the Python-level validators of the models are not run.
+Only fields of types a plain JSON value cannot stand for, e.g. UUIDs,
+datetimes, enums, unions of models or containers of floats, are validated,
+each on its own, and integers given for `float` fields are converted, such
+that the models match those built by validation.
+
+`TrustedLoader` adds sampled full validation and a content checksum per
+record to catch corrupted rows. The checksum is the fingerprint of the model
+built from the record (see `common.fingerprint`), such that its arrays are
+hashed from their buffers once converted, rather than as nested lists.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import types
+import typing as t
+import weakref
+
+import numpy as np
+import pydantic as pdt
+from pydantic.fields import FieldInfo
+
+from common_workflow_schemas.common.codecs import decode_array
+from common_workflow_schemas.common.fingerprint import fingerprint
+from common_workflow_schemas.common.interning import intern_loaded
+from common_workflow_schemas.common.types.numeric import ArrayValidator
+
+M = t.TypeVar("M", bound=pdt.BaseModel)
+
+Kind = t.Literal["value", "float", "array", "model", "model_list", "model_map", "adapt"]
+
+# Validation converts integers to `float`, so that floats are not plain
+_PLAIN = (str, int, bool, dict, list, t.Any, type(None))
+
+# `X | None` annotations have their own origin from Python 3.10
+_UNIONS = (t.Union, getattr(types, "UnionType", t.Union))
+
+
+@dataclasses.dataclass(frozen=True)
+class _FieldPlan:
+    name: str
+    keys: tuple[str, ...]
+    kind: Kind
+    model: t.Optional[type[pdt.BaseModel]] = None
+    array: t.Optional[ArrayValidator] = None
+    adapter: t.Optional[pdt.TypeAdapter] = None
+
+
+_PLANS: weakref.WeakKeyDictionary[type, list[_FieldPlan]] = weakref.WeakKeyDictionary()
+
+
+def _strip(annotation: t.Any) -> t.Any:
+    """Strip `Annotated` and `Optional` wrappers of an annotation."""
+    while True:
+        if t.get_origin(annotation) is t.Annotated:
+            annotation = t.get_args(annotation)[0]
+            continue
+        args = [arg for arg in t.get_args(annotation) if arg is not type(None)]
+        if t.get_origin(annotation) in _UNIONS and len(args) == 1:
+            annotation = args[0]
+            continue
+        return annotation
+
+
+def _array_validator(field: FieldInfo) -> t.Optional[ArrayValidator]:
+    pending = [*field.metadata, field.annotation]
+    while pending:
+        entry = pending.pop()
+        if isinstance(entry, ArrayValidator):
+            return entry
+        pending.extend(getattr(entry, "__metadata__", ()))
+        pending.extend(t.get_args(entry))
+    return None
+
+
+def _is_model(annotation: t.Any) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, pdt.BaseModel)
+
+
+def _is_plain(annotation: t.Any) -> bool:
+    """Return whether JSON values are valid as is for the annotation."""
+    annotation = _strip(annotation)
+    origin = t.get_origin(annotation)
+    if origin is t.Literal:
+        return True
+    if origin in (*_UNIONS, list, dict):
+        return all(_is_plain(arg) for arg in t.get_args(annotation))
+    return annotation in _PLAIN
+
+
+def _field_plan(name: str, field: FieldInfo) -> _FieldPlan:
+    keys = (field.alias, name) if field.alias and field.alias != name else (name,)
+    if (array := _array_validator(field)) is not None:
+        return _FieldPlan(name, keys, "array", array=array)
+    annotation = _strip(field.annotation)
+    origin, args = t.get_origin(annotation), t.get_args(annotation)
+    if _is_model(annotation):
+        return _FieldPlan(name, keys, "model", annotation)
+    if origin is list and args and _is_model(item := _strip(args[0])):
+        return _FieldPlan(name, keys, "model_list", item)
+    if (
+        origin is dict
+        and len(args) == 2
+        and _is_model(item := _strip(args[1]))
+        and _is_plain(args[0])
+    ):
+        return _FieldPlan(name, keys, "model_map", item)
+    if annotation is float:
+        return _FieldPlan(name, keys, "float")
+    if _is_plain(annotation):
+        return _FieldPlan(name, keys, "value")
+    return _FieldPlan(name, keys, "adapt", adapter=pdt.TypeAdapter(field.annotation))
+
+
+def _get_plan(model_class: type[pdt.BaseModel]) -> list[_FieldPlan]:
+    if (plan := _PLANS.get(model_class)) is None:
+        plan = [
+            _field_plan(name, field) for name, field in model_class.model_fields.items()
+        ]
+        _PLANS[model_class] = plan
+    return plan
+
+
+def _construct_value(plan: _FieldPlan, value: t.Any) -> t.Any:
+    if value is None or plan.kind == "value":
+        return value
+    if plan.kind == "float":
+        return float(value)
+    if plan.kind == "array":
+        if isinstance(value, dict):
+            value = decode_array(value)
+        return np.ascontiguousarray(value, dtype=plan.array.dtype)
+    if plan.kind == "model":
+        return construct_trusted(plan.model, value)
+    if plan.kind == "model_list":
+        return [construct_trusted(plan.model, item) for item in value]
+    if plan.kind == "model_map":
+        return {key: construct_trusted(plan.model, item) for key, item in value.items()}
+    return plan.adapter.validate_python(value)
+
+
+def construct_trusted(model_class: type[M], data: t.Any) -> M:
+    """Construct a model and its sub-models from trusted data, without validation.
+
+    Missing fields take their defaults and unknown keys are dropped, as with
+    `model_construct`. Instances of the model are returned as is.
+    """
+    if isinstance(data, model_class):
+        return data
+    values = {}
+    for plan in _get_plan(model_class):
+        for key in plan.keys:
+            if key in data:
+                values[plan.name] = _construct_value(plan, data[key])
+                break
+    return model_class.model_construct(**values)
+
+
+class ChecksumError(ValueError):
+    """Raised when a trusted record does not match its checksum."""
+
+
+def record_checksum(
+    record: t.Any,
+    model_class: t.Optional[type[pdt.BaseModel]] = None,
+) -> str:
+    """Return the checksum of a record, to be stored along with it.
+
+    The record is either the model written, or its data, then built as
+    `model_class` with `construct_trusted`.
+    """
+    if model_class is not None:
+        record = construct_trusted(model_class, record)
+    elif not isinstance(record, pdt.BaseModel):
+        raise TypeError("The `model_class` of a record given as data is required")
+    return fingerprint(record)
+
+
+class TrustedLoader(t.Generic[M]):
+    """Constructs trusted records, fully validating a sample of them.
+
+    Parameters
+    ----------
+    `model_class` : `type[BaseModel]`
+        The model of the records.
+    `validate_every` : `int`
+        Every `validate_every`-th record, starting with the first one, is
+        fully validated instead. `0` disables validation.
+    `kwargs`
+        Keyword arguments of `model_validate` for the validated records. All
+        records are interned if the `context` selects an intern table (see
+        `common.interning`).
+    """
+
+    def __init__(
+        self,
+        model_class: type[M],
+        validate_every: int = 0,
+        **kwargs,
+    ) -> None:
+        if validate_every < 0:
+            raise ValueError("`validate_every` must not be negative")
+        self.model_class = model_class
+        self.validate_every = validate_every
+        self.kwargs = kwargs
+        self.loaded = 0
+        self.validated = 0
+
+    def load(self, data: t.Any, checksum: t.Optional[str] = None) -> M:
+        """Build the model of a record, checking it against its checksum if given.
+
+        Raises a `ChecksumError` on mismatch, and a `pydantic.ValidationError`
+        if the record is sampled for validation and invalid.
+        """
+        index = self.loaded
+        self.loaded += 1
+        if self.validate_every and index % self.validate_every == 0:
+            self.validated += 1
+            model = self.model_class.model_validate(data, **self.kwargs)
+        else:
+            model = construct_trusted(self.model_class, data)
+        if checksum is not None and record_checksum(model) != checksum:
+            raise ChecksumError(
+                f"Record {index} does not match its checksum '{checksum}'"
+            )
+        return intern_loaded(model, self.kwargs.get("context"))
+
+    def load_many(
+        self,
+        records: t.Iterable[t.Any],
+        checksums: t.Optional[t.Iterable[t.Optional[str]]] = None,
+    ) -> t.Iterator[M]:
+        """Lazily build the models of many records.
+
+        Raises a `ValueError` if there are fewer or more `checksums` than
+        records.
+        """
+        if checksums is None:
+            for data in records:
+                yield self.load(data)
+            return
+        missing = object()
+        checksums = iter(checksums)
+        for data in records:
+            if (checksum := next(checksums, missing)) is missing:
+                raise ValueError(f"Missing the checksum of record {self.loaded}")
+            yield self.load(data, checksum)
+        if next(checksums, missing) is not missing:
+            raise ValueError("More checksums than records")
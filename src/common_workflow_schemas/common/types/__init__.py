@@ -1,7 +1,27 @@
+"""Annotated field types of the schemas.
+
+The array types are imported on first access, such that schemas using only
+`UniqueIdentifier` do not import `numpy`.
+"""
+
+import importlib
+import typing as t
+
 from .identifier import UniqueIdentifier
-from .numeric import FloatArray
+
+if t.TYPE_CHECKING:
+    from .numeric import FloatArray, ShapedFloatArray
 
 __all__ = [
     "FloatArray",
+    "ShapedFloatArray",
     "UniqueIdentifier",
 ]
+
+
+def __getattr__(name: str) -> t.Any:
+    if name not in ("FloatArray", "ShapedFloatArray"):
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(importlib.import_module(".numeric", __name__), name)
+    globals()[name] = value
+    return value
@@ -3,13 +3,167 @@ import typing as t
 import numpy as np
 import numpy.typing as npt
 import pydantic as pdt
+from pydantic.fields import FieldInfo
+from pydantic_core import core_schema
 
-FloatArray = t.Annotated[
-    npt.NDArray[np.float64],
-    pdt.WithJsonSchema(
-        {
-            "type": "array",
-            "items": {"type": "number"},
-        }
-    ),
-]
+from common_workflow_schemas.common.codecs import ARRAY_CODECS, decode_array
+
+Casting = t.Literal["no", "equiv", "safe", "same_kind", "unsafe"]
+
+
+class ArrayValidator:
+    """Pydantic annotation validating inputs into contiguous `np.ndarray`s.
+
+    Nested lists, JSON arrays and encoded payloads (see `common.codecs`) are
+    converted in a single vectorized `numpy` call rather than element by
+    element. Conforming arrays are passed through without copying, such that
+    memory-mapped arrays are not read until accessed.
+
+    Codecs given as `{"array_codecs": {name: codec}}` in the validation context
+    take precedence over the registered ones, e.g.
+    `RelaxOutputs.model_validate(data, context={"array_codecs": {"npy":
+    SidecarCodec(directory)}})` to load sidecar files from `directory`. In
+    JSON mode, arrays are serialized with the codec given as
+    `{"array_codec": codec}` in the serialization context, `list` by default.
+
+    Parameters
+    ----------
+    `shape` : `tuple[int | None, ...]`, optional
+        The expected shape, where `None` matches any extent along that axis.
+        If not provided, arrays of any shape are accepted.
+    `dtype` : `np.dtype`
+        The dtype of the validated array.
+    `casting` : `str`
+        The `numpy` casting rule applied when converting inputs to `dtype`.
+    """
+
+    def __init__(
+        self,
+        shape: t.Optional[tuple[t.Optional[int], ...]] = None,
+        dtype: npt.DTypeLike = np.float64,
+        casting: Casting = "same_kind",
+    ) -> None:
+        self.shape = shape
+        self.dtype = np.dtype(dtype)
+        self.casting = casting
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(shape={self.shape}, dtype={self.dtype}, "
+            f"casting='{self.casting}')"
+        )
+
+    def __get_pydantic_core_schema__(
+        self,
+        source_type: t.Any,
+        handler: pdt.GetCoreSchemaHandler,
+    ) -> core_schema.CoreSchema:
+        return core_schema.with_info_plain_validator_function(
+            self.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                self.serialize,
+                info_arg=True,
+                when_used="json",
+            ),
+        )
+
+    def __get_pydantic_json_schema__(
+        self,
+        schema: core_schema.CoreSchema,
+        handler: pdt.GetJsonSchemaHandler,
+    ) -> dict:
+        json_schema: dict = {"type": "number"}
+        for extent in reversed(self.shape or (None,)):
+            json_schema = {"type": "array", "items": json_schema}
+            if extent is not None:
+                json_schema["minItems"] = json_schema["maxItems"] = extent
+        return json_schema
+
+    def serialize(
+        self,
+        array: np.ndarray,
+        info: core_schema.SerializationInfo,
+    ) -> t.Any:
+        """Encode the array with the codec given in the serialization context."""
+        codec = (info.context or {}).get("array_codec") or ARRAY_CODECS["list"]
+        return codec.encode(array)
+
+    def validate(
+        self,
+        value: t.Any,
+        info: t.Optional[core_schema.ValidationInfo] = None,
+    ) -> np.ndarray:
+        if isinstance(value, dict):
+            context = (info and info.context) or {}
+            value = decode_array(value, context.get("array_codecs"))
+        if not isinstance(value, np.ndarray):
+            value = np.asarray(value)
+        if value.dtype.kind not in "biuf" or not np.can_cast(
+            value.dtype, self.dtype, casting=self.casting
+        ):
+            raise ValueError(
+                f"Cannot cast array of dtype '{value.dtype}' to '{self.dtype}' "
+                f"with '{self.casting}' casting"
+            )
+        array = np.ascontiguousarray(value, dtype=self.dtype)
+        if self.shape is not None and (
+            array.ndim != len(self.shape)
+            or any(
+                expected is not None and extent != expected
+                for extent, expected in zip(array.shape, self.shape)
+            )
+        ):
+            expected_shape = tuple("N" if e is None else e for e in self.shape)
+            raise ValueError(
+                f"Expected an array of shape {expected_shape}, got {array.shape}"
+            )
+        return array
+
+
+def is_array_annotation(annotation: t.Any) -> bool:
+    """Return whether the annotation is, or optionally is, a `FloatArray`."""
+    metadata = getattr(annotation, "__metadata__", ())
+    if any(isinstance(entry, ArrayValidator) for entry in metadata):
+        return True
+    return any(is_array_annotation(arg) for arg in t.get_args(annotation))
+
+
+def is_array_field(field: FieldInfo) -> bool:
+    """Return whether the model field is, or optionally is, a `FloatArray`.
+
+    The metadata of a required field is moved by pydantic from its annotation
+    to the field itself.
+    """
+    if any(isinstance(entry, ArrayValidator) for entry in field.metadata):
+        return True
+    return is_array_annotation(field.annotation)
+
+
+def ShapedFloatArray(
+    *shape: t.Optional[int],
+    dtype: npt.DTypeLike = np.float64,
+    casting: Casting = "same_kind",
+) -> t.Any:
+    """Return a `FloatArray` type constrained to the given shape.
+
+    Parameters
+    ----------
+    `shape` : `int | None`
+        The extent along each axis, `None` matching any extent.
+    `dtype` : `np.dtype`
+        The dtype of the validated array.
+    `casting` : `str`
+        The `numpy` casting rule applied when converting inputs to `dtype`.
+
+    Returns
+    -------
+    `type`
+        The annotated array type.
+    """
+    return t.Annotated[
+        npt.NDArray[np.float64],
+        ArrayValidator(shape or None, dtype=dtype, casting=casting),
+    ]
+
+
+FloatArray = ShapedFloatArray()
@@ -0,0 +1,74 @@
+"""Input/output schemas of the common workflows.
+
+The schema classes are exposed lazily, such that accessing e.g. `Code` does
+not import the modules of, and dependencies of, the other schemas.
+"""
+
+import importlib
+import typing as t
+
+if t.TYPE_CHECKING:
+    from .code import Code, ExecutionEnvironment, Package, PackageManager
+    from .columnar import CompositeOutputsColumns
+    from .composite import CompositeInputs, CompositeOutputs
+    from .dissociation import DcCommonRelaxInputs, DcInput, DcOutput
+    from .engine import Engine
+    from .eos import EosCommonRelaxInputs, EosInputs, EosOutputs
+    from .relax import CommonRelaxInputs, RelaxInputs, RelaxOutputs
+    from .trajectory import RelaxTrajectory
+
+_MODULES = {
+    "Code": "code",
+    "ExecutionEnvironment": "code",
+    "Package": "code",
+    "PackageManager": "code",
+    "Engine": "engine",
+    "CommonRelaxInputs": "relax",
+    "RelaxInputs": "relax",
+    "RelaxOutputs": "relax",
+    "RelaxTrajectory": "trajectory",
+    "CompositeInputs": "composite",
+    "CompositeOutputs": "composite",
+    "CompositeOutputsColumns": "columnar",
+    "EosCommonRelaxInputs": "eos",
+    "EosInputs": "eos",
+    "EosOutputs": "eos",
+    "DcCommonRelaxInputs": "dissociation",
+    "DcInput": "dissociation",
+    "DcOutput": "dissociation",
+}
+
+__all__ = [
+    "Code",
+    "CommonRelaxInputs",
+    "CompositeInputs",
+    "CompositeOutputs",
+    "CompositeOutputsColumns",
+    "DcCommonRelaxInputs",
+    "DcInput",
+    "DcOutput",
+    "Engine",
+    "EosCommonRelaxInputs",
+    "EosInputs",
+    "EosOutputs",
+    "ExecutionEnvironment",
+    "Package",
+    "PackageManager",
+    "RelaxInputs",
+    "RelaxOutputs",
+    "RelaxTrajectory",
+]
+
+
+def __getattr__(name: str) -> t.Any:
+    try:
+        module = _MODULES[name]
+    except KeyError:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'") from None
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_MODULES})
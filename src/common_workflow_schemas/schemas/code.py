@@ -2,11 +2,11 @@ import typing as t
 
 from common_workflow_schemas.common.context import BASE_PREFIX
 from common_workflow_schemas.common.field import MetadataField
-from common_workflow_schemas.common.mixins import SemanticModel
+from common_workflow_schemas.common.mixins import InternableModel
 from common_workflow_schemas.common.types import UniqueIdentifier
 
 
-class PackageManager(SemanticModel):
+class PackageManager(InternableModel):
     _IRI = f"{BASE_PREFIX}/PackageManager"
 
     name: t.Annotated[
@@ -25,7 +25,7 @@ class PackageManager(SemanticModel):
     ]
 
 
-class Package(SemanticModel):
+class Package(InternableModel):
     _IRI = f"{BASE_PREFIX}/Package"
 
     name: t.Annotated[
@@ -51,7 +51,7 @@ class Package(SemanticModel):
     ]
 
 
-class ExecutionEnvironment(SemanticModel):
+class ExecutionEnvironment(InternableModel):
     _IRI: str = f"{BASE_PREFIX}/ExecutionEnvironment"
 
     name: t.Annotated[
@@ -70,7 +70,7 @@ class ExecutionEnvironment(SemanticModel):
     ]
 
 
-class Code(SemanticModel):
+class Code(InternableModel):
     _IRI: str = f"{BASE_PREFIX}/Code"
 
     identifier: t.Annotated[
@@ -0,0 +1,171 @@
+import itertools
+import os
+import typing as t
+
+import numpy as np
+
+from .composite import CompositeOutputs
+
+
+class CompositeOutputsColumns:
+    """Columnar (struct-of-arrays) view of a collection of `CompositeOutputs`.
+
+    The per-point quantities of all outputs, e.g. the total energy of each
+    sub-process, are stored in flat contiguous arrays. The points of output
+    `i` are found at `offsets[i]:offsets[i + 1]`. Quantities that an output
+    does not define, e.g. the distances of an `EosOutputs`, are `NaN`.
+
+    Parameters
+    ----------
+    `offsets` : `np.ndarray`
+        The `(n_outputs + 1,)` offsets of the points of each output.
+    `columns` : `dict[str, np.ndarray]`
+        The flat per-point arrays, keyed by `COLUMNS` entries.
+    `types` : `np.ndarray`
+        The `(n_outputs,)` class names of the outputs.
+    """
+
+    COLUMNS = ("total_energies", "total_magnetizations", "distances", "volumes")
+
+    def __init__(
+        self,
+        offsets: np.ndarray,
+        columns: t.Mapping[str, np.ndarray],
+        types: np.ndarray,
+    ) -> None:
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.types = np.asarray(types, dtype=str)
+        self.columns = {key: np.asarray(columns[key]) for key in columns}
+        if unknown := set(self.columns) - set(self.COLUMNS):
+            raise ValueError(f"Unknown columns {sorted(unknown)}")
+        if len(self.types) != len(self):
+            raise ValueError("Expected one type per output")
+        for key, column in self.columns.items():
+            if column.shape != (self.offsets[-1],):
+                raise ValueError(f"Column '{key}' does not match the offsets")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.columns[key]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """The number of points of each output."""
+        return np.diff(self.offsets)
+
+    @property
+    def row_indices(self) -> np.ndarray:
+        """The index of the output of each point."""
+        return np.repeat(np.arange(len(self)), self.lengths)
+
+    @classmethod
+    def from_models(
+        cls,
+        models: t.Iterable[CompositeOutputs],
+    ) -> "CompositeOutputsColumns":
+        """Pack the parallel per-point lists of the outputs into columns."""
+        models = list(models)
+        lengths = [len(model.total_energies) for model in models]
+        offsets = np.zeros(len(models) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        def column(values: t.Callable[[CompositeOutputs], t.Any]) -> np.ndarray:
+            rows = []
+            for model, length in zip(models, lengths):
+                row = values(model)
+                if row is None:
+                    row = itertools.repeat(np.nan, length)
+                elif len(row) != length:
+                    raise ValueError(
+                        f"Expected {length} values per point list of "
+                        f"`{type(model).__name__}`, got {len(row)}"
+                    )
+                rows.append(row)
+            return np.fromiter(
+                itertools.chain.from_iterable(rows),
+                dtype=np.float64,
+                count=offsets[-1],
+            )
+
+        columns = {
+            "total_energies": column(lambda m: m.total_energies),
+            "total_magnetizations": column(lambda m: m.total_magnetizations),
+        }
+        if any(hasattr(model, "distances") for model in models):
+            columns["distances"] = column(lambda m: getattr(m, "distances", None))
+        if any(hasattr(model, "structures") for model in models):
+            columns["volumes"] = column(_volumes)
+        return cls(offsets, columns, [type(model).__name__ for model in models])
+
+    def select(self, mask: np.ndarray) -> "CompositeOutputsColumns":
+        """Return the outputs selected by a boolean mask or index array."""
+        rows = np.arange(len(self))[mask]
+        lengths = self.lengths[rows]
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # Gather the points of the selected rows without a Python loop
+        points = np.repeat(self.offsets[rows] - offsets[:-1], lengths)
+        points += np.arange(offsets[-1])
+        return type(self)(
+            offsets,
+            {key: column[points] for key, column in self.columns.items()},
+            self.types[rows],
+        )
+
+    def select_points(self, mask: np.ndarray) -> "CompositeOutputsColumns":
+        """Return the points selected by a per-point boolean mask.
+
+        Outputs keep their position, possibly with no points left.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        counts = np.bincount(self.row_indices[mask], minlength=len(self))
+        np.cumsum(counts, out=offsets[1:])
+        return type(self)(
+            offsets,
+            {key: column[mask] for key, column in self.columns.items()},
+            self.types,
+        )
+
+    def reduce(self, key: str, ufunc: np.ufunc = np.minimum) -> np.ndarray:
+        """Reduce a column per output, e.g. the minimum energy of each output.
+
+        Outputs without points reduce to `NaN`. Use e.g. `np.fmin` to ignore
+        missing values of other outputs.
+        """
+        result = np.full(len(self), np.nan)
+        nonempty = self.lengths > 0
+        if nonempty.any():
+            starts = self.offsets[:-1][nonempty]
+            result[nonempty] = ufunc.reduceat(self.columns[key], starts)
+        return result
+
+    def save(self, path: t.Union[str, os.PathLike]) -> None:
+        """Save the columns to an uncompressed `.npz` file."""
+        np.savez(path, offsets=self.offsets, types=self.types, **self.columns)
+
+    @classmethod
+    def load(cls, path: t.Union[str, os.PathLike]) -> "CompositeOutputsColumns":
+        """Load columns saved with `save`."""
+        with np.load(path, allow_pickle=False) as data:
+            columns = {key: data[key] for key in cls.COLUMNS if key in data}
+            return cls(data["offsets"], columns, data["types"])
+
+
+def _volumes(model: CompositeOutputs) -> t.Optional[np.ndarray]:
+    """Return the cell volumes of the structures of the output, if any."""
+    if (structures := getattr(model, "structures", None)) is None:
+        return None
+    lattices = np.array(
+        [
+            [
+                [np.nan if value is None else value for value in vector]
+                for vector in structure.attributes.lattice_vectors or [[None] * 3] * 3
+            ]
+            for structure in structures
+        ],
+        dtype=np.float64,
+    )
+    return np.abs(np.linalg.det(lattices)) if len(lattices) else lattices
@@ -1,11 +1,11 @@
 import typing as t
 
 import pydantic as pdt
-from aiida.plugins import WorkflowFactory
 
 from common_workflow_schemas.common.context import BASE_PREFIX
 from common_workflow_schemas.common.field import MetadataField
 from common_workflow_schemas.common.mixins import SemanticModel
+from common_workflow_schemas.common.ports import find_invalid_port, get_port_names
 from common_workflow_schemas.schemas.relax import TotalEnergy, TotalMagnetization
 
 SM = t.TypeVar("SM", bound=SemanticModel)
@@ -35,7 +35,8 @@ class CompositeInputs(t.Generic[SM]):
     ]
 
     @pdt.field_validator("sub_process_class")
-    def _validate_sub_process_class(self, sub_process_entry_point: str):
+    @classmethod
+    def _validate_sub_process_class(cls, sub_process_entry_point: str):
         if not sub_process_entry_point.startswith("common_workflows.relax."):
             raise ValueError(
                 f"`sub_process_class` should start with 'common_workflows.relax.', got "
@@ -44,14 +45,20 @@ class CompositeInputs(t.Generic[SM]):
         return sub_process_entry_point
 
     @pdt.field_validator("sub_process")
-    def _validate_sub_process(self, sub_process_dict: dict[str, t.Any]):
-        workchain = WorkflowFactory(self.sub_process_class)
-        for key in sub_process_dict:
-            if not hasattr(workchain, key):
-                raise ValueError(
-                    f"Invalid input key '{key}' for sub-process class"
-                    f"'{self.sub_process_class}'"
-                )
+    @classmethod
+    def _validate_sub_process(
+        cls,
+        sub_process_dict: dict[str, t.Any],
+        info: pdt.ValidationInfo,
+    ):
+        if (sub_process_class := info.data.get("sub_process_class")) is None:
+            return sub_process_dict
+        ports = get_port_names(sub_process_class)
+        if key := find_invalid_port(ports, sub_process_dict):
+            raise ValueError(
+                f"Invalid input key '{key}' for sub-process class '{sub_process_class}'"
+            )
+        return sub_process_dict
 
 
 class CompositeOutputs(SemanticModel):
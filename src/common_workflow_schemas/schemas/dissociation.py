@@ -1,5 +1,7 @@
+import dataclasses
 import typing as t
 
+import numpy as np
 import pydantic as pdt
 from optimade.models import StructureResource
 
@@ -9,6 +11,7 @@ from common_workflow_schemas.common.mixins import SemanticModel, WithArbitraryTy
 
 from .composite import CompositeInputs, CompositeOutputs
 from .relax import CommonRelaxInputs
+from .structures import StructureBatch, site_indices, structure_arrays
 
 
 BondDistance = t.Annotated[
@@ -21,6 +24,79 @@ BondDistance = t.Annotated[
 ]
 
 
+def _bond_sites(
+    bond: tuple[int, int],
+    moving: t.Optional[t.Sequence[int]],
+    nsites: int,
+) -> tuple[tuple[int, int], tuple[int, ...]]:
+    """Check the bond and moving sites, the latter defaulting to the second site."""
+    bond = site_indices(bond, nsites, "bond sites")
+    if len(bond) != 2:
+        raise ValueError(f"A bond should have 2 sites, got {bond}")
+    moving = site_indices(
+        (bond[1],) if moving is None else moving, nsites, "moving sites"
+    )
+    if bond[0] in moving:
+        raise ValueError(f"The fixed site {bond[0]} of the bond cannot move")
+    if bond[1] not in moving:
+        raise ValueError(f"The site {bond[1]} of the bond should move")
+    return bond, moving
+
+
+@dataclasses.dataclass(frozen=True)
+class DisplacedStructures(StructureBatch):
+    """Geometries of a molecule with a bond stretched to given distances."""
+
+    distances: np.ndarray
+    bond: tuple[int, int]
+    moving: tuple[int, ...]
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        if self.distances.shape != (len(self),):
+            raise ValueError(
+                f"Expected {len(self)} distances, got {self.distances.shape}"
+            )
+        _bond_sites(self.bond, self.moving, self.nsites)
+
+    @classmethod
+    def from_structure(
+        cls,
+        structure: StructureResource,
+        distances: np.ndarray,
+        bond: tuple[int, int] = (0, 1),
+        moving: t.Optional[t.Sequence[int]] = None,
+    ) -> "DisplacedStructures":
+        """Set the bond length of the molecule to each of the distances.
+
+        The sites in `moving`, by default the second site of the bond, are
+        translated along the bond direction while the others stay fixed. The
+        moving sites must include the second site of the bond and exclude the
+        first. All geometries are computed in one `(n_distances, n_sites, 3)`
+        array, and the unchanged lattice vectors are a read-only broadcast
+        view.
+        """
+        distances = np.asarray(distances, dtype=np.float64)
+        lattice, positions = structure_arrays(structure)
+        (first, second), moving = _bond_sites(bond, moving, len(positions))
+        vector = positions[second] - positions[first]
+        length = np.linalg.norm(vector)
+        if length == 0:
+            raise ValueError(f"The sites of bond {bond} coincide")
+
+        displaced = np.repeat(positions[None], len(distances), axis=0)
+        shifts = (distances - length)[:, None] * (vector / length)
+        displaced[:, list(moving)] += shifts[:, None]
+        return cls(
+            structure=structure,
+            lattice_vectors=np.broadcast_to(lattice, (len(distances), 3, 3)),
+            cartesian_site_positions=displaced,
+            distances=distances,
+            bond=(first, second),
+            moving=moving,
+        )
+
+
 class DcCommonRelaxInputs(CommonRelaxInputs):
     _IRI = f"{BASE_PREFIX}/relax/dc/Input"
 
@@ -83,8 +159,30 @@ class DcInput(
         ),
     ] = 3
 
-    @pdt.model_validator(mode="before")
-    def _validate_min_max_distance(self, data: dict):
+    def get_distances(self) -> np.ndarray:
+        """Return the distances, from `distances` or the count, min and max."""
+        if self.distances:
+            return np.asarray(self.distances, dtype=np.float64)
+        return np.linspace(self.distance_min, self.distance_max, self.distance_count)
+
+    def get_displaced_structures(
+        self,
+        bond: tuple[int, int] = (0, 1),
+        moving: t.Optional[t.Sequence[int]] = None,
+    ) -> DisplacedStructures:
+        """Return the geometries of the molecule at each of the distances.
+
+        See `DisplacedStructures.from_structure`.
+        """
+        return DisplacedStructures.from_structure(
+            self.molecule,
+            self.get_distances(),
+            bond=bond,
+            moving=moving,
+        )
+
+    @pdt.model_validator(mode="after")
+    def _validate_min_max_distance(self) -> "DcInput":
         if self.distance_min >= self.distance_max:
             raise ValueError(
                 "The minimum distance should be smaller than the maximum distance"
@@ -2,12 +2,12 @@ import typing as t
 
 from common_workflow_schemas.common.context import BASE_PREFIX
 from common_workflow_schemas.common.field import MetadataField
-from common_workflow_schemas.common.mixins import SemanticModel
+from common_workflow_schemas.common.mixins import InternableModel
 
 from .code import Code
 
 
-class Engine(SemanticModel):
+class Engine(InternableModel):
     _IRI = f"{BASE_PREFIX}/Engine"
 
     code: t.Annotated[
@@ -1,5 +1,7 @@
+import dataclasses
 import typing as t
 
+import numpy as np
 import pydantic as pdt
 from optimade.models import StructureResource
 
@@ -9,6 +11,44 @@ from common_workflow_schemas.common.mixins import SemanticModel, WithArbitraryTy
 
 from .composite import CompositeInputs, CompositeOutputs
 from .relax import CommonRelaxInputs
+from .structures import StructureBatch, structure_arrays
+
+
+@dataclasses.dataclass(frozen=True)
+class StrainedStructures(StructureBatch):
+    """Structures obtained by scaling the volume of a structure."""
+
+    scale_factors: np.ndarray
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        if self.scale_factors.shape != (len(self),):
+            raise ValueError(
+                f"Expected {len(self)} scale factors, got {self.scale_factors.shape}"
+            )
+        if not np.all(self.scale_factors > 0):
+            raise ValueError("Scale factors must be positive")
+
+    @classmethod
+    def from_structure(
+        cls,
+        structure: StructureResource,
+        scale_factors: np.ndarray,
+    ) -> "StrainedStructures":
+        """Scale the volume of the structure by each of the scale factors.
+
+        Lattice vectors and positions are scaled by the cube root of the
+        factors, for all factors in a single broadcast operation.
+        """
+        scale_factors = np.asarray(scale_factors, dtype=np.float64)
+        linear = np.cbrt(scale_factors)[:, None, None]
+        lattice, positions = structure_arrays(structure)
+        return cls(
+            structure=structure,
+            lattice_vectors=linear * lattice,
+            cartesian_site_positions=linear * positions,
+            scale_factors=scale_factors,
+        )
 
 
 class EosCommonRelaxInputs(CommonRelaxInputs):
@@ -64,19 +104,42 @@ class EosInputs(
         ),
     ]
 
+    def get_scale_factors(self) -> np.ndarray:
+        """Return the scale factors, from `scale_factors` or the count and increment.
+
+        The `scale_count` factors are spaced by `scale_increment` around 1.
+        """
+        if self.scale_factors:
+            return np.asarray(self.scale_factors, dtype=np.float64)
+        count, increment = self.scale_count, self.scale_increment
+        return 1 + increment * (np.arange(count) - (count - 1) / 2)
+
+    def get_strained_structures(self) -> StrainedStructures:
+        """Return the structures with volumes scaled by the scale factors."""
+        return StrainedStructures.from_structure(
+            self.structure,
+            self.get_scale_factors(),
+        )
+
     @pdt.model_validator(mode="before")
-    def _validate_scale_factors_inputs(self, data: dict):
-        if not self.scale_factors and not (self.scale_count and self.scale_increment):
+    @classmethod
+    def _validate_scale_factors_inputs(cls, data: t.Any):
+        if not isinstance(data, dict):
+            return data
+        if not data.get("scale_factors") and not (
+            data.get("scale_count") and data.get("scale_increment")
+        ):
             raise ValueError(
                 "Either `scale_factors` or both `scale_count` and `scale_increment` should be specified."
             )
-        return self
+        return data
 
     @pdt.field_validator("scale_factors")
-    def _validate_scale_factors(self, scale_factors):
+    @classmethod
+    def _validate_scale_factors(cls, scale_factors):
         if scale_factors is None:
             return scale_factors
-        if not all(isinstance(factor, float | int) for factor in scale_factors):
+        if not all(isinstance(factor, (float, int)) for factor in scale_factors):
             raise ValueError(
                 "`scale_factors` should be an AiiDA `List` of integers or floats"
             )
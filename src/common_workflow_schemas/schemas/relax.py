@@ -6,7 +6,10 @@ from optimade.models import StructureResource
 from common_workflow_schemas.common.context import BASE_PREFIX
 from common_workflow_schemas.common.field import MetadataField
 from common_workflow_schemas.common.mixins import SemanticModel, WithArbitraryTypes
-from common_workflow_schemas.common.types import FloatArray, UniqueIdentifier
+from common_workflow_schemas.common.types import (
+    ShapedFloatArray,
+    UniqueIdentifier,
+)
 
 from .engine import Engine
 
@@ -145,7 +148,7 @@ class RelaxOutputs(
     _IRI = f"{BASE_PREFIX}/relax/Output"
 
     forces: t.Annotated[
-        FloatArray,
+        ShapedFloatArray(None, 3),
         MetadataField(
             description="The forces on the atoms.",
             iri=f"{BASE_PREFIX}/Forces",
@@ -162,7 +165,7 @@ class RelaxOutputs(
     ] = None
     total_energy: TotalEnergy
     stress: t.Annotated[
-        t.Optional[FloatArray],
+        t.Optional[ShapedFloatArray(3, 3)],
         MetadataField(
             description="The final stress tensor in eV/Å^3, if relaxation was performed.",
             iri=f"{BASE_PREFIX}/relax/Stress",
@@ -171,7 +174,7 @@ class RelaxOutputs(
     ]
     total_magnetization: t.Optional[TotalMagnetization] = None
     hartree_potential: t.Annotated[
-        t.Optional[FloatArray],
+        t.Optional[ShapedFloatArray(None, None, None)],
         MetadataField(
             description="The Hartree potential.",
             iri=f"{BASE_PREFIX}/scf/HartreePotential",
@@ -179,7 +182,7 @@ class RelaxOutputs(
         ),
     ] = None
     charge_density: t.Annotated[
-        t.Optional[FloatArray],
+        t.Optional[ShapedFloatArray(None, None, None)],
         MetadataField(
             description="The total magnetization of the system in μB.",
             iri=f"{BASE_PREFIX}/scf/ChargeDensity",
@@ -0,0 +1,107 @@
+import dataclasses
+import math
+import typing as t
+
+import numpy as np
+from optimade.models import StructureResource
+
+
+def nested_to_array(values: t.Optional[list], width: int = 3) -> np.ndarray:
+    """Convert nested lists of numbers, possibly `None`, to a 2D array of `NaN`s."""
+    if values is None:
+        return np.full((0, width), np.nan)
+    return np.array(
+        [[np.nan if value is None else value for value in row] for row in values],
+        dtype=np.float64,
+    ).reshape(-1, width)
+
+
+def array_to_nested(array: np.ndarray) -> list:
+    """Convert a 2D array to nested lists, with `NaN`s as `None`."""
+    return [
+        [None if math.isnan(value) else value for value in row]
+        for row in array.tolist()
+    ]
+
+
+def lattice_array(structure: StructureResource) -> np.ndarray:
+    """Return the `(3, 3)` lattice vectors, without converting the positions."""
+    return nested_to_array(structure.attributes.lattice_vectors or [[None] * 3] * 3)
+
+
+def structure_arrays(structure: StructureResource) -> tuple[np.ndarray, np.ndarray]:
+    """Return the `(3, 3)` lattice vectors and `(n_sites, 3)` positions."""
+    return (
+        lattice_array(structure),
+        nested_to_array(structure.attributes.cartesian_site_positions),
+    )
+
+
+def site_indices(
+    sites: t.Iterable[int],
+    nsites: int,
+    name: str = "sites",
+) -> tuple[int, ...]:
+    """Return the site indices as a tuple, checking they are unique and in range."""
+    indices = tuple(sites)
+    for index in indices:
+        if not isinstance(index, (int, np.integer)) or isinstance(index, bool):
+            raise TypeError(f"The {name} should be integers, got {index!r}")
+        if not 0 <= index < nsites:
+            raise ValueError(f"Site {index} of the {name} is not in [0, {nsites})")
+    if len(set(indices)) != len(indices):
+        raise ValueError(f"The {name} {indices} are not unique")
+    return tuple(int(index) for index in indices)
+
+
+@dataclasses.dataclass(frozen=True)
+class StructureBatch:
+    """Geometries derived from a single structure.
+
+    The lattice vectors and positions of all geometries are stored as
+    `(n_structures, 3, 3)` and `(n_structures, n_sites, 3)` arrays. All other
+    attributes are those of `structure`, and full `StructureResource`s are
+    only built on request, as shallow copies sharing them with `structure`.
+    """
+
+    structure: StructureResource
+    lattice_vectors: np.ndarray
+    cartesian_site_positions: np.ndarray
+
+    def __post_init__(self) -> None:
+        count = len(self.lattice_vectors)
+        if self.lattice_vectors.shape != (count, 3, 3):
+            raise ValueError(
+                f"Expected lattice vectors of shape (N, 3, 3), got "
+                f"{self.lattice_vectors.shape}"
+            )
+        positions = self.cartesian_site_positions
+        if positions.ndim != 3 or positions.shape[::2] != (count, 3):
+            raise ValueError(
+                f"Expected positions of shape ({count}, n_sites, 3), got "
+                f"{positions.shape}"
+            )
+
+    def __len__(self) -> int:
+        return len(self.lattice_vectors)
+
+    @property
+    def nsites(self) -> int:
+        return self.cartesian_site_positions.shape[1]
+
+    def structure_resource(self, index: int) -> StructureResource:
+        """Build the `StructureResource` of the geometry at the given index."""
+        attributes = self.structure.attributes.model_copy(
+            update={
+                "lattice_vectors": array_to_nested(self.lattice_vectors[index]),
+                "cartesian_site_positions": array_to_nested(
+                    self.cartesian_site_positions[index]
+                ),
+            },
+        )
+        return self.structure.model_copy(update={"attributes": attributes})
+
+    def __iter__(self) -> t.Iterator[StructureResource]:
+        """Lazily build the `StructureResource` of each geometry."""
+        for index in range(len(self)):
+            yield self.structure_resource(index)
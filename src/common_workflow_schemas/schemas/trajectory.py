@@ -0,0 +1,340 @@
+import dataclasses
+import json
+import os
+import pathlib
+import typing as t
+
+import numpy as np
+import numpy.typing as npt
+import pydantic as pdt
+from optimade.models import StructureResource
+
+from common_workflow_schemas.common.codecs import ArrayCodec
+from common_workflow_schemas.common.context import BASE_PREFIX
+from common_workflow_schemas.common.field import MetadataField
+from common_workflow_schemas.common.mixins import SemanticModel, WithArbitraryTypes
+from common_workflow_schemas.common.types import ShapedFloatArray
+
+from .relax import RelaxOutputs
+from .structures import StructureBatch, lattice_array, structure_arrays
+
+# The files of a trajectory backed by a directory, besides the `<name>.f8` arrays
+_METADATA = "trajectory.json"
+_STEPS = "steps.i8"
+
+# The per-step arrays, with the shape of a single step
+_COLUMNS = {
+    "positions": (None, 3),
+    "forces": (None, 3),
+    "cells": (3, 3),
+    "stresses": (3, 3),
+    "total_energies": (),
+    "total_magnetizations": (),
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class TrajectoryStep:
+    """A step of a `RelaxTrajectory`, holding views of the trajectory arrays."""
+
+    structure: StructureResource
+    positions: np.ndarray
+    forces: np.ndarray
+    cell: np.ndarray
+    total_energy: float
+    stress: t.Optional[np.ndarray] = None
+    total_magnetization: t.Optional[float] = None
+
+    def relax_outputs(self) -> RelaxOutputs:
+        """Return the outputs of the step, without revalidating them.
+
+        Unlike the step, this converts the positions to a `StructureResource`,
+        in `O(n_sites)`.
+        """
+        batch = StructureBatch(self.structure, self.cell[None], self.positions[None])
+        return RelaxOutputs.model_construct(
+            forces=self.forces,
+            relaxed_structure=batch.structure_resource(0),
+            total_energy=self.total_energy,
+            stress=self.stress,
+            total_magnetization=self.total_magnetization,
+        )
+
+
+class RelaxTrajectory(
+    SemanticModel,
+    WithArbitraryTypes,
+):
+    """The path of a relaxation, stored as contiguous per-step arrays.
+
+    Steps are added with `append`, which grows the arrays geometrically, such
+    that a run of `n` steps costs `O(log n)` reallocations. The arrays can be
+    backed by memory-mapped files (see `empty`) for runs exceeding memory, and
+    reopened from them with `open`.
+    """
+
+    _IRI = f"{BASE_PREFIX}/relax/Trajectory"
+
+    structure: t.Annotated[
+        StructureResource,
+        MetadataField(
+            description="The initial structure, defining the sites of the positions.",
+            iri=f"{BASE_PREFIX}/Structure",
+        ),
+    ]
+    positions: t.Annotated[
+        ShapedFloatArray(None, None, 3),
+        MetadataField(
+            description="The cartesian positions of the sites at each step.",
+            iri=f"{BASE_PREFIX}/relax/trajectory/Positions",
+            units="Å",
+        ),
+    ]
+    forces: t.Annotated[
+        ShapedFloatArray(None, None, 3),
+        MetadataField(
+            description="The forces on the atoms at each step.",
+            iri=f"{BASE_PREFIX}/Forces",
+            units="eV/Å",
+        ),
+    ]
+    cells: t.Annotated[
+        t.Optional[ShapedFloatArray(None, 3, 3)],
+        MetadataField(
+            description="The lattice vectors at each step, if the cell is relaxed.",
+            iri=f"{BASE_PREFIX}/relax/trajectory/Cells",
+            units="Å",
+        ),
+    ] = None
+    stresses: t.Annotated[
+        t.Optional[ShapedFloatArray(None, 3, 3)],
+        MetadataField(
+            description="The stress tensor in eV/Å^3 at each step, if computed.",
+            iri=f"{BASE_PREFIX}/relax/Stress",
+            units="eV/Å^3",
+        ),
+    ] = None
+    total_energies: t.Annotated[
+        ShapedFloatArray(None),
+        MetadataField(
+            description="The total energy at each step.",
+            iri=f"{BASE_PREFIX}/scf/TotalEnergy",
+            units="eV",
+        ),
+    ]
+    total_magnetizations: t.Annotated[
+        t.Optional[ShapedFloatArray(None)],
+        MetadataField(
+            description="The total magnetization at each step, if computed.",
+            iri=f"{BASE_PREFIX}/scf/TotalMagnetization",
+            units="μB",
+        ),
+    ] = None
+
+    _buffers: dict = pdt.PrivateAttr(default_factory=dict)
+    _directory: t.Optional[pathlib.Path] = pdt.PrivateAttr(default=None)
+    _steps: t.Optional[np.ndarray] = pdt.PrivateAttr(default=None)
+
+    @pdt.model_validator(mode="after")
+    def _validate_steps(self) -> "RelaxTrajectory":
+        steps, sites = self.positions.shape[:2]
+        for name, shape in _COLUMNS.items():
+            column = getattr(self, name)
+            expected = (steps, sites, 3) if shape == (None, 3) else (steps, *shape)
+            if column is not None and column.shape != expected:
+                raise ValueError(
+                    f"Expected `{name}` of shape {expected}, got {column.shape}"
+                )
+        return self
+
+    @classmethod
+    def empty(
+        cls,
+        structure: StructureResource,
+        cells: bool = False,
+        stresses: bool = False,
+        total_magnetizations: bool = False,
+        capacity: int = 16,
+        directory: t.Optional[t.Union[str, os.PathLike]] = None,
+    ) -> "RelaxTrajectory":
+        """Return a trajectory without steps.
+
+        Parameters
+        ----------
+        `structure` : `StructureResource`
+            The initial structure.
+        `cells`, `stresses`, `total_magnetizations` : `bool`
+            Whether the steps carry the corresponding optional quantity.
+        `capacity` : `int`
+            The number of steps allocated up front.
+        `directory` : `str | os.PathLike`, optional
+            If given, the arrays are memory-mapped from raw `<name>.f8` files
+            in it, along with the structure and the number of steps, such that
+            the trajectory can be reopened with `open`. Any trajectory
+            previously stored in the directory is replaced.
+        """
+        sites = len(structure_arrays(structure)[1])
+        optional = {
+            "cells": cells,
+            "stresses": stresses,
+            "total_magnetizations": total_magnetizations,
+        }
+        columns = {
+            name: np.empty((0, *(sites if e is None else e for e in shape)))
+            for name, shape in _COLUMNS.items()
+            if optional.get(name, True)
+        }
+        trajectory = cls(structure=structure, **columns)
+        if directory is not None:
+            trajectory._directory = directory = pathlib.Path(directory)
+            directory.mkdir(parents=True, exist_ok=True)
+            metadata = {
+                "structure": structure.model_dump(mode="json", exclude_unset=True),
+                "columns": list(columns),
+            }
+            (directory / _METADATA).write_text(json.dumps(metadata))
+            trajectory._steps = np.memmap(
+                directory / _STEPS, dtype=np.int64, mode="w+", shape=(1,)
+            )
+        trajectory._reserve(max(capacity, 1))
+        return trajectory
+
+    @classmethod
+    def open(cls, directory: t.Union[str, os.PathLike]) -> "RelaxTrajectory":
+        """Reopen a trajectory created by `empty` in a directory.
+
+        The arrays are memory-mapped from their files without being read, and
+        further steps can be appended.
+        """
+        directory = pathlib.Path(directory)
+        metadata = json.loads((directory / _METADATA).read_text())
+        structure = StructureResource.model_validate(metadata["structure"])
+        sites = len(structure_arrays(structure)[1])
+        steps = np.memmap(directory / _STEPS, dtype=np.int64, mode="r+", shape=(1,))
+        count = int(steps[0])
+        buffers = {}
+        for name in metadata["columns"]:
+            row = tuple(sites if e is None else e for e in _COLUMNS[name])
+            path = directory / f"{name}.f8"
+            rows = path.stat().st_size // (8 * int(np.prod(row)))
+            if rows < count:
+                raise ValueError(f"The file of `{name}` holds fewer than {count} steps")
+            buffers[name] = np.memmap(
+                path, dtype=np.float64, mode="r+", shape=(rows, *row)
+            )
+        trajectory = cls(
+            structure=structure,
+            **{name: buffer[:count] for name, buffer in buffers.items()},
+        )
+        trajectory._directory = directory
+        trajectory._steps = steps
+        trajectory._buffers = buffers
+        return trajectory
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def _columns(self) -> t.Iterator[str]:
+        return (name for name in _COLUMNS if getattr(self, name) is not None)
+
+    def _allocate(self, name: str, shape: tuple[int, ...]) -> np.ndarray:
+        if self._directory is None:
+            return np.empty(shape)
+        path = self._directory / f"{name}.f8"
+        nbytes = int(np.prod(shape)) * np.dtype(np.float64).itemsize
+        # Extending the file keeps the existing steps in place
+        with path.open("ab") as fp:
+            fp.truncate(max(nbytes, 1))
+        return np.memmap(path, dtype=np.float64, mode="r+", shape=shape)
+
+    def _reserve(self, capacity: int) -> None:
+        """Make room for `capacity` steps in total, copying existing steps once."""
+        steps = len(self)
+        for name in self._columns():
+            column = getattr(self, name)
+            buffer = self._buffers.get(name)
+            if buffer is not None and len(buffer) >= capacity:
+                continue
+            grown = self._allocate(name, (capacity, *column.shape[1:]))
+            if buffer is None or self._directory is None:
+                grown[:steps] = column
+            self._buffers[name] = grown
+            self.__dict__[name] = grown[:steps]
+
+    def append(
+        self,
+        positions: npt.ArrayLike,
+        forces: npt.ArrayLike,
+        total_energy: float,
+        cell: t.Optional[npt.ArrayLike] = None,
+        stress: t.Optional[npt.ArrayLike] = None,
+        total_magnetization: t.Optional[float] = None,
+    ) -> None:
+        """Add a step, in amortized constant time."""
+        values = {
+            "positions": positions,
+            "forces": forces,
+            "cells": cell,
+            "stresses": stress,
+            "total_energies": total_energy,
+            "total_magnetizations": total_magnetization,
+        }
+        columns = list(self._columns())
+        for name, value in values.items():
+            if value is None and name in columns:
+                raise ValueError(f"The steps of this trajectory need `{name}`")
+            if value is not None and name not in columns:
+                raise ValueError(f"The steps of this trajectory have no `{name}`")
+        for name in columns:
+            values[name] = np.asarray(values[name], dtype=np.float64)
+            expected = getattr(self, name).shape[1:]
+            if values[name].shape != expected:
+                raise ValueError(
+                    f"Expected `{name}` of shape {expected}, got {values[name].shape}"
+                )
+        steps = len(self)
+        if not self._buffers or steps == len(self._buffers["positions"]):
+            self._reserve(max(16, 2 * steps))
+        for name in columns:
+            buffer = self._buffers[name]
+            buffer[steps] = values[name]
+            self.__dict__[name] = buffer[: steps + 1]
+        if self._steps is not None:
+            # Written last, such that the stored steps are complete
+            self._steps[0] = steps + 1
+
+    def structures(self) -> StructureBatch:
+        """Return the structure of each step, without copying the arrays."""
+        if self.cells is not None:
+            lattice_vectors = self.cells
+        else:
+            lattice = lattice_array(self.structure)
+            lattice_vectors = np.broadcast_to(lattice, (len(self), 3, 3))
+        return StructureBatch(self.structure, lattice_vectors, self.positions)
+
+    def step(self, index: int) -> TrajectoryStep:
+        """Return a step, as views of the trajectory arrays, in constant time.
+
+        See `TrajectoryStep.relax_outputs` for the `RelaxOutputs` of the step.
+        """
+        index = range(len(self))[index]
+        magnetizations = self.total_magnetizations
+        return TrajectoryStep(
+            structure=self.structure,
+            positions=self.positions[index],
+            forces=self.forces[index],
+            cell=(
+                lattice_array(self.structure)
+                if self.cells is None
+                else self.cells[index]
+            ),
+            total_energy=float(self.total_energies[index]),
+            stress=None if self.stresses is None else self.stresses[index],
+            total_magnetization=(
+                None if magnetizations is None else float(magnetizations[index])
+            ),
+        )
+
+    def model_oo_ld(self, array_codec: t.Union[str, ArrayCodec] = "base64"):
+        """Export the OO-LD document, with the arrays base64-encoded by default."""
+        return super().model_oo_ld(array_codec)
@@ -1,6 +1,8 @@
 import json
 import typing as t
 
+from common_workflow_schemas.common.instrumentation import get_recorder
+
 
 def print_json(
     obj: t.Any,
@@ -9,11 +11,12 @@ def print_json(
     separators: t.Tuple[str, str] = (", ", ": "),
 ) -> None:
     """Pretty print a JSON object."""
-    print(
-        json.dumps(
-            obj,
-            indent=indent,
-            sort_keys=sort_keys,
-            separators=separators,
-        )
-    )
+    options = {"indent": indent, "sort_keys": sort_keys, "separators": separators}
+    if (recorder := get_recorder()) is None:
+        print(json.dumps(obj, **options))
+        return
+    name = obj.get("@type", "dict") if isinstance(obj, dict) else type(obj).__name__
+    with recorder.measure("print_json", str(name)) as measurement:
+        text = json.dumps(obj, **options)
+        measurement.bytes = len(text.encode())
+    print(text)
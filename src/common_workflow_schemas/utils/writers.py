@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import dataclasses
+import json
+import os
+import time
+import typing as t
+
+if t.TYPE_CHECKING:
+    from common_workflow_schemas.common.codecs import ArrayCodec
+    from common_workflow_schemas.common.mixins import SemanticModel
+
+Target = t.Union[str, os.PathLike, t.BinaryIO, asyncio.StreamWriter]
+
+
+@dataclasses.dataclass
+class ExportStats:
+    """Throughput of an export."""
+
+    documents: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def documents_per_second(self) -> float:
+        return self.documents / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.documents} documents, {self.bytes} bytes in "
+            f"{self.seconds:.3f} s ({self.documents_per_second:.1f} docs/s, "
+            f"{self.bytes_per_second / 1e6:.2f} MB/s)"
+        )
+
+
+class _AsyncWriter:
+    """Writes bytes to a path, binary file object or `asyncio.StreamWriter`.
+
+    Paths are opened, and files written and closed, in the default executor
+    of the loop. Stream writes wait for the transport to drain.
+    """
+
+    def __init__(self, target: Target) -> None:
+        self.owned = isinstance(target, (str, os.PathLike))
+        self.target = target
+        self.bytes = 0
+
+    async def open(self) -> None:
+        if self.owned:
+            loop = asyncio.get_running_loop()
+            self.target = await loop.run_in_executor(None, open, self.target, "wb")
+
+    async def write(self, data: bytes) -> None:
+        self.bytes += len(data)
+        if isinstance(self.target, asyncio.StreamWriter):
+            self.target.write(data)
+            await self.target.drain()
+        else:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.target.write, data)
+
+    async def close(self) -> None:
+        if self.owned and not isinstance(self.target, (str, os.PathLike)):
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.target.close)
+
+
+def _serialize_batch(
+    models: list[SemanticModel],
+    array_codec: t.Union[str, ArrayCodec],
+    separator: bytes,
+    terminator: bytes,
+    first: bool,
+) -> bytes:
+    """Serialize a batch of models into the bytes written for them."""
+    from common_workflow_schemas.common.serializers import SharedEncodings
+
+    shared = SharedEncodings()
+    documents = [
+        model.model_oo_ld_document_json(array_codec, shared) for model in models
+    ]
+    if terminator:
+        return terminator.join(documents) + terminator
+    return (b"" if first else separator) + separator.join(documents)
+
+
+async def write_oo_ld_async(
+    model_class: type[SemanticModel],
+    models: t.AsyncIterable[SemanticModel],
+    target: Target,
+    mode: t.Literal["ndjson", "graph"] = "ndjson",
+    array_codec: t.Union[str, ArrayCodec] = "list",
+    workers: int = 4,
+    max_in_flight: int = 256,
+    executor: t.Optional[concurrent.futures.Executor] = None,
+    batch_size: int = 64,
+) -> ExportStats:
+    """Asynchronously export models sharing a single `@context`.
+
+    The output is that of `SemanticModel.model_oo_ld_stream`. Models are
+    serialized off the event loop in batches of `batch_size`, each batch
+    taking one executor call to serialize and one to write. At most
+    `max_in_flight` models are serialized or waiting to be written at any
+    time, such that a slow target suspends the consumption of `models`.
+
+    Parameters
+    ----------
+    `model_class` : `type[SemanticModel]`
+        The class of the models, defining the shared header.
+    `models` : `AsyncIterable[SemanticModel]`
+        The models to export, consumed lazily.
+    `target` : `str | PathLike | BinaryIO | asyncio.StreamWriter`
+        The file path, binary file object or stream to write to.
+    `mode` : `str`
+        `"ndjson"` or `"graph"`, as in `model_oo_ld_stream`.
+    `array_codec` : `str | ArrayCodec`
+        The codec used to encode array fields.
+    `workers` : `int`
+        The number of serialization threads, if `executor` is not provided.
+    `max_in_flight` : `int`
+        The maximum number of documents being serialized or buffered, rounded
+        down to whole batches, at least one.
+    `executor` : `Executor`, optional
+        The executor serializing the models.
+    `batch_size` : `int`
+        The number of models serialized and written at a time. A batch is
+        written once full, or once `models` is exhausted.
+
+    Returns
+    -------
+    `ExportStats`
+        The number of documents and bytes written, and the elapsed time.
+    """
+    if mode not in ("ndjson", "graph"):
+        raise ValueError(f"Unknown stream mode '{mode}'")
+    if batch_size < 1:
+        raise ValueError("`batch_size` must be positive")
+
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    if executor is None:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_in_flight // batch_size))
+    writer = _AsyncWriter(target)
+    stats = ExportStats()
+
+    header = model_class.model_oo_ld_header()
+    if mode == "ndjson":
+        head = json.dumps(header, separators=(",", ":")) + "\n"
+        separator, terminator, tail = b"", b"\n", b""
+    else:
+        graph_header = {k: v for k, v in header.items() if k != "@type"}
+        head = json.dumps({**graph_header, "@graph": []}, separators=(",", ":"))
+        head = head[: -len("]}")]
+        separator, terminator, tail = b",", b"", b"]}"
+
+    async def submit(batch: list[SemanticModel], first: bool) -> None:
+        serialized = loop.run_in_executor(
+            executor,
+            _serialize_batch,
+            batch,
+            array_codec,
+            separator,
+            terminator,
+            first,
+        )
+        await queue.put((serialized, len(batch)))
+
+    async def produce() -> None:
+        batch: list[SemanticModel] = []
+        first = True
+        async for model in models:
+            if not isinstance(model, model_class):
+                raise TypeError(
+                    f"Expected instances of `{model_class.__name__}`, got "
+                    f"`{type(model).__name__}`"
+                )
+            batch.append(model)
+            if len(batch) == batch_size:
+                await submit(batch, first)
+                batch, first = [], False
+        if batch:
+            await submit(batch, first)
+
+    async def produce_all() -> None:
+        # Signal the end, unless cancelled as nothing is consuming anymore
+        try:
+            await produce()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await queue.put(None)
+            raise
+        await queue.put(None)
+
+    producer = asyncio.create_task(produce_all())
+    try:
+        await writer.open()
+        await writer.write(head.encode())
+        while (entry := await queue.get()) is not None:
+            serialized, count = entry
+            await writer.write(await serialized)
+            stats.documents += count
+        if tail:
+            await writer.write(tail)
+        await producer
+    finally:
+        if not producer.done():
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+        await writer.close()
+        if own_executor:
+            executor.shutdown(wait=False)
+
+    stats.bytes = writer.bytes
+    stats.seconds = time.perf_counter() - start
+    return stats
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from common_workflow_schemas.common import ports
+
+UUID = "07f316b1-5403-40eb-b4dc-6be4a529ce67"
+
+SUB_PROCESS_CLASS = "common_workflows.relax.quantum_espresso"
+
+
+def make_structure(nsites: int = 4, seed: int = 0) -> dict:
+    """Return an OPTIMADE structure resource of `nsites` silicon atoms."""
+    rng = np.random.default_rng(seed)
+    length = max(5.0, 2.5 * nsites ** (1 / 3))
+    return {
+        "id": f"test-{nsites}",
+        "type": "structures",
+        "attributes": {
+            "last_modified": "2024-01-01T00:00:00Z",
+            "elements": ["Si"],
+            "nelements": 1,
+            "elements_ratios": [1.0],
+            "chemical_formula_descriptive": f"Si{nsites}",
+            "chemical_formula_reduced": "Si",
+            "chemical_formula_anonymous": "A",
+            "dimension_types": [1, 1, 1],
+            "nperiodic_dimensions": 3,
+            "lattice_vectors": (np.eye(3) * length).tolist(),
+            "cartesian_site_positions": (rng.random((nsites, 3)) * length).tolist(),
+            "nsites": nsites,
+            "species_at_sites": ["Si"] * nsites,
+            "species": [
+                {
+                    "name": "Si",
+                    "chemical_symbols": ["Si"],
+                    "concentration": [1.0],
+                },
+            ],
+            "structure_features": [],
+        },
+    }
+
+
+def make_engine() -> dict:
+    return {
+        "code": {
+            "identifier": UUID,
+            "name": "Quantum ESPRESSO",
+            "package": {
+                "name": "qe",
+                "package_manager": {"name": "conda", "metadata": {}},
+                "metadata": {"version": "7.2"},
+            },
+            "executionEnvironment": {"name": "localhost", "metadata": {}},
+        },
+        "options": {"resources": {"num_machines": 1}},
+    }
+
+
+@pytest.fixture
+def structure() -> dict:
+    return make_structure()
+
+
+@pytest.fixture
+def structure_factory():
+    return make_structure
+
+
+@pytest.fixture
+def engine() -> dict:
+    return make_engine()
+
+
+@pytest.fixture
+def relax_inputs() -> dict:
+    return {
+        "engines": {"relax": make_engine()},
+        "protocol": "fast",
+        "relax_type": "positions",
+        "structure": make_structure(),
+    }
+
+
+@pytest.fixture
+def relax_outputs() -> dict:
+    rng = np.random.default_rng(0)
+    return {
+        "forces": rng.random((4, 3)),
+        "relaxed_structure": make_structure(),
+        "total_energy": -4.0,
+        "stress": rng.random((3, 3)),
+    }
+
+
+@pytest.fixture
+def port_index(monkeypatch) -> dict:
+    """Index the ports of `SUB_PROCESS_CLASS`, which need AiiDA otherwise."""
+    monkeypatch.setitem(
+        ports.PORT_INDEX,
+        SUB_PROCESS_CLASS,
+        frozenset({"base", "base.pw", "base.pw.parameters", "base.pw.parameters.*"}),
+    )
+    ports.get_port_names.cache_clear()
+    yield ports.PORT_INDEX
+    ports.get_port_names.cache_clear()
+
+
+@pytest.fixture
+def composite_inputs(port_index) -> dict:
+    return {
+        "sub_process_class": SUB_PROCESS_CLASS,
+        "generator_inputs": {
+            "engines": {"relax": make_engine()},
+            "protocol": "fast",
+            "relax_type": "positions",
+        },
+        "sub_process": {"base": {"pw": {"parameters": {"SYSTEM": {}}}}},
+    }
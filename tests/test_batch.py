@@ -0,0 +1,57 @@
+import pytest
+
+from common_workflow_schemas.common.batch import BatchValidation
+from common_workflow_schemas.common.interning import InternTable, is_interned
+from common_workflow_schemas.schemas.engine import Engine
+
+
+@pytest.fixture
+def records(engine):
+    invalid = {**engine, "code": None}
+    return [engine, invalid, engine, {**engine, "options": 1}, engine]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("chunk_size", [1, 2, 256])
+def test_validate_many(records, engine, workers, chunk_size):
+    batch = Engine.model_validate_many(records, workers=workers, chunk_size=chunk_size)
+    models = list(batch)
+    assert models == [Engine.model_validate(engine)] * 3
+    assert sorted(batch.errors) == [1, 3]
+    assert batch.errors[1][0]["loc"] == ("code",)
+    assert batch.errors[3][0]["loc"] == ("options",)
+
+
+def test_lazy(engine):
+    consumed = []
+
+    def records():
+        for index in range(4):
+            consumed.append(index)
+            yield engine
+
+    batch = iter(BatchValidation(Engine, records(), chunk_size=2))
+    assert consumed == []
+    next(batch)
+    assert consumed == [0, 1]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_kwargs(engine, workers):
+    table = InternTable()
+    batch = Engine.model_validate_many(
+        [engine, engine],
+        workers=workers,
+        context={"intern": table},
+    )
+    first, second = batch
+    assert first is second
+    assert is_interned(first)
+    # The engine, its code and the package, manager and environment of the code
+    assert table.misses == 5
+    assert table.hits == 1
+
+
+def test_chunk_size(engine):
+    with pytest.raises(ValueError, match="chunk_size"):
+        BatchValidation(Engine, [engine], chunk_size=0)
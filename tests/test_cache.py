@@ -0,0 +1,174 @@
+import sqlite3
+import threading
+
+import numpy as np
+import pytest
+
+from common_workflow_schemas.common import cache as cache_module
+from common_workflow_schemas.common.cache import ResultCache
+from common_workflow_schemas.schemas.relax import RelaxInputs, RelaxOutputs
+
+
+@pytest.fixture
+def inputs(relax_inputs):
+    return RelaxInputs.model_validate(relax_inputs)
+
+
+@pytest.fixture
+def outputs(relax_outputs):
+    return RelaxOutputs.model_validate(relax_outputs)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResultCache(tmp_path / "cache", RelaxOutputs, min_sidecar_size=1)
+    yield cache
+    cache.close()
+
+
+def other_inputs(relax_inputs):
+    return RelaxInputs.model_validate({**relax_inputs, "protocol": "precise"})
+
+
+def test_round_trip(cache, inputs, outputs):
+    assert cache.get(inputs) is None
+    cache.put(inputs, outputs)
+    assert inputs in cache
+    assert len(cache) == 1
+    cached = cache.get(inputs)
+    assert isinstance(cached.forces.base, np.memmap)
+    assert not cached.forces.flags.writeable
+    np.testing.assert_array_equal(cached.forces, outputs.forces)
+    np.testing.assert_array_equal(cached.stress, outputs.stress)
+    assert cached.total_energy == outputs.total_energy
+    assert cache.stats.hits == cache.stats.misses == 1
+    assert cache.stats.hit_rate == 0.5
+    # The forces and stress
+    assert len(list(cache.arrays.iterdir())) == 2
+
+
+def test_inline_arrays(tmp_path, inputs, outputs):
+    cache = ResultCache(tmp_path, RelaxOutputs)
+    cache.put(inputs, outputs)
+    np.testing.assert_array_equal(cache.get(inputs).forces, outputs.forces)
+    assert not cache.arrays.exists() or not any(cache.arrays.iterdir())
+
+
+def test_persistent(cache, inputs, outputs):
+    cache.put(inputs, outputs)
+    reopened = ResultCache(cache.directory, RelaxOutputs)
+    try:
+        assert reopened.get(inputs).total_energy == outputs.total_energy
+    finally:
+        reopened.close()
+
+
+def test_output_class(cache, inputs, outputs):
+    with pytest.raises(TypeError, match="RelaxOutputs"):
+        cache.put(inputs, inputs)
+    cache.put(inputs, outputs)
+    assert ResultCache(cache.directory, RelaxInputs).get(inputs) is None
+
+
+def test_replace(cache, inputs, outputs, relax_outputs):
+    cache.put(inputs, outputs)
+    replaced = RelaxOutputs.model_validate(
+        {**relax_outputs, "forces": np.zeros((4, 3))}
+    )
+    cache.put(inputs, replaced)
+    assert len(cache) == 1
+    np.testing.assert_array_equal(cache.get(inputs).forces, 0.0)
+    # The sidecar of the replaced forces is removed
+    assert len(list(cache.arrays.iterdir())) == 2
+
+
+def test_shared_sidecars(cache, inputs, outputs, relax_inputs):
+    other = other_inputs(relax_inputs)
+    cache.put(inputs, outputs)
+    cache.put(other, outputs)
+    assert len(list(cache.arrays.iterdir())) == 2
+    cache.max_bytes = cache.size // 2
+    assert cache.evict() == 1
+    assert len(list(cache.arrays.iterdir())) == 2
+    assert cache.get(inputs) is None
+    np.testing.assert_array_equal(cache.get(other).forces, outputs.forces)
+    cache.clear()
+    assert len(cache) == 0
+    assert not any(cache.arrays.iterdir())
+
+
+def accessed(cache, inputs) -> float:
+    query = "SELECT accessed FROM entries WHERE key = ?"
+    return cache._connection().execute(query, (cache.key(inputs),)).fetchone()[0]
+
+
+def test_batched_access_times(cache, inputs, outputs, relax_inputs):
+    other = other_inputs(relax_inputs)
+    cache.put(inputs, outputs)
+    cache.put(other, outputs)
+    stored = accessed(cache, inputs)
+    cache.get(inputs)
+    assert accessed(cache, inputs) == stored
+    cache.flush()
+    assert accessed(cache, inputs) > stored
+    # The least recently used entry is evicted, here the other one
+    cache.get(inputs)
+    cache.max_bytes = cache.size // 2
+    assert cache.evict() == 1
+    assert inputs in cache
+    assert other not in cache
+
+
+def test_lookup_during_write(cache, inputs, outputs):
+    cache.put(inputs, outputs)
+    stored = accessed(cache, inputs)
+    reader = ResultCache(cache.directory, RelaxOutputs, timeout=0.0)
+    writer = sqlite3.connect(cache.directory / "cache.sqlite", isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        assert reader.get(inputs).total_energy == outputs.total_energy
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+    reader.close()
+    assert accessed(cache, inputs) > stored
+
+
+def test_sidecars_removed_before_store(cache, inputs, outputs, monkeypatch):
+    """Sidecar files evicted by another writer before the store are restored."""
+    serialize = cache_module.serialize_model_json
+
+    def serialize_and_evict(*args, **kwargs):
+        document = serialize(*args, **kwargs)
+        for path in cache.arrays.iterdir():
+            path.unlink()
+        return document
+
+    monkeypatch.setattr(cache_module, "serialize_model_json", serialize_and_evict)
+    cache.put(inputs, outputs)
+    np.testing.assert_array_equal(cache.get(inputs).forces, outputs.forces)
+
+
+def test_max_age(cache, inputs, outputs):
+    cache.put(inputs, outputs)
+    cache.max_age = 0.0
+    assert cache.get(inputs) is None
+    assert cache.evict() == 1
+    assert cache.stats.evictions == 1
+
+
+def test_threads(cache, inputs, outputs):
+    cache.put(inputs, outputs)
+    results = []
+
+    def lookup():
+        results.append(cache.get(inputs).total_energy)
+        cache.close()
+
+    threads = [threading.Thread(target=lookup) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [outputs.total_energy] * 4
+    assert cache.stats.hits == 4
@@ -0,0 +1,142 @@
+import json
+
+import numpy as np
+import pytest
+
+from common_workflow_schemas.common.codecs import (
+    ARRAY_CODECS,
+    ArrayCodec,
+    SidecarCodec,
+    decode_array,
+    get_array_codec,
+    register_array_codec,
+)
+from common_workflow_schemas.common.serializers import (
+    serialize_model,
+    serialize_model_json,
+)
+from common_workflow_schemas.schemas.relax import RelaxOutputs
+
+LOSSLESS = [name for name in ARRAY_CODECS if not name.endswith("-float32")]
+
+
+@pytest.mark.parametrize("name", LOSSLESS)
+def test_round_trip(name):
+    array = np.random.default_rng(0).random((5, 3))
+    payload = get_array_codec(name).encode(array)
+    json.dumps(payload)
+    decoded = decode_array(payload)
+    assert decoded.dtype == np.float64
+    assert np.array_equal(decoded, array)
+
+
+@pytest.mark.parametrize("name", ["base64-float32", "zlib-float32"])
+def test_float32(name):
+    array = np.random.default_rng(0).random((5, 3))
+    payload = get_array_codec(name).encode(array)
+    assert payload["dtype"] == "<f4"
+    assert np.allclose(decode_array(payload), array, atol=1e-6)
+
+
+def test_compression():
+    array = np.zeros((64, 64))
+    base64 = get_array_codec("base64").encode(array)
+    for name in ("zlib", "lzma", "bz2"):
+        payload = get_array_codec(name).encode(array)
+        assert payload["compression"] == name
+        assert len(payload["data"]) < len(base64["data"]) / 10
+
+
+def test_model_round_trip(relax_outputs):
+    model = RelaxOutputs.model_validate(relax_outputs)
+    for name in LOSSLESS:
+        data = json.loads(json.dumps(serialize_model(model, name)))
+        loaded = RelaxOutputs.model_validate(data)
+        assert np.array_equal(loaded.forces, model.forces)
+        assert np.array_equal(loaded.stress, model.stress)
+
+
+def test_register():
+    class Rounded(ArrayCodec):
+        name = "rounded"
+
+        def encode(self, array):
+            return {"encoding": self.name, "data": np.round(array, 1).tolist()}
+
+        def decode(self, data):
+            return np.asarray(data["data"])
+
+    register_array_codec(Rounded())
+    try:
+        payload = get_array_codec("rounded").encode(np.array([0.12, 0.36]))
+        assert np.array_equal(decode_array(payload), [0.1, 0.4])
+    finally:
+        del ARRAY_CODECS["rounded"]
+    with pytest.raises(ValueError, match="Unknown array codec 'rounded'"):
+        get_array_codec("rounded")
+    with pytest.raises(ValueError, match="name"):
+        register_array_codec(ArrayCodec())
+
+
+def test_sidecar_round_trip(tmp_path):
+    codec = SidecarCodec(tmp_path)
+    array = np.arange(12.0).reshape(4, 3)
+    payload = codec.encode(array)
+    assert payload["path"] == f"{payload['sha256']}.npy"
+    assert (tmp_path / payload["path"]).exists()
+    assert codec.encode(array) == payload
+
+    decoded = decode_array(payload, {"npy": codec})
+    assert isinstance(decoded, np.memmap)
+    assert not decoded.flags.writeable
+    assert np.array_equal(decoded, array)
+    assert np.array_equal(SidecarCodec(tmp_path, verify=True).decode(payload), array)
+
+
+def test_sidecar_model(tmp_path, relax_outputs):
+    model = RelaxOutputs.model_validate(relax_outputs)
+    codec = SidecarCodec(tmp_path, min_size=10, fallback="base64")
+    data = json.loads(serialize_model_json(model, codec))
+    assert data["forces"]["encoding"] == "npy"
+    assert data["stress"]["encoding"] == "base64"
+    loaded = RelaxOutputs.model_validate(data, context={"array_codecs": {"npy": codec}})
+    assert np.array_equal(loaded.forces, model.forces)
+
+
+def test_sidecar_mismatch(tmp_path):
+    codec = SidecarCodec(tmp_path)
+    payload = codec.encode(np.zeros(3))
+    with pytest.raises(ValueError, match="shape"):
+        codec.decode({**payload, "shape": [4]})
+    np.save(tmp_path / payload["path"], np.ones(3))
+    with pytest.raises(ValueError, match="Checksum"):
+        SidecarCodec(tmp_path, verify=True).decode(payload)
+
+
+@pytest.mark.parametrize("path", ["../outside.npy", "/etc/passwd", ".", "a/../.."])
+def test_sidecar_traversal(tmp_path, path):
+    directory = tmp_path / "document"
+    directory.mkdir()
+    np.save(tmp_path / "outside.npy", np.zeros(3))
+    codec = SidecarCodec(directory)
+    payload = {"encoding": "npy", "path": path, "dtype": "<f8", "shape": [3]}
+    with pytest.raises(ValueError, match="outside"):
+        codec.decode(payload)
+
+
+def test_sidecar_symlink(tmp_path):
+    directory = tmp_path / "document"
+    directory.mkdir()
+    np.save(tmp_path / "outside.npy", np.zeros(3))
+    (directory / "link.npy").symlink_to(tmp_path / "outside.npy")
+    payload = {"encoding": "npy", "path": "link.npy", "dtype": "<f8", "shape": [3]}
+    with pytest.raises(ValueError, match="outside"):
+        SidecarCodec(directory).decode(payload)
+
+
+def test_sidecar_requires_directory():
+    assert "npy" not in ARRAY_CODECS
+    with pytest.raises(TypeError):
+        SidecarCodec()
+    with pytest.raises(ValueError, match="Unknown array codec 'npy'"):
+        decode_array({"encoding": "npy", "path": "x.npy"})
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from common_workflow_schemas.schemas.columnar import CompositeOutputsColumns
+from common_workflow_schemas.schemas.dissociation import DcOutput
+from common_workflow_schemas.schemas.eos import EosOutputs
+
+
+@pytest.fixture
+def models(structure):
+    return [
+        EosOutputs.model_validate(
+            {
+                "total_energies": [-1.0, -3.0, -2.0],
+                "total_magnetizations": None,
+                "structures": [structure] * 3,
+            }
+        ),
+        DcOutput.model_validate(
+            {
+                "total_energies": [-5.0, -4.0],
+                "total_magnetizations": [0.5, 0.0],
+                "distances": [1.0, 2.0],
+            }
+        ),
+        DcOutput.model_validate(
+            {"total_energies": [], "total_magnetizations": [], "distances": []}
+        ),
+    ]
+
+
+@pytest.fixture
+def columns(models):
+    return CompositeOutputsColumns.from_models(models)
+
+
+def test_from_models(columns):
+    assert len(columns) == 3
+    assert columns.offsets.tolist() == [0, 3, 5, 5]
+    assert columns.lengths.tolist() == [3, 2, 0]
+    assert columns.row_indices.tolist() == [0, 0, 0, 1, 1]
+    assert columns.types.tolist() == ["EosOutputs", "DcOutput", "DcOutput"]
+    assert columns["total_energies"].tolist() == [-1.0, -3.0, -2.0, -5.0, -4.0]
+    np.testing.assert_array_equal(
+        columns["total_magnetizations"], [np.nan, np.nan, np.nan, 0.5, 0.0]
+    )
+    np.testing.assert_array_equal(
+        columns["distances"], [np.nan, np.nan, np.nan, 1.0, 2.0]
+    )
+    np.testing.assert_allclose(columns["volumes"][:3], 125.0)
+    assert np.isnan(columns["volumes"][3:]).all()
+
+
+def test_mismatched_lengths(models):
+    models[1].distances = [1.0]
+    with pytest.raises(ValueError, match="Expected 2 values"):
+        CompositeOutputsColumns.from_models(models)
+
+
+def test_select(columns):
+    selected = columns.select(np.array([False, True, True]))
+    assert selected.offsets.tolist() == [0, 2, 2]
+    assert selected["total_energies"].tolist() == [-5.0, -4.0]
+    assert selected.types.tolist() == ["DcOutput", "DcOutput"]
+    reordered = columns.select(np.array([1, 0]))
+    assert reordered["total_energies"].tolist() == [-5.0, -4.0, -1.0, -3.0, -2.0]
+
+
+def test_select_points(columns):
+    selected = columns.select_points(columns["total_energies"] < -2.5)
+    assert selected.offsets.tolist() == [0, 1, 3, 3]
+    assert selected["total_energies"].tolist() == [-3.0, -5.0, -4.0]
+
+
+def test_reduce(columns):
+    minima = columns.reduce("total_energies")
+    assert minima[:2].tolist() == [-3.0, -5.0]
+    assert np.isnan(minima[2])
+    assert columns.reduce("total_magnetizations", np.fmax)[1] == 0.5
+
+
+def test_save_load(columns, tmp_path):
+    path = tmp_path / "columns.npz"
+    columns.save(path)
+    loaded = CompositeOutputsColumns.load(path)
+    assert loaded.offsets.tolist() == columns.offsets.tolist()
+    assert loaded.types.tolist() == columns.types.tolist()
+    assert loaded.columns.keys() == columns.columns.keys()
+    for key, column in columns.columns.items():
+        np.testing.assert_array_equal(loaded[key], column)
+
+
+def test_validate_columns():
+    with pytest.raises(ValueError, match="Unknown columns"):
+        CompositeOutputsColumns([0, 1], {"energy": [1.0]}, ["EosOutputs"])
+    with pytest.raises(ValueError, match="one type per output"):
+        CompositeOutputsColumns([0, 1], {}, [])
+    with pytest.raises(ValueError, match="does not match the offsets"):
+        CompositeOutputsColumns([0, 2], {"total_energies": [1.0]}, ["EosOutputs"])
@@ -0,0 +1,84 @@
+import copy
+
+import pytest
+
+from common_workflow_schemas.common.context import (
+    DEFAULT_PREFIXES,
+    VOCAB,
+    PrefixTrie,
+    build_context,
+    reduce_iri,
+    strip_context_annotations,
+)
+from common_workflow_schemas.schemas.relax import RelaxInputs
+
+
+@pytest.mark.parametrize(
+    ("iri", "expected"),
+    [
+        ("https://example.com/commonWorkflows/Engine", "cw:Engine"),
+        ("https://example.com/commonWorkflows", "ex:commonWorkflows"),
+        ("https://example.com/", "ex:"),
+        ("https://other.org/Engine", "https://other.org/Engine"),
+    ],
+)
+def test_reduce_iri(iri, expected):
+    assert reduce_iri(iri) == expected
+
+
+def test_prefix_trie():
+    trie = PrefixTrie({"a": "https://a.org/", "b": "https://a.org/b/", "c": "urn:c:"})
+    assert trie.match("https://a.org/b/x") == ("b", 16)
+    assert trie.match("https://a.org/x") == ("a", 14)
+    assert trie.match("https://a.org") is None
+    assert trie.compact("urn:c:x") == "c:x"
+    assert trie.prefix_definitions() == {
+        "a": "https://a.org/",
+        "b": "a:b/",
+        "c": "urn:c:",
+    }
+
+
+def test_build_context():
+    schema = RelaxInputs.model_json_schema()
+    original = copy.deepcopy(schema)
+    context = build_context("RelaxInputs", schema)
+    assert schema == original
+    assert context["@vocab"] == VOCAB
+    assert context["ex"] == DEFAULT_PREFIXES["ex"]
+    assert context["cw"] == "ex:commonWorkflows/"
+    assert context["RelaxInputs"] == reduce_iri(schema["@id"])
+    engine = context["Engine"]
+    assert engine["@id"] == reduce_iri(schema["$defs"]["Engine"]["@id"])
+    assert engine["@context"]
+
+
+def test_build_context_prefixes():
+    schema = {
+        "@id": "https://w3id.org/cw/Model",
+        "properties": {
+            "value": {"@id": "https://w3id.org/cw/value"},
+            "items": {"@container": "@list", "items": {"type": "integer"}},
+        },
+    }
+    context = build_context("Model", schema, prefixes={"cw": "https://w3id.org/cw/"})
+    assert context == {
+        "@vocab": VOCAB,
+        "cw": "https://w3id.org/cw/",
+        "Model": "cw:Model",
+        "value": "cw:value",
+        "items": {"@container": "@list"},
+    }
+
+
+def test_strip_context_annotations():
+    schema = RelaxInputs.model_json_schema()
+    original = copy.deepcopy(schema)
+    stripped = strip_context_annotations(schema)
+    assert schema == original
+    assert "@id" not in stripped
+    assert "@id" not in repr(stripped["properties"])
+    engine = stripped["$defs"]["Engine"]
+    assert "@id" not in engine
+    assert all("@id" not in prop for prop in engine["properties"].values())
+    assert stripped["required"] == schema["required"]
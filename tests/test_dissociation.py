@@ -0,0 +1,78 @@
+import numpy as np
+import pydantic as pdt
+import pytest
+
+from common_workflow_schemas.schemas.dissociation import DcInput, DisplacedStructures
+
+
+@pytest.fixture
+def dc_inputs(composite_inputs, structure) -> dict:
+    composite_inputs["generator_inputs"].pop("relax_type")
+    return {**composite_inputs, "molecule": structure, "distance_count": 4}
+
+
+def test_validate(dc_inputs):
+    model = DcInput.model_validate(dc_inputs)
+    assert np.allclose(model.get_distances(), np.linspace(0.5, 3, 4))
+    assert DcInput.model_validate(model.model_dump()) == model
+
+
+def test_validate_distance_range(dc_inputs):
+    dc_inputs["distance_min"] = 4.0
+    with pytest.raises(pdt.ValidationError, match="minimum distance"):
+        DcInput.model_validate(dc_inputs)
+
+
+def test_displaced_structures(dc_inputs):
+    model = DcInput.model_validate(dc_inputs)
+    displaced = model.get_displaced_structures()
+    positions = displaced.cartesian_site_positions
+    assert positions.shape == (4, 4, 3)
+    lengths = np.linalg.norm(positions[:, 1] - positions[:, 0], axis=1)
+    assert np.allclose(lengths, displaced.distances)
+    assert np.array_equal(
+        positions[:, 2:], np.broadcast_to(positions[0, 2:], (4, 2, 3))
+    )
+    assert displaced.moving == (1,)
+
+    moved = model.get_displaced_structures(bond=(2, 0), moving=[0, 3])
+    positions = moved.cartesian_site_positions
+    lengths = np.linalg.norm(positions[:, 0] - positions[:, 2], axis=1)
+    assert np.allclose(lengths, moved.distances)
+    assert np.allclose(
+        positions[:, 3] - positions[:, 0], positions[0, 3] - positions[0, 0]
+    )
+    assert np.array_equal(positions[:, 1], np.broadcast_to(positions[0, 1], (4, 3)))
+
+
+@pytest.mark.parametrize(
+    ("bond", "moving", "match"),
+    [
+        ((0, 0), None, "not unique"),
+        ((0, 4), None, "not in"),
+        ((0, 1), [0, 1], "fixed site 0"),
+        ((0, 1), [2], "site 1 of the bond should move"),
+        ((0, 1), [1, -1], "not in"),
+        ((0, 1), [1, 1], "not unique"),
+    ],
+)
+def test_invalid_sites(dc_inputs, bond, moving, match):
+    model = DcInput.model_validate(dc_inputs)
+    with pytest.raises(ValueError, match=match):
+        model.get_displaced_structures(bond=bond, moving=moving)
+
+
+def test_invalid_batch(dc_inputs):
+    model = DcInput.model_validate(dc_inputs)
+    displaced = model.get_displaced_structures()
+    with pytest.raises(ValueError, match="fixed site"):
+        DisplacedStructures(
+            displaced.structure,
+            displaced.lattice_vectors,
+            displaced.cartesian_site_positions,
+            distances=displaced.distances,
+            bond=(0, 1),
+            moving=(0, 1),
+        )
+    with pytest.raises(TypeError):
+        model.get_displaced_structures(moving=[1.0])
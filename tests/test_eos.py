@@ -0,0 +1,76 @@
+import numpy as np
+import pydantic as pdt
+import pytest
+
+from common_workflow_schemas.schemas.eos import EosInputs, StrainedStructures
+
+
+@pytest.fixture
+def eos_inputs(composite_inputs, structure) -> dict:
+    return {
+        **composite_inputs,
+        "structure": structure,
+        "scale_factors": None,
+        "scale_count": 5,
+        "scale_increment": 0.02,
+    }
+
+
+def test_validate(eos_inputs):
+    model = EosInputs.model_validate(eos_inputs)
+    assert np.allclose(model.get_scale_factors(), [0.96, 0.98, 1.0, 1.02, 1.04])
+    assert EosInputs.model_validate(model.model_dump()) == model
+
+
+def test_validate_scale_inputs(eos_inputs):
+    eos_inputs["scale_count"] = None
+    with pytest.raises(pdt.ValidationError, match="scale_factors"):
+        EosInputs.model_validate(eos_inputs)
+    eos_inputs["scale_factors"] = [0.9, 1, 1.1]
+    model = EosInputs.model_validate(eos_inputs)
+    assert np.array_equal(model.get_scale_factors(), [0.9, 1.0, 1.1])
+
+
+def test_validate_sub_process(eos_inputs):
+    eos_inputs["sub_process_class"] = "common_workflows.eos"
+    with pytest.raises(pdt.ValidationError, match="common_workflows.relax."):
+        EosInputs.model_validate(eos_inputs)
+
+
+def test_strained_structures(eos_inputs):
+    model = EosInputs.model_validate(eos_inputs)
+    strained = model.get_strained_structures()
+    assert len(strained) == 5
+    assert strained.cartesian_site_positions.shape == (5, 4, 3)
+    lattice = np.asarray(model.structure.attributes.lattice_vectors)
+    volumes = np.linalg.det(strained.lattice_vectors)
+    assert np.allclose(volumes, strained.scale_factors * np.linalg.det(lattice))
+
+    structures = list(strained)
+    assert len(structures) == 5
+    assert np.allclose(
+        structures[0].attributes.cartesian_site_positions,
+        strained.cartesian_site_positions[0],
+    )
+    assert structures[0].attributes.species == model.structure.attributes.species
+
+
+def test_strained_structures_validation(eos_inputs):
+    eos_inputs["scale_increment"] = 1.0
+    model = EosInputs.model_validate(eos_inputs)
+    with pytest.raises(ValueError, match="positive"):
+        model.get_strained_structures()
+    with pytest.raises(ValueError, match="scale factors"):
+        StrainedStructures(
+            model.structure,
+            np.zeros((2, 3, 3)),
+            np.zeros((2, 4, 3)),
+            scale_factors=np.ones(3),
+        )
+    with pytest.raises(ValueError, match="positions"):
+        StrainedStructures(
+            model.structure,
+            np.zeros((2, 3, 3)),
+            np.zeros((3, 4, 3)),
+            scale_factors=np.ones(2),
+        )
@@ -0,0 +1,43 @@
+import json
+
+import numpy as np
+
+from common_workflow_schemas.common.fingerprint import fingerprint
+from common_workflow_schemas.schemas.relax import RelaxInputs
+
+
+def test_equal_content(relax_inputs):
+    first = RelaxInputs.model_validate(relax_inputs)
+    second = RelaxInputs.model_validate(json.loads(json.dumps(relax_inputs)))
+    assert first.model_fingerprint() == second.model_fingerprint()
+    second.protocol = "precise"
+    assert first.model_fingerprint() != second.model_fingerprint()
+
+
+def test_float_lists():
+    packed = fingerprint([[1.0, 2.0], [3.0, 4.0]])
+    assert packed == fingerprint(((1.0, 2.0), (3.0, 4.0)))
+    assert packed != fingerprint([[1.0, 2.0], [3.0, 4]])
+    assert packed != fingerprint([[1.0, 2.0], [3.0, 4.0, 5.0]])
+    assert packed != fingerprint(np.array([[1.0, 2.0], [3.0, 4.0]]))
+    assert fingerprint([1.0, 2.0]) != fingerprint([1.0, 2.0, 0.0])
+    assert fingerprint([[1.0], [2.0]]) != fingerprint([[1.0, 2.0]])
+
+
+def test_arrays():
+    array = np.arange(6.0).reshape(2, 3)
+    assert fingerprint(array) == fingerprint(array.astype(">f8"))
+    assert fingerprint(array) != fingerprint(array.reshape(3, 2))
+    assert fingerprint(array) != fingerprint(array.astype(np.float32))
+
+
+def test_negative_zero():
+    assert fingerprint(-0.0) == fingerprint(0.0)
+    assert fingerprint([-0.0, 1.0]) == fingerprint([0.0, 1.0])
+    array = np.array([[-0.0, 1.0], [2.0, -0.0]])
+    assert fingerprint(array) == fingerprint(np.abs(array))
+    assert np.signbit(array[0, 0])
+    assert fingerprint(array.astype(np.complex128)) == fingerprint(
+        np.abs(array).astype(np.complex128)
+    )
+    assert fingerprint(0.0) != fingerprint(0)
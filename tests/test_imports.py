@@ -0,0 +1,83 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ("aiida", "asyncio", "concurrent.futures", "numpy", "optimade")
+
+# The heavy modules each schema module may import, e.g. for its field types
+ALLOWED = {
+    "common_workflow_schemas.schemas": (),
+    "common_workflow_schemas.schemas.code": (),
+    "common_workflow_schemas.schemas.engine": (),
+    "common_workflow_schemas.schemas.relax": ("numpy", "optimade"),
+    "common_workflow_schemas.schemas.trajectory": ("numpy", "optimade"),
+    "common_workflow_schemas.schemas.composite": ("numpy", "optimade"),
+    "common_workflow_schemas.schemas.eos": ("numpy", "optimade"),
+    "common_workflow_schemas.schemas.dissociation": ("numpy", "optimade"),
+    "common_workflow_schemas.schemas.columnar": ("numpy", "optimade"),
+}
+
+# Generous budgets, in seconds, of a cold import, excluding interpreter startup
+BUDGET = 1.0
+HEAVY_BUDGET = 3.0
+
+
+def loaded_modules(statement: str) -> list[str]:
+    """Return the heavy modules loaded by a statement in a fresh interpreter."""
+    script = (
+        f"import json, sys\n{statement}\n"
+        f"print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    )
+    process = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", script],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(process.stdout)
+
+
+def import_seconds(module: str) -> float:
+    """Return the duration of the import of a module in a fresh interpreter."""
+    script = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - start)"
+    )
+    process = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", script],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return float(process.stdout)
+
+
+@pytest.mark.parametrize("module", ALLOWED)
+def test_import(module):
+    loaded = loaded_modules(f"import {module}")
+    assert sorted(set(loaded) - set(ALLOWED[module])) == []
+
+
+@pytest.mark.parametrize("module", ALLOWED)
+def test_import_time(module):
+    budget = HEAVY_BUDGET if ALLOWED[module] else BUDGET
+    assert import_seconds(module) < budget
+
+
+def test_lazy_attribute():
+    loaded = loaded_modules("from common_workflow_schemas.schemas import Engine")
+    assert loaded == []
+    loaded = loaded_modules("from common_workflow_schemas.schemas import RelaxInputs")
+    assert sorted(loaded) == ["numpy", "optimade"]
+
+
+def test_header():
+    statement = (
+        "from common_workflow_schemas.schemas import Engine\n"
+        "Engine.model_oo_ld_header()"
+    )
+    assert loaded_modules(statement) == []
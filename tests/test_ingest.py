@@ -0,0 +1,112 @@
+from common_workflow_schemas.common.context import BASE_PREFIX
+from common_workflow_schemas.common.ingest import ContextExpander, get_class_iri
+from common_workflow_schemas.schemas.code import Code
+from common_workflow_schemas.schemas.relax import RelaxInputs, RelaxOutputs
+
+
+def test_class_iri():
+    assert get_class_iri(RelaxInputs) == f"{BASE_PREFIX}/relax/Input"
+
+
+def test_round_trip_inputs(relax_inputs):
+    model = RelaxInputs.model_validate(relax_inputs)
+    assert RelaxInputs.model_validate_oo_ld(model.model_oo_ld()) == model
+
+
+def test_round_trip_outputs(relax_outputs):
+    model = RelaxOutputs.model_validate(relax_outputs)
+    loaded = RelaxOutputs.model_validate_oo_ld(model.model_oo_ld())
+    assert loaded.model_dump_json() == model.model_dump_json()
+
+
+def test_round_trip_documents(relax_inputs):
+    models = [RelaxInputs.model_validate(relax_inputs)] * 2
+    header = RelaxInputs.model_oo_ld_header()
+    documents = list(RelaxInputs.model_oo_ld_documents(models))
+    loaded = list(RelaxInputs.model_validate_oo_ld_documents(documents, header))
+    assert loaded == models
+
+
+def test_scoped_terms(engine):
+    """The same term resolves per class scope, not to the last definition."""
+    context = {
+        "cw": f"{BASE_PREFIX}/",
+        "Code": {"@id": "cw:Code", "@context": {"label": "cw:Code/Name"}},
+        "Package": {"@id": "cw:Package", "@context": {"label": "cw:Package/Name"}},
+    }
+    code = engine["code"]
+    code["label"] = code.pop("name")
+    code["package"]["label"] = code["package"].pop("name")
+    model = Code.model_validate_oo_ld({"@context": context, **code})
+    assert model.name == "Quantum ESPRESSO"
+    assert model.package.name == "qe"
+
+
+def test_scoped_terms_do_not_propagate():
+    expander = ContextExpander({"Code": {"@context": {"label": "ex:a"}}})
+    assert expander.scoped(["Code"]).expand("label") == "ex:a"
+    assert expander.expand("label") == "label"
+    assert expander.scoped(["Code"]) is expander.scoped(["Code"])
+
+
+def test_expanded_document(engine):
+    cw = f"{BASE_PREFIX}/"
+    document = {
+        "@type": [f"{cw}Code"],
+        f"{cw}UniqueIdentifier": [{"@value": engine["code"]["identifier"]}],
+        f"{cw}Code/Name": [{"@value": "Quantum ESPRESSO"}],
+        f"{cw}Code/Package": [
+            {
+                f"{cw}Package/Name": [{"@value": "qe"}],
+                f"{cw}Package/PackageManager": [
+                    {
+                        f"{cw}PackageManager/Name": [{"@value": "conda"}],
+                        f"{cw}PackageManager/Metadata": [{}],
+                    }
+                ],
+                f"{cw}Package/Metadata": [
+                    {
+                        "https://example.com/version": [{"@value": "7.2"}],
+                        "https://example.com/flags": [
+                            {"@value": "-O2"},
+                            {"@value": "-g"},
+                        ],
+                        "https://example.com/build": [
+                            {"https://example.com/jobs": [{"@value": 4}]}
+                        ],
+                    }
+                ],
+            }
+        ],
+        f"{cw}Code/ExecutionEnvironment": [
+            {
+                f"{cw}ExecutionEnvironment/Name": [{"@value": "localhost"}],
+                f"{cw}ExecutionEnvironment/Metadata": [{}],
+            }
+        ],
+    }
+    model = Code.model_validate_oo_ld(document)
+    assert model.package.metadata == {
+        "version": "7.2",
+        "flags": ["-O2", "-g"],
+        "build": {"jobs": 4},
+    }
+    engine["code"]["package"]["metadata"] = model.package.metadata
+    assert model == Code.model_validate(engine["code"])
+
+
+def test_free_form_terms(engine):
+    """Keys of free-form mappings compact to the terms of the active scope."""
+    context = {
+        "Package": {"@context": {"release": "https://example.org/release"}},
+    }
+    package = engine["code"]["package"]
+    package["metadata"] = {"https://example.org/release": [{"@value": "7.2"}]}
+    model = Code.model_validate_oo_ld({"@context": context, **engine["code"]})
+    assert model.package.metadata == {"release": "7.2"}
+
+
+def test_compacted_lists(engine):
+    engine["code"]["package"]["metadata"] = {"versions": ["7.2"], "nested": [[1]]}
+    model = Code.model_validate_oo_ld(engine["code"])
+    assert model.package.metadata == {"versions": ["7.2"], "nested": [[1]]}
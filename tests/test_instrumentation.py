@@ -0,0 +1,130 @@
+import io
+import json
+
+import pydantic as pdt
+
+from common_workflow_schemas.common.instrumentation import (
+    Recorder,
+    StageStats,
+    disable,
+    enable,
+    get_recorder,
+    instrument,
+)
+from common_workflow_schemas.common.mixins import SemanticModel
+from common_workflow_schemas.common.serializers import serialize_model
+from common_workflow_schemas.schemas.relax import RelaxInputs
+
+
+RECORDED = {"model_validate", "model_validate_json", "model_json_schema"}
+
+
+def counts(recorder: Recorder, stage: str) -> dict[str, int]:
+    return {name: stats["count"] for name, stats in recorder.to_dict()[stage].items()}
+
+
+def installed() -> set[str]:
+    return RECORDED & vars(SemanticModel).keys()
+
+
+def test_disabled(relax_inputs):
+    assert get_recorder() is None
+    RelaxInputs.model_validate(relax_inputs)
+    with instrument() as recorder:
+        assert get_recorder() is recorder
+    assert get_recorder() is None
+    assert enable() is get_recorder()
+    disable()
+    assert get_recorder() is None
+
+
+def test_entry_points_swapped():
+    assert not installed()
+    assert not RelaxInputs.__pydantic_decorators__.model_validators
+    assert RelaxInputs.model_validate.__func__ is pdt.BaseModel.model_validate.__func__
+    with instrument():
+        with instrument():
+            assert installed() == RECORDED
+        assert installed() == RECORDED
+    assert not installed()
+    enable()
+    assert installed() == RECORDED
+    disable()
+    assert not installed()
+
+
+def test_validate(relax_inputs):
+    with instrument() as recorder:
+        model = RelaxInputs.model_validate(relax_inputs)
+        RelaxInputs.model_validate(model)
+    # Sub-models are validated within that of the model, not on their own
+    assert counts(recorder, "validate") == {"RelaxInputs": 2}
+
+
+def test_validate_json_bytes(engine):
+    from common_workflow_schemas.schemas.engine import Engine
+
+    engine["options"] = {"label": "Å"}
+    data = json.dumps(engine, ensure_ascii=False)
+    with instrument() as recorder:
+        Engine.model_validate_json(data)
+        Engine.model_validate_json(data.encode())
+    stats = recorder.to_dict()["validate_json"]["Engine"]
+    assert stats["count"] == 2
+    assert stats["bytes"] == 2 * len(data.encode())
+    assert len(data.encode()) == len(data) + 1
+
+
+def test_validate_many(relax_inputs):
+    records = [relax_inputs, {}, relax_inputs]
+    with instrument() as recorder:
+        batch = RelaxInputs.model_validate_many(records, chunk_size=2)
+        assert len(list(batch)) == 2
+    assert counts(recorder, "validate_many") == {"RelaxInputs": 3}
+    assert counts(recorder, "validate") == {"RelaxInputs": 3}
+
+
+def test_validate_many_workers(relax_inputs):
+    records = [relax_inputs] * 4
+    with instrument() as recorder:
+        batch = RelaxInputs.model_validate_many(records, workers=2, chunk_size=1)
+        assert len(list(batch)) == 4
+    assert counts(recorder, "validate_many") == {"RelaxInputs": 4}
+    assert counts(recorder, "validate")["RelaxInputs"] == 4
+
+
+def test_stream_paths(relax_inputs):
+    model = RelaxInputs.model_validate(relax_inputs)
+    data = json.dumps(serialize_model(model))
+    documents = list(RelaxInputs.model_oo_ld_documents([model, model]))
+    with instrument() as recorder:
+        RelaxInputs.model_validate_stream(io.StringIO(data), chunk_size=64)
+        RelaxInputs.model_validate_oo_ld(model.model_oo_ld())
+        header = RelaxInputs.model_oo_ld_header()
+        list(
+            RelaxInputs.model_validate_oo_ld_documents(
+                documents, context=header["@context"]
+            )
+        )
+    stats = recorder.to_dict()
+    assert stats["validate_stream"]["RelaxInputs"]["bytes"] == len(data.encode())
+    assert counts(recorder, "validate_oo_ld") == {"RelaxInputs": 3}
+    assert counts(recorder, "validate")["RelaxInputs"] == 4
+
+
+def test_merge():
+    first, second = StageStats(max_samples=4), StageStats(max_samples=4)
+    for seconds in (1.0, 2.0, 3.0):
+        first.add(seconds, 1)
+    for seconds in (10.0, 20.0, 30.0, 40.0, 50.0, 60.0):
+        second.add(seconds, 2)
+    first.merge(second)
+    assert first.count == 9
+    assert first.seconds == 216.0
+    assert first.bytes == 15
+    assert len(first.samples) == 4
+
+    recorder = Recorder()
+    recorder.record("validate", "Engine", 1.0)
+    recorder.merge({"validate": {"Engine": first, "Code": second}})
+    assert counts(recorder, "validate") == {"Engine": 10, "Code": 6}
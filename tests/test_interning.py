@@ -0,0 +1,128 @@
+import io
+import json
+
+import pydantic as pdt
+import pytest
+
+from common_workflow_schemas.common.interning import (
+    InternTable,
+    interned_fields,
+    is_interned,
+)
+from common_workflow_schemas.common.serializers import (
+    SharedEncodings,
+    serialize_model,
+    serialize_model_json,
+)
+from common_workflow_schemas.schemas.engine import Engine
+from common_workflow_schemas.schemas.relax import RelaxInputs
+
+
+def test_intern(relax_inputs):
+    table = InternTable()
+    models = [
+        table.intern_tree(RelaxInputs.model_validate(relax_inputs)) for _ in range(3)
+    ]
+    engines = [model.engines["relax"] for model in models]
+    assert engines[0] is engines[1] is engines[2]
+    assert engines[0].code is engines[1].code
+    assert is_interned(engines[0])
+    assert is_interned(engines[0].code)
+    assert not is_interned(models[0])
+    # The engine, its code and the package, manager and environment of the code
+    assert table.misses == 5
+    assert table.hits == 2
+
+
+def test_interned_fields():
+    assert interned_fields(RelaxInputs) == {"engines"}
+    assert interned_fields(Engine) == {"code"}
+
+
+def test_no_model_hooks(engine):
+    decorators = Engine.__pydantic_decorators__
+    assert not decorators.model_validators
+    assert not decorators.model_serializers
+    table = InternTable()
+    model = Engine.model_validate(engine, context={"intern": table})
+    assert not is_interned(model)
+    assert len(table) == 0
+
+
+def test_not_interned(engine):
+    first, second = Engine.model_validate(engine), Engine.model_validate(engine)
+    assert first == second
+    assert first is not second
+    assert not is_interned(first)
+    first.options = {}
+
+
+def test_distinct_content(engine):
+    table = InternTable()
+    first = table.intern_tree(Engine.model_validate(engine))
+    engine["options"] = {"resources": {"num_machines": 2}}
+    second = table.intern_tree(Engine.model_validate(engine))
+    assert first is not second
+    assert first.code is second.code
+
+
+def test_frozen(engine):
+    model = InternTable().intern_tree(Engine.model_validate(engine))
+    with pytest.raises(pdt.ValidationError):
+        model.options = {}
+
+
+def test_weak_table(engine):
+    table = InternTable()
+    model = table.intern_tree(Engine.model_validate(engine))
+    assert len(table) == 5
+    del model
+    assert len(table) == 0
+
+
+def test_loaders(relax_inputs):
+    model = RelaxInputs.model_validate(relax_inputs)
+    table = InternTable()
+    context = {"intern": table}
+    data = json.dumps(serialize_model(model))
+    loaded = [
+        RelaxInputs.model_validate_stream(io.StringIO(data), context=context),
+        RelaxInputs.model_validate_oo_ld(model.model_oo_ld(), context=context),
+        *RelaxInputs.model_construct_many(
+            [serialize_model(model)] * 2,
+            validate_every=2,
+            context=context,
+        ),
+    ]
+    assert all(other == model for other in loaded)
+    assert len({id(other.engines["relax"]) for other in loaded}) == 1
+    assert table.hits == 3
+
+
+def test_shared_encoding(relax_inputs):
+    table = InternTable()
+    models = [
+        table.intern_tree(RelaxInputs.model_validate(relax_inputs)) for _ in range(2)
+    ]
+    shared = SharedEncodings()
+    documents = [serialize_model(model, shared=shared) for model in models]
+    assert shared.get(models[0].engines["relax"]) is not None
+    assert len(shared) == 5
+    # The encodings are shared, not copied
+    assert documents[0]["engines"] is not documents[1]["engines"]
+    assert documents[0]["engines"]["relax"] is documents[1]["engines"]["relax"]
+    assert documents[0] == serialize_model(models[0])
+    assert [RelaxInputs.model_validate(d) for d in documents] == models
+    data = serialize_model_json(models[0], shared=shared)
+    assert data == serialize_model_json(models[0])
+
+
+def test_shared_encodings_weak(relax_inputs):
+    table = InternTable()
+    model = table.intern_tree(RelaxInputs.model_validate(relax_inputs))
+    shared = SharedEncodings()
+    serialize_model(model, shared=shared)
+    assert len(shared) == 5
+    del model
+    assert len(shared) == 0
+    assert len(table) == 0
@@ -0,0 +1,68 @@
+import numpy as np
+import pydantic as pdt
+import pytest
+
+from common_workflow_schemas.common.types import FloatArray, ShapedFloatArray
+from common_workflow_schemas.common.types.numeric import is_array_field
+from common_workflow_schemas.schemas.relax import RelaxOutputs
+
+Vectors = pdt.TypeAdapter(ShapedFloatArray(None, 3))
+
+
+def test_validate_lists():
+    array = Vectors.validate_python([[0, 1, 2], [3, 4, 5]])
+    assert array.dtype == np.float64
+    assert array.shape == (2, 3)
+    assert array.flags.c_contiguous
+
+
+def test_validate_shape():
+    with pytest.raises(pdt.ValidationError, match=r"\('N', 3\)"):
+        Vectors.validate_python([[0, 1], [2, 3]])
+    with pytest.raises(pdt.ValidationError):
+        Vectors.validate_python([0, 1, 2])
+    assert pdt.TypeAdapter(FloatArray).validate_python(np.zeros((2, 2, 2))).ndim == 3
+
+
+def test_validate_dtype():
+    with pytest.raises(pdt.ValidationError, match="cast"):
+        Vectors.validate_python(np.zeros((2, 3), dtype=complex))
+    with pytest.raises(pdt.ValidationError, match="cast"):
+        Vectors.validate_python([["a", "b", "c"]])
+    strict = pdt.TypeAdapter(ShapedFloatArray(3, dtype=np.float32, casting="safe"))
+    with pytest.raises(pdt.ValidationError):
+        strict.validate_python(np.zeros(3))
+    assert strict.validate_python(np.zeros(3, dtype=np.float16)).dtype == np.float32
+
+
+def test_no_copy():
+    array = np.zeros((4, 3))
+    assert Vectors.validate_python(array) is array
+    strided = np.zeros((4, 6))[:, ::2]
+    validated = Vectors.validate_python(strided)
+    assert validated.flags.c_contiguous
+    assert not np.shares_memory(validated, strided)
+
+
+def test_json_schema():
+    assert Vectors.json_schema() == {
+        "type": "array",
+        "items": {
+            "type": "array",
+            "items": {"type": "number"},
+            "minItems": 3,
+            "maxItems": 3,
+        },
+    }
+
+
+def test_model_fields(relax_outputs):
+    fields = RelaxOutputs.model_fields
+    assert is_array_field(fields["forces"])
+    assert is_array_field(fields["stress"])
+    assert not is_array_field(fields["total_energy"])
+    model = RelaxOutputs.model_validate(relax_outputs)
+    assert model.model_dump(mode="json")["forces"] == relax_outputs["forces"].tolist()
+    relax_outputs["stress"] = np.zeros((3, 2))
+    with pytest.raises(pdt.ValidationError, match="stress"):
+        RelaxOutputs.model_validate(relax_outputs)
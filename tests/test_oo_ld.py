@@ -0,0 +1,86 @@
+import io
+import json
+
+import pytest
+
+from common_workflow_schemas.common.serializers import serialize_model
+from common_workflow_schemas.schemas.engine import Engine
+from common_workflow_schemas.schemas.relax import RelaxInputs
+
+
+def test_header_memoized():
+    header = RelaxInputs.model_oo_ld_header()
+    assert RelaxInputs.model_oo_ld_header() is header
+    assert header["@type"] == "RelaxInputs"
+    assert {"@context", "properties", "$defs"} <= header.keys()
+
+
+def test_header_rebuild():
+    header = RelaxInputs.model_oo_ld_header()
+    RelaxInputs.model_rebuild(force=True)
+    rebuilt = RelaxInputs.model_oo_ld_header()
+    assert rebuilt is not header
+    assert rebuilt == header
+
+
+def test_document_shares_header(relax_inputs):
+    model = RelaxInputs.model_validate(relax_inputs)
+    header = RelaxInputs.model_oo_ld_header()
+    document = model.model_oo_ld()
+    for key in ("@context", "properties", "$defs"):
+        assert document[key] is header[key]
+    document["@context"] = {}
+    document["structure"] = None
+    assert header["@context"]
+    assert "structure" not in header
+    assert model.model_oo_ld()["@context"] is header["@context"]
+
+
+@pytest.fixture
+def models(relax_inputs, structure_factory) -> list[RelaxInputs]:
+    models = []
+    for seed in range(3):
+        relax_inputs["structure"] = structure_factory(seed=seed)
+        models.append(RelaxInputs.model_validate(relax_inputs))
+    return models
+
+
+def test_documents(models, engine):
+    documents = list(RelaxInputs.model_oo_ld_documents(models))
+    assert [document["@type"] for document in documents] == ["RelaxInputs"] * 3
+    assert all("@context" not in document for document in documents)
+    for model, document in zip(models, documents):
+        assert document == {"@type": "RelaxInputs", **serialize_model(model)}
+    encoded = RelaxInputs.model_oo_ld_documents_json(models)
+    assert [json.loads(document) for document in encoded] == documents
+    with pytest.raises(TypeError):
+        list(RelaxInputs.model_oo_ld_documents([Engine.model_validate(engine)]))
+
+
+@pytest.mark.parametrize("separators", [(",", ":"), (", ", ": ")])
+def test_stream_ndjson(models, separators):
+    fp = io.StringIO()
+    assert RelaxInputs.model_oo_ld_stream(models, fp, separators=separators) == 3
+    header, *lines = fp.getvalue().splitlines()
+    assert json.loads(header) == RelaxInputs.model_oo_ld_header()
+    documents = [json.loads(line) for line in lines]
+    context = json.loads(header)["@context"]
+    loaded = RelaxInputs.model_validate_oo_ld_documents(documents, context=context)
+    assert list(loaded) == models
+
+
+def test_stream_graph(models):
+    fp = io.StringIO()
+    assert RelaxInputs.model_oo_ld_stream(models, fp, mode="graph") == 3
+    document = json.loads(fp.getvalue())
+    assert document["@context"] == RelaxInputs.model_oo_ld_header()["@context"]
+    assert "@type" not in document
+    assert [RelaxInputs.model_validate(node) for node in document["@graph"]] == models
+
+
+def test_stream_empty():
+    fp = io.StringIO()
+    assert RelaxInputs.model_oo_ld_stream([], fp, mode="graph") == 0
+    assert json.loads(fp.getvalue())["@graph"] == []
+    with pytest.raises(ValueError, match="mode"):
+        RelaxInputs.model_oo_ld_stream([], io.StringIO(), mode="csv")
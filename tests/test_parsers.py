@@ -0,0 +1,90 @@
+import io
+import json
+import math
+
+import numpy as np
+import pytest
+
+from common_workflow_schemas.common.parsers import JSONReader, load_model
+from common_workflow_schemas.schemas.relax import RelaxInputs, RelaxOutputs
+
+CHUNK_SIZES = [1, 2, 3, 5, 7, 11, 64, 1 << 16]
+
+DOCUMENTS = [
+    '{"a": -1234.5678}',
+    '{"a": 1e-7, "b": [0, -0.5, 12E+3], "c": true, "d": false, "e": null}',
+    '{"nested": {"x": {"y": [1, {"z": "w"}]}}, "empty": {}, "list": []}',
+    '{"s": "caf\\u00e9 \\"quoted\\" \\\\ back\\nslash", "t": "\\ud83d\\ude00"}',
+    "[NaN, Infinity, -Infinity, 1]",
+    '  { "spaced" :\n[ 1 ,\t2 ] }  ',
+    "-42",
+]
+
+
+def _read(text: str, chunk_size: int):
+    return JSONReader(io.StringIO(text), chunk_size).read_value()
+
+
+def _same(left, right) -> bool:
+    if isinstance(left, float) and math.isnan(left):
+        return isinstance(right, float) and math.isnan(right)
+    if isinstance(left, list):
+        return len(left) == len(right) and all(map(_same, left, right))
+    if isinstance(left, dict):
+        return left.keys() == right.keys() and all(
+            _same(left[key], right[key]) for key in left
+        )
+    return left == right and type(left) is type(right)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", DOCUMENTS)
+def test_read_value(text, chunk_size):
+    assert _same(_read(text, chunk_size), json.loads(text))
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", DOCUMENTS)
+def test_skip_value(text, chunk_size):
+    reader = JSONReader(io.StringIO(f"[{text}, 7]"), chunk_size)
+    reader.expect("[")
+    reader.skip_value()
+    reader.expect(",")
+    assert reader.read_value() == 7
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_read_array(chunk_size):
+    values = np.random.default_rng(0).normal(size=(4, 5, 3)) * 1e3
+    values[0, 0, 0] = np.nan
+    values[1, 0, 0] = -np.inf
+    reader = JSONReader(io.StringIO(json.dumps(values.tolist())), chunk_size)
+    np.testing.assert_array_equal(reader.read_array(), values)
+
+
+@pytest.mark.parametrize("text", ['{"a": 1.}', '{"a": -}', '{"a": tru}', "[1, 2"])
+def test_invalid(text):
+    with pytest.raises(ValueError):
+        _read(text, 3)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_load_model(relax_outputs, chunk_size):
+    model = RelaxOutputs.model_validate(relax_outputs)
+    text = json.dumps(model.model_oo_ld())
+    loaded = load_model(RelaxOutputs, io.StringIO(text), chunk_size)
+    np.testing.assert_array_equal(loaded.forces, model.forces)
+    assert loaded.model_dump_json() == model.model_dump_json()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_model_validate_stream(relax_inputs, chunk_size):
+    model = RelaxInputs.model_validate(relax_inputs)
+    text = json.dumps(model.model_oo_ld())
+    assert RelaxInputs.model_validate_stream(io.StringIO(text), chunk_size) == model
+
+
+def test_load_model_invalid(relax_inputs):
+    relax_inputs["protocol"] = "slowest"
+    with pytest.raises(ValueError):
+        load_model(RelaxInputs, io.StringIO(json.dumps(relax_inputs)))
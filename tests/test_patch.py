@@ -0,0 +1,98 @@
+import copy
+
+import numpy as np
+import pytest
+
+from common_workflow_schemas.common.patch import (
+    apply_patch,
+    diff_models,
+    escape_pointer,
+    parse_pointer,
+)
+from common_workflow_schemas.common.serializers import serialize_model
+from common_workflow_schemas.schemas.relax import RelaxInputs, RelaxOutputs
+
+
+def test_pointer():
+    path = ("a/b", "c~d", 0)
+    pointer = escape_pointer(path)
+    assert pointer == "/a~1b/c~0d/0"
+    assert parse_pointer(pointer) == ["a/b", "c~d", "0"]
+    assert parse_pointer("") == []
+    with pytest.raises(ValueError):
+        parse_pointer("a")
+
+
+def test_diff_equal(relax_outputs):
+    old = RelaxOutputs.model_validate(relax_outputs)
+    new = RelaxOutputs.model_validate(relax_outputs)
+    assert diff_models(old, new) == []
+
+
+def test_diff_round_trip(relax_outputs):
+    old = RelaxOutputs.model_validate(relax_outputs)
+    relax_outputs["forces"] = relax_outputs["forces"] + 1
+    relax_outputs["total_energy"] = -5.0
+    relax_outputs["stress"] = None
+    new = RelaxOutputs.model_validate(relax_outputs)
+
+    patch = old.model_diff(new)
+    assert {operation["path"] for operation in patch} == {
+        "/forces",
+        "/total_energy",
+        "/stress",
+    }
+    document = serialize_model(old)
+    patched = apply_patch(document, patch)
+    assert patched == serialize_model(new)
+    assert document == serialize_model(old)
+    assert patched["relaxed_structure"] is document["relaxed_structure"]
+
+    applied = old.model_apply_patch(patch)
+    assert np.array_equal(applied.forces, new.forces)
+    assert applied.total_energy == -5.0
+    assert applied.stress is None
+
+
+def test_diff_nested(relax_inputs):
+    old = RelaxInputs.model_validate(copy.deepcopy(relax_inputs))
+    relax_inputs["engines"]["relax"]["options"]["resources"]["num_machines"] = 2
+    new = RelaxInputs.model_validate(relax_inputs)
+    assert diff_models(old, new) == [
+        {
+            "op": "replace",
+            "path": "/engines/relax/options/resources/num_machines",
+            "value": 2,
+        }
+    ]
+    assert old.model_apply_patch(diff_models(old, new)) == new
+
+
+def test_diff_types(relax_inputs, relax_outputs):
+    with pytest.raises(TypeError):
+        diff_models(
+            RelaxInputs.model_validate(relax_inputs),
+            RelaxOutputs.model_validate(relax_outputs),
+        )
+
+
+def test_apply_operations():
+    document = {"a": [1, 2], "b": {"c": 1}}
+    patch = [
+        {"op": "add", "path": "/a/-", "value": 3},
+        {"op": "move", "from": "/b/c", "path": "/d"},
+        {"op": "copy", "from": "/a", "path": "/e"},
+        {"op": "test", "path": "/d", "value": 1},
+        {"op": "remove", "path": "/a/0"},
+    ]
+    assert apply_patch(document, patch) == {
+        "a": [2, 3],
+        "b": {},
+        "d": 1,
+        "e": [1, 2, 3],
+    }
+    assert document == {"a": [1, 2], "b": {"c": 1}}
+    with pytest.raises(ValueError):
+        apply_patch(document, [{"op": "test", "path": "/b/c", "value": 2}])
+    with pytest.raises(KeyError):
+        apply_patch(document, [{"op": "replace", "path": "/x", "value": 2}])
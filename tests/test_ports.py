@@ -0,0 +1,106 @@
+import json
+
+import pydantic as pdt
+import pytest
+
+from common_workflow_schemas.common import ports
+from common_workflow_schemas.schemas.eos import EosInputs
+
+
+@pytest.fixture
+def index(monkeypatch):
+    """Isolate the port index and its environment file from the other tests."""
+    monkeypatch.setattr(ports, "PORT_INDEX", {})
+    monkeypatch.setattr(ports, "_env_index_path", None)
+    monkeypatch.delenv(ports.PORT_INDEX_ENV, raising=False)
+    ports.get_port_names.cache_clear()
+    yield ports.PORT_INDEX
+    ports.get_port_names.cache_clear()
+
+
+def write(path, index: dict) -> str:
+    path.write_text(json.dumps(index))
+    return str(path)
+
+
+def test_find_invalid_port():
+    names = frozenset(
+        {
+            "base",
+            "base.pw",
+            "base.pw.parameters",
+            "base.pw.settings",
+            "base.pw.settings.*",
+        }
+    )
+    assert ports.find_invalid_port(names, {"base": {"pw": {"parameters": {}}}}) is None
+    assert (
+        ports.find_invalid_port(names, {"base": {"pw": {"settings": {"a": 1}}}}) is None
+    )
+    assert ports.find_invalid_port(names, {"base": {"kpoints": {}}}) == "base.kpoints"
+    assert ports.find_invalid_port(frozenset({"*"}), {"any": {}}) is None
+    # Ports that are not namespaces take any dictionary
+    assert (
+        ports.find_invalid_port(names, {"base": {"pw": {"parameters": {"a": 1}}}})
+        is None
+    )
+
+
+def test_get_namespaces():
+    names = frozenset({"base", "base.pw.parameters", "base.pw.settings.*", "code"})
+    assert ports.get_namespaces(names) == {"base.", "base.pw.", "base.pw.settings."}
+    assert ports.get_namespaces(names) is ports.get_namespaces(names)
+
+
+def test_iter_port_names():
+    class Namespace(dict):
+        dynamic = True
+
+    namespace = {"base": Namespace(pw={"parameters": 1}), "clean_workdir": 1}
+    assert set(ports.iter_port_names(namespace)) == {
+        "base",
+        "base.*",
+        "base.pw",
+        "base.pw.parameters",
+        "clean_workdir",
+    }
+
+
+def test_env_index_merged(index, tmp_path, monkeypatch):
+    ports.load_port_index(write(tmp_path / "loaded.json", {"a": ["x"], "b": ["x"]}))
+    env = write(tmp_path / "env.json", {"b": ["y"], "c": ["y"]})
+    monkeypatch.setenv(ports.PORT_INDEX_ENV, env)
+    # Entries of the environment file are merged, below those loaded explicitly
+    assert ports.get_port_names("c") == {"y"}
+    assert ports.get_port_names("b") == {"x"}
+    assert ports.get_port_names("a") == {"x"}
+
+    # Loading again replaces environment entries
+    ports.load_port_index(write(tmp_path / "more.json", {"c": ["z"]}))
+    assert ports.get_port_names("c") == {"z"}
+
+
+def test_env_index_alone(index, tmp_path, monkeypatch):
+    monkeypatch.setenv(ports.PORT_INDEX_ENV, write(tmp_path / "env.json", {"c": []}))
+    assert ports.get_port_names("c") == frozenset()
+
+
+def test_write_port_index(index, tmp_path):
+    index["a"] = frozenset({"y", "x"})
+    path = tmp_path / "index.json"
+    ports.write_port_index(path, ["a"])
+    assert json.loads(path.read_text()) == {"a": ["x", "y"]}
+
+
+def test_sub_process_validation(composite_inputs, structure):
+    data = {
+        **composite_inputs,
+        "structure": structure,
+        "scale_factors": [0.98, 1.0, 1.02],
+        "scale_count": None,
+        "scale_increment": None,
+    }
+    EosInputs.model_validate(data)
+    data["sub_process"] = {"base": {"kpoints": {}}}
+    with pytest.raises(pdt.ValidationError, match="'base.kpoints'"):
+        EosInputs.model_validate(data)
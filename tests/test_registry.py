@@ -0,0 +1,94 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from common_workflow_schemas.common import registry
+from common_workflow_schemas.common.mixins import SemanticModel, build_oo_ld_header
+from common_workflow_schemas.schemas.engine import Engine
+from common_workflow_schemas.schemas.relax import RelaxInputs
+
+
+@pytest.fixture
+def artifact(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "REGISTRY", {})
+    monkeypatch.setattr(registry, "_env_loaded", True)
+    path = tmp_path / "registry.json"
+    registry.build_registry(path)
+    return path
+
+
+def test_build(artifact):
+    classes = json.loads(artifact.read_text())["classes"]
+    assert registry.class_key(RelaxInputs) in classes
+    assert registry.class_key(Engine) in classes
+    entry = classes[registry.class_key(RelaxInputs)]
+    assert entry["hash"] == registry.class_hash(RelaxInputs)
+    assert entry["header"] == json.loads(json.dumps(build_oo_ld_header(RelaxInputs)))
+
+
+def test_load(artifact):
+    assert registry.get_registered_header(RelaxInputs) is None
+    assert registry.load_registry(artifact)
+    header = registry.get_registered_header(RelaxInputs)
+    assert header == json.loads(json.dumps(RelaxInputs.model_oo_ld_header()))
+
+
+def test_version_mismatch(artifact):
+    data = json.loads(artifact.read_text())
+    data["version"] = "0.0.0"
+    artifact.write_text(json.dumps(data))
+    assert not registry.load_registry(artifact)
+    assert registry.REGISTRY == {}
+
+
+def test_stale_entry(artifact):
+    class Changed(SemanticModel):
+        value: int
+
+    key = registry.class_key(Changed)
+    registry.REGISTRY[key] = {"hash": registry.class_hash(Changed), "header": {}}
+    assert registry.get_registered_header(Changed) == {}
+
+    class Changed(SemanticModel):
+        value: float
+
+    assert registry.class_key(Changed) == key
+    assert registry.get_registered_header(Changed) is None
+
+
+def test_class_hash_nested():
+    class Inner(SemanticModel):
+        value: int
+
+    class Outer(SemanticModel):
+        inner: Inner
+
+    before = registry.class_hash(Outer)
+
+    class Inner(SemanticModel):
+        value: float
+
+    class Outer(SemanticModel):
+        inner: Inner
+
+    assert registry.class_hash(Outer) != before
+
+
+def test_env(artifact):
+    script = (
+        "from common_workflow_schemas.common import registry\n"
+        "from common_workflow_schemas.schemas.relax import RelaxInputs\n"
+        "assert registry.get_registered_header(RelaxInputs) is not None\n"
+        "print(RelaxInputs.model_oo_ld_header()['@type'])"
+    )
+    process = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", script],
+        capture_output=True,
+        check=True,
+        text=True,
+        env={**os.environ, registry.REGISTRY_ENV: str(artifact)},
+    )
+    assert process.stdout.strip() == "RelaxInputs"
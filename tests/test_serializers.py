@@ -0,0 +1,82 @@
+import enum
+import json
+
+import numpy as np
+import pytest
+
+from common_workflow_schemas.common.codecs import ListCodec
+from common_workflow_schemas.common.serializers import (
+    serialize_field,
+    serialize_model,
+    serialize_model_json,
+)
+from common_workflow_schemas.schemas.engine import Engine
+from common_workflow_schemas.schemas.relax import RelaxOutputs
+
+
+class Color(enum.Enum):
+    RED = "red"
+
+
+@pytest.fixture
+def engine_model(engine) -> Engine:
+    engine["options"] = {
+        "mesh": np.arange(3.0),
+        "color": Color.RED,
+        "nested": [{"weights": np.ones(2)}],
+        "scale": np.float32(1.5),
+    }
+    return Engine.model_validate(engine)
+
+
+def test_free_form_fields(engine_model):
+    options = serialize_model(engine_model)["options"]
+    assert options == {
+        "mesh": [0.0, 1.0, 2.0],
+        "color": "red",
+        "nested": [{"weights": [1.0, 1.0]}],
+        "scale": 1.5,
+    }
+    data = json.loads(serialize_model_json(engine_model, "base64"))
+    assert data["options"]["mesh"]["encoding"] == "base64"
+    assert data["options"]["color"] == "red"
+
+
+def test_unknown_types(engine_model):
+    engine_model.options["unknown"] = object()
+    with pytest.raises(Exception, match="Unable to serialize unknown type"):
+        serialize_model(engine_model)
+
+
+@pytest.mark.parametrize("array_codec", ["list", "base64"])
+def test_json_matches_dict(relax_outputs, array_codec):
+    model = RelaxOutputs.model_validate(relax_outputs)
+    data = serialize_model(model, array_codec)
+    assert json.loads(serialize_model_json(model, array_codec)) == data
+    assert RelaxOutputs.model_validate(data).model_dump_json() == (
+        model.model_dump_json()
+    )
+
+
+class DumpedListCodec(ListCodec):
+    """List codec taking the single pydantic-core pass of other codecs."""
+
+
+def test_list_arrays(relax_outputs):
+    relax_outputs["charge_density"] = np.ones((2, 2, 2))
+    model = RelaxOutputs.model_validate(relax_outputs)
+    data = serialize_model(model)
+    dumped = serialize_model(model, DumpedListCodec())
+    assert data == dumped
+    assert list(data) == list(dumped) == list(json.loads(serialize_model_json(model)))
+    assert data["forces"] == model.forces.tolist()
+    assert data["charge_density"] == np.ones((2, 2, 2)).tolist()
+    assert data["hartree_potential"] is None
+
+
+def test_serialize_field_deprecated():
+    with pytest.deprecated_call():
+        data = serialize_field({"a": [np.ones(2), Color.RED]}, "list")
+    assert data == {"a": [[1.0, 1.0], "red"]}
+    with pytest.deprecated_call():
+        assert serialize_field(np.ones(2)) == [1.0, 1.0]
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+from optimade.models import StructureResource
+
+from common_workflow_schemas.schemas.relax import RelaxOutputs
+from common_workflow_schemas.schemas.trajectory import RelaxTrajectory
+
+
+@pytest.fixture
+def initial(structure) -> StructureResource:
+    return StructureResource.model_validate(structure)
+
+
+def fill(trajectory: RelaxTrajectory, steps: int) -> None:
+    rng = np.random.default_rng(0)
+    for step in range(steps):
+        trajectory.append(
+            positions=rng.random((4, 3)),
+            forces=rng.random((4, 3)),
+            total_energy=-float(step),
+            stress=np.full((3, 3), step),
+        )
+
+
+def test_append(initial):
+    trajectory = RelaxTrajectory.empty(initial, stresses=True, capacity=2)
+    fill(trajectory, 20)
+    assert len(trajectory) == 20
+    assert trajectory.positions.shape == (20, 4, 3)
+    assert trajectory.stresses.shape == (20, 3, 3)
+    assert trajectory.total_energies[-1] == -19.0
+    assert trajectory.cells is None
+    with pytest.raises(ValueError, match="cells"):
+        trajectory.append(np.zeros((4, 3)), np.zeros((4, 3)), 0.0, cell=np.eye(3))
+    with pytest.raises(ValueError, match="stresses"):
+        trajectory.append(np.zeros((4, 3)), np.zeros((4, 3)), 0.0)
+    with pytest.raises(ValueError, match="shape"):
+        trajectory.append(np.zeros((5, 3)), np.zeros((4, 3)), 0.0, stress=np.eye(3))
+    assert len(trajectory) == 20
+
+
+def test_step_views(initial):
+    trajectory = RelaxTrajectory.empty(initial, stresses=True)
+    fill(trajectory, 3)
+    step = trajectory.step(-1)
+    assert np.shares_memory(step.positions, trajectory.positions)
+    assert np.shares_memory(step.forces, trajectory.forces)
+    assert np.shares_memory(step.stress, trajectory.stresses)
+    assert step.total_energy == -2.0
+    assert step.structure is trajectory.structure
+    assert np.array_equal(step.cell, np.asarray(initial.attributes.lattice_vectors))
+    with pytest.raises(IndexError):
+        trajectory.step(3)
+
+
+def test_step_outputs(initial):
+    trajectory = RelaxTrajectory.empty(initial, stresses=True)
+    fill(trajectory, 2)
+    outputs = trajectory.step(1).relax_outputs()
+    assert isinstance(outputs, RelaxOutputs)
+    assert np.array_equal(
+        outputs.relaxed_structure.attributes.cartesian_site_positions,
+        trajectory.positions[1],
+    )
+    assert np.array_equal(outputs.forces, trajectory.forces[1])
+    assert outputs.total_energy == -1.0
+
+
+def test_structures(initial):
+    trajectory = RelaxTrajectory.empty(initial)
+    positions = np.arange(12.0).reshape(4, 3)
+    trajectory.append(positions, np.zeros((4, 3)), 0.0)
+    batch = trajectory.structures()
+    assert len(batch) == 1
+    assert np.array_equal(batch.cartesian_site_positions[0], positions)
+
+
+def test_memmap_reopen(tmp_path, initial):
+    trajectory = RelaxTrajectory.empty(
+        initial, stresses=True, capacity=4, directory=tmp_path
+    )
+    fill(trajectory, 10)
+    assert isinstance(trajectory.positions.base, np.memmap)
+    expected = trajectory.model_dump()
+    del trajectory
+
+    reopened = RelaxTrajectory.open(tmp_path)
+    assert len(reopened) == 10
+    assert isinstance(reopened.positions.base, np.memmap)
+    for name in ("positions", "forces", "stresses", "total_energies"):
+        assert np.array_equal(getattr(reopened, name), expected[name])
+    assert reopened.structure == initial
+
+    reopened.append(np.zeros((4, 3)), np.ones((4, 3)), 1.0, stress=np.eye(3))
+    assert len(RelaxTrajectory.open(tmp_path)) == 11
+    assert RelaxTrajectory.open(tmp_path).total_energies[-1] == 1.0
+
+
+def test_round_trip(initial):
+    trajectory = RelaxTrajectory.empty(initial, stresses=True)
+    fill(trajectory, 3)
+    document = trajectory.model_oo_ld()
+    assert document["positions"]["encoding"] == "base64"
+    loaded = RelaxTrajectory.model_validate(document)
+    assert np.array_equal(loaded.positions, trajectory.positions)
+    assert np.array_equal(loaded.stresses, trajectory.stresses)
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from common_workflow_schemas.common.serializers import serialize_model
+from common_workflow_schemas.common.trusted import (
+    ChecksumError,
+    TrustedLoader,
+    construct_trusted,
+    record_checksum,
+)
+from common_workflow_schemas.schemas.relax import RelaxInputs, RelaxOutputs
+
+
+@pytest.fixture
+def records(relax_outputs) -> list[dict]:
+    model = RelaxOutputs.model_validate(relax_outputs)
+    return [serialize_model(model), serialize_model(model, "base64")]
+
+
+def test_construct_trusted(records):
+    for record in records:
+        constructed = construct_trusted(RelaxOutputs, record)
+        assert isinstance(constructed.forces, np.ndarray)
+        validated = RelaxOutputs.model_validate(record)
+        assert constructed.model_dump_json() == validated.model_dump_json()
+
+
+def test_construct_trusted_nested(relax_inputs):
+    constructed = construct_trusted(RelaxInputs, relax_inputs)
+    assert constructed == RelaxInputs.model_validate(relax_inputs)
+
+
+def test_record_checksum(records):
+    model = RelaxOutputs.model_validate(records[0])
+    checksum = record_checksum(model)
+    assert record_checksum(records[0], RelaxOutputs) == checksum
+    assert record_checksum(records[1], RelaxOutputs) == checksum
+    with pytest.raises(TypeError):
+        record_checksum(records[0])
+
+
+def test_loader_checksums(records):
+    checksum = record_checksum(records[0], RelaxOutputs)
+    loader = TrustedLoader(RelaxOutputs, validate_every=2)
+    models = list(loader.load_many(records, [checksum, checksum]))
+    assert len(models) == 2
+    assert (loader.loaded, loader.validated) == (2, 1)
+    records[0]["total_energy"] += 1.0
+    with pytest.raises(ChecksumError):
+        loader.load(records[0], checksum)
+
+
+def test_integer_floats(records, relax_inputs):
+    records[0]["total_energy"] = records[1]["total_energy"] = -4
+    constructed = construct_trusted(RelaxOutputs, records[0])
+    assert type(constructed.total_energy) is float
+    checksum = record_checksum(RelaxOutputs.model_validate(records[0]))
+    loader = TrustedLoader(RelaxOutputs, validate_every=2)
+    assert len(list(loader.load_many(records, [checksum, checksum]))) == 2
+    relax_inputs["magnetization_per_site"] = [1, 0]
+    constructed = construct_trusted(RelaxInputs, relax_inputs)
+    assert constructed == RelaxInputs.model_validate(relax_inputs)
+    assert all(type(value) is float for value in constructed.magnetization_per_site)
+
+
+@pytest.mark.parametrize("count", [1, 3])
+def test_loader_checksum_count(records, count):
+    checksums = [record_checksum(records[0], RelaxOutputs)] * count
+    with pytest.raises(ValueError, match="checksum"):
+        list(TrustedLoader(RelaxOutputs).load_many(records, checksums))
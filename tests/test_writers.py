@@ -0,0 +1,94 @@
+import asyncio
+import concurrent.futures
+import io
+import json
+
+import pytest
+
+from common_workflow_schemas.schemas.relax import RelaxInputs, RelaxOutputs
+from common_workflow_schemas.utils.writers import write_oo_ld_async
+
+
+class CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+    def __init__(self) -> None:
+        super().__init__(max_workers=2)
+        self.calls = 0
+
+    def submit(self, *args, **kwargs):
+        self.calls += 1
+        return super().submit(*args, **kwargs)
+
+
+async def iterate(models):
+    for model in models:
+        yield model
+
+
+@pytest.fixture
+def models(relax_inputs) -> list[RelaxInputs]:
+    return [RelaxInputs.model_validate(relax_inputs) for _ in range(5)]
+
+
+@pytest.mark.parametrize("mode", ["ndjson", "graph"])
+@pytest.mark.parametrize("batch_size", [1, 2, 64])
+def test_matches_stream(models, mode, batch_size):
+    expected = io.StringIO()
+    RelaxInputs.model_oo_ld_stream(models, expected, mode=mode)
+    fp = io.BytesIO()
+    stats = asyncio.run(
+        write_oo_ld_async(
+            RelaxInputs, iterate(models), fp, mode=mode, batch_size=batch_size
+        )
+    )
+    assert fp.getvalue().decode() == expected.getvalue()
+    assert stats.documents == 5
+    assert stats.bytes == len(fp.getvalue())
+
+
+def test_path(tmp_path, models):
+    path = tmp_path / "export.ndjson"
+    stats = asyncio.run(
+        RelaxInputs.model_oo_ld_stream_async(iterate(models), path, batch_size=2)
+    )
+    lines = path.read_text().splitlines()
+    assert len(lines) == 6 == stats.documents + 1
+    header = json.loads(lines[0])
+    assert header["@type"] == "RelaxInputs"
+    assert (
+        RelaxInputs.model_validate_oo_ld({**header, **json.loads(lines[1])})
+        == (models[0])
+    )
+
+
+def test_empty(models):
+    fp = io.BytesIO()
+    asyncio.run(write_oo_ld_async(RelaxInputs, iterate([]), fp, mode="graph"))
+    assert json.loads(fp.getvalue())["@graph"] == []
+
+
+def test_executor_calls_per_batch(tmp_path, models):
+    executor = CountingExecutor()
+
+    async def export():
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(executor)
+        return await write_oo_ld_async(
+            RelaxInputs,
+            iterate(models * 4),
+            tmp_path / "export.ndjson",
+            executor=executor,
+            batch_size=8,
+        )
+
+    stats = asyncio.run(export())
+    assert stats.documents == 20
+    # Open, write the header, serialize and write 3 batches, then close
+    assert executor.calls == 1 + 1 + 2 * 3 + 1
+
+
+def test_wrong_model(relax_outputs, models):
+    outputs = RelaxOutputs.model_validate(relax_outputs)
+    with pytest.raises(TypeError):
+        asyncio.run(
+            write_oo_ld_async(RelaxInputs, iterate([*models, outputs]), io.BytesIO())
+        )